@@ -4,33 +4,47 @@ Taxonomy Monograph Builder
 
 # built-in dependencies
 import datetime
+import io
 import random
+import concurrent.futures
+import multiprocessing
 import os
-import shutil
+import sys
 import re
 import math
 import collections
 from typing import Optional, Tuple, TextIO
-import numpy
 # local dependencies
 import TMB_Import
-import TMB_Create_Maps
 from TMB_Error import report_error
 import TMB_Error
 from TMB_Common import *
 import TMB_Initialize
 import TMB_Classes
-import TMB_Create_Graphs
 import TMB_TaxKeyGen
 import TMB_Measurements
+import TMB_Snapshot
+import TMB_Manifest
+import TMB_Dependencies
+import TMB_Validate
+import TMB_SpeciesXRef
 from TMB_SpeciesXRef import init_species_crossref, find_species_by_name
 import phy2html
+# drawing modules pull in matplotlib, wordcloud, and numpy, which are slow to load and not needed to check the data,
+# so they are only imported the first time one of their functions is used
+TMB_Create_Maps = LazyModule("TMB_Create_Maps")
+TMB_Create_Graphs = LazyModule("TMB_Create_Graphs")
+numpy = LazyModule("numpy")
 
 
 WEBOUT_PATH = "webout/"
 MEDIA_PATH = "media/"
 TMP_PATH = "temp/"
 TMP_MAP_PATH = TMP_PATH + "maps/"
+INAT_STORE_FILE = TMP_PATH + "inat_observations.sqlite"
+DATA_SNAPSHOT_FILE = TMP_PATH + "data_snapshot.pickle"
+OUTPUT_MANIFEST_FILE = TMP_PATH + "output_manifest.json"
+PAGE_DEPENDENCY_FILE = TMP_PATH + "page_dependencies.json"
 MAP_PATH = "maps/"
 
 FOSSIL_IMAGE = " <span class=\"fossil-img\">&#9760;</span>"
@@ -53,12 +67,32 @@ CHECK_DATA = False
 CHECK_LOCATIONS = False
 # this flag controls whether additional location data should be fetched from iNaturalist
 INCLUDE_INAT = False
+# number of days downloaded iNaturalist data are reused before checking for new observations
+INAT_CACHE_DAYS = 7
+# number of days between complete downloads of the iNaturalist data, which also remove deleted observations
+INAT_FULL_SYNC_DAYS = 60
+# reuse the previously parsed input data when none of the data files have changed
+USE_DATA_SNAPSHOT = True
+# only rewrite web output files whose content has changed since the last build, and list the changes for deployment
+USE_OUTPUT_MANIFEST = True
+# only write the individual reference, name, and species web pages whose input records have changed since the last
+# build (the index, location, and other pages are always written); can also be set with --incremental
+INCREMENTAL_BUILD = False
 # Suppress some of the more time-consuming output; only meant for when testing others elements
 OUTPUT_REFS = True
 OUTPUT_LOCS = True
 # these flags control creating print and web output, respectively
 OUTPUT_PRINT = False
 OUTPUT_WEB = True
+# number of processes used to write the individual reference, name, and species web pages; set to 1 to write serially
+PAGE_PROCESSOR_COUNT = os.cpu_count() or 1
+# the modules whose code renders the individual web pages; any change to them means every page is written again
+PAGE_CODE_MODULES = ("Build_Website", "TMB_Common", "TMB_Classes", "TMB_Measurements", "TMB_Create_Graphs",
+                     "TMB_SpeciesXRef", "TMB_Initialize")
+# the modules whose code reads, links, and derives the data stored in the data snapshot; any change to them means the
+# data are read again
+SNAPSHOT_CODE_MODULES = ("Build_Website", "TMB_Import", "TMB_Classes", "TMB_Common", "TMB_Measurements",
+                         "TMB_SpeciesXRef")
 
 # randSeed = random.randint(0, 10000)
 
@@ -67,6 +101,119 @@ def init_data() -> TMB_Initialize.InitializationData:
     return TMB_Initialize.INIT_DATA
 
 
+# read-only data shared by all of the page jobs of a page-writing worker process
+PAGE_MODEL = None
+
+
+def page_settings() -> dict:
+    """
+    the module-level paths and flags, which may have been changed at run time and must be passed to worker processes
+    which are not forked from this one
+
+    only plain values are included, so module state such as PAGE_MODEL is never copied
+    """
+    return {name: value for name, value in globals().items()
+            if name.isupper() and isinstance(value, (str, bool, int, float))}
+
+
+def init_page_worker(model: dict, settings: dict, t_init_data: TMB_Initialize.InitializationData,
+                     manifest: Optional[TMB_Manifest.OutputManifest]) -> None:
+    """
+    set up the global state of a page-writing worker process
+    """
+    global PAGE_MODEL
+    globals().update(settings)
+    PAGE_MODEL = model
+    # forked workers would otherwise all continue from the same random state
+    random.seed()
+    TMB_Initialize.INIT_DATA = t_init_data
+    TMB_Manifest.MANIFEST = manifest
+    TMB_SpeciesXRef.SPECIES_XREF = model["species_xref"]
+    TMB_Error.LOGFILE = None
+    TMB_Error.ECHO = False
+
+
+def run_page_job(job: tuple) -> tuple:
+    """
+    write a single page in a worker process, returning the errors reported while writing it, the number of files
+    and bytes written and of unchanged files, the manifest entries of the files, the records read and files written
+    by the page, and the name cache hits and misses
+    """
+    TMB_Error.ERROR_RECORD = []
+    # the manifest of the worker only collects the files of the current job, which are added to the main manifest
+    if TMB_Manifest.MANIFEST is not None:
+        TMB_Manifest.MANIFEST.current = {}
+    start_totals = OUTPUT_STATS.totals()
+    start_hits, start_misses = NAME_CACHE.counts()
+    TMB_Dependencies.start_page()
+    job[0](PAGE_MODEL, *job[1:])
+    reads, files = TMB_Dependencies.end_page()
+    counts = tuple(end - start for start, end in zip(start_totals, OUTPUT_STATS.totals()))
+    entries = {} if TMB_Manifest.MANIFEST is None else TMB_Manifest.MANIFEST.current
+    hits, misses = NAME_CACHE.counts()
+    return TMB_Error.ERROR_RECORD, counts, entries, reads, files, (hits - start_hits, misses - start_misses)
+
+
+def page_name(job: tuple) -> str:
+    """
+    the name of the page written by a page job, which is the same from build to build
+    """
+    return job[0].__name__ + ":" + "|".join(str(k) for k in job[1:])
+
+
+def write_pages(jobs: list, model: dict) -> None:
+    """
+    run a list of independent page jobs, each a tuple of a page-writing function and the key(s) of the page
+
+    each function is called with the shared model followed by the keys; with more than one processor the jobs are
+    split across a process pool and the errors from each page are reported afterwards in job order, so the files
+    and the error log are the same as when the pages are written serially. Everything a worker needs is passed to
+    it when it starts, so the pool works with any process start method
+
+    when the dependencies of the pages are being tracked, the jobs whose pages are up to date are skipped and the
+    errors reported when those pages were last written are reported again in their place
+    """
+    dependencies = TMB_Dependencies.DEPENDENCIES
+    pages = [page_name(job) for job in jobs]
+    page_errors = {}  # the errors of each page, reported in job order once every page is done
+    pending_jobs = []
+    for job, page in zip(jobs, pages):
+        if (dependencies is None) or dependencies.needs_update(page):
+            pending_jobs.append(job)
+        else:
+            page_errors[page] = dependencies.pages[page][2]
+            if TMB_Manifest.MANIFEST is not None:
+                TMB_Manifest.MANIFEST.keep(dependencies.pages[page][1])
+    model = dict(model, species_xref=TMB_SpeciesXRef.SPECIES_XREF)
+    n_processes = min(PAGE_PROCESSOR_COUNT, len(pending_jobs))
+    if n_processes > 1:
+        chunk_size = max(1, len(pending_jobs) // (4 * n_processes))
+        with multiprocessing.Pool(n_processes, initializer=init_page_worker,
+                                  initargs=(model, page_settings(), init_data(), TMB_Manifest.MANIFEST)) as pool:
+            results = pool.imap(run_page_job, pending_jobs, chunksize=chunk_size)
+            for job, (errors, counts, entries, reads, files, cache_counts) in zip(pending_jobs, results):
+                page = page_name(job)
+                page_errors[page] = errors
+                OUTPUT_STATS.add(*counts)
+                NAME_CACHE.add_counts(*cache_counts)
+                if TMB_Manifest.MANIFEST is not None:
+                    TMB_Manifest.MANIFEST.current.update(entries)
+                if dependencies is not None:
+                    dependencies.add(page, reads, files, errors)
+    else:
+        for job in pending_jobs:
+            page = page_name(job)
+            TMB_Dependencies.start_page()
+            _, errors = TMB_Error.collect_errors(job[0], model, *job[1:])
+            reads, files = TMB_Dependencies.end_page()
+            page_errors[page] = errors
+            if dependencies is not None:
+                dependencies.add(page, reads, files, errors)
+    for page in pages:
+        for e in page_errors[page]:
+            report_error(e)
+
+
 def remove_html(x: str) -> str:
     """
     remove any stray HTML tags from string before using as title of HTML document
@@ -75,77 +222,150 @@ def remove_html(x: str) -> str:
     return re.sub(regex, "", x)
 
 
+def release_stamp() -> str:
+    """
+    the release stamp in the footer of every webout HTML file, which changes with every build
+    """
+    return "Release: " + init_data().version
+
+
+def render_page_chrome(indexpath: str, include_map: bool) -> tuple:
+    """
+    render the blocks shared by every webout HTML file with the same index path
+
+    returns the start of the head up to the title, the rest of the common head, the start of the body, and the
+    footer and closing elements
+    """
+    head = []
+    head.append("<!DOCTYPE HTML>\n")
+    head.append("<html lang=\"en\">\n")
+    head.append("  <head>\n")
+    head.append("  <!-- Google tag (gtag.js) -->\n")
+    head.append("  <script async src=\"https://www.googletagmanager.com/gtag/js?id=G-94FNMMTWTQ\"></script>\n")
+    head.append("  <script>\n")
+    head.append("    window.dataLayer = window.dataLayer || [];\n")
+    head.append("    function gtag(){dataLayer.push(arguments);}\n")
+    head.append("    gtag('js', new Date());\n")
+    head.append("    gtag('config', 'G-94FNMMTWTQ');\n")
+    head.append("  </script>\n")
+    head.append("    <meta charset=\"utf-8\" />\n")
+    head.append("    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\" />\n")
+    head.append("    <title>")
+    head_start = "".join(head)
+    head = ["</title>\n"]
+    head.append("    <meta name=\"description\" content=\"Fiddler Crabs\" />\n")
+    head.append("    <link rel=\"icon\" sizes=\"128x128\" href=\"" + indexpath +
+                "favicon128.png\" type=\"image/png\" />\n")
+    head.append("    <link rel=\"icon\" sizes=\"96x96\" href=\"" + indexpath +
+                "favicon96.png\" type=\"image/png\" />\n")
+    head.append("    <link rel=\"icon\" sizes=\"72x72\" href=\"" + indexpath +
+                "favicon72.png\" type=\"image/png\" />\n")
+    head.append("    <link rel=\"icon\" sizes=\"48x48\" href=\"" + indexpath +
+                "favicon48.png\" type=\"image/png\" />\n")
+    head.append("    <link rel=\"icon\" sizes=\"32x32\" href=\"" + indexpath +
+                "favicon32.png\" type=\"image/png\" />\n")
+    head.append("    <link rel=\"icon\" sizes=\"24x24\" href=\"" + indexpath +
+                "favicon24.png\" type=\"image/png\" />\n")
+    head.append("    <link rel=\"icon\" sizes=\"16x16\" href=\"" + indexpath +
+                "favicon16.png\" type=\"image/png\" />\n")
+    head.append("    <link rel=\"apple-touch-icon-precomposed\" href=\"" + indexpath +
+                "apple-touch-icon-precomposed.png\">\n")
+    head.append("    <link rel=\"apple-touch-icon-precomposed\" sizes=\"72x72\" "
+                "href=\"" + indexpath + "apple-touch-icon-72x72-precomposed.png\">\n")
+    head.append("    <link rel=\"apple-touch-icon-precomposed\" sizes=\"114x114\" "
+                "href=\"" + indexpath + "apple-touch-icon-114x114-precomposed.png\">\n")
+    head.append("    <link rel=\"apple-touch-icon-precomposed\" sizes=\"144x144\" "
+                "href=\"" + indexpath + "apple-touch-icon-144x144-precomposed.png\">\n")
+    head.append("    <link rel=\"stylesheet\" href=\"" + indexpath + "uca_style.css\" />\n")
+    head.append("    <script defer src=\"" + indexpath + "js/solid.min.js\"></script>\n")
+    head.append("    <script defer src=\"" + indexpath + "js/regular.min.js\"></script>\n")
+    head.append("    <script defer src=\"" + indexpath + "js/brands.min.js\"></script>\n")
+    head.append("    <script defer src=\"" + indexpath + "js/duotone.min.js\"></script>\n")
+    head.append("    <script defer src=\"" + indexpath + "js/fontawesome.min.js\"></script>\n")
+    head.append("    <link rel=\"stylesheet\" href=\"" + indexpath +
+                "images/flag-icon-css/css/flag-icons.min.css\" />\n")
+    head.append("    <link rel=\"author\" href=\"" + init_data().site_author_email + "\" />\n")
+    head_end = "".join(head)
+    body = []
+    body.append("  </head>\n")
+    body.append("\n")
+    if include_map:
+        body.append("  <body onload=\"initialize()\">\n")
+    else:
+        body.append("  <body>\n")
+    body.append("    <div id=\"skip-links\" role=\"complementary\" aria-label=\"Skip links menu\">")
+    body.append("<a href=\"#Main\" tabindex=\"1\">Skip to content</a></div>\n")
+    body.append("    <div id=\"home\">\n")
+    body.append("      <a href=\"" + indexpath + "index.html\" class=\"home-title\">Fiddler Crabs</a>\n")
+    body.append("      <a href=\"" + indexpath +
+                "index.html\" class=\"home-link\">" + fetch_fa_glyph("home") + "Home</a>\n")
+    # body.append("      <a href=\"" + indexpath +
+    #             "blog\" class=\"home-link\">" + fetch_fa_glyph("blog") + "Blog</a>\n")
+    body.append("    </div>\n")
+    footer = []
+    footer.append("\n")
+    footer.append("    <footer>\n")
+    # footer.append("       <figure id=\"footmap\"><script type=\"text/javascript\" "
+    #               "src=\"//rf.revolvermaps.com/0/0/4.js?i=5f9t1sywiez&amp;m=0&amp;h=75&amp;c=ff0000&amp;r=30\" "
+    #               "async=\"async\"></script><figcaption>Visitors</figcaption></figure>\n")
+    footer.append(f'       <p id="citation"><a href="{indexpath + init_data().cite_url}">'
+                  f'{fetch_fa_glyph("site cite")}How to cite this site</a></p>\n')
+    footer.append('       <p id="contact">Questions or comments about the site? Contact '
+                  f'<a href="mailto:{init_data().site_author_email}">{fetch_fa_glyph("mail")}'
+                  f'Dr. Michael S. Rosenberg</a></p>\n')
+    footer.append(f'       <p id="copyright">{release_stamp()}'
+                  f' &mdash; Copyright &copy; 2003&ndash;{init_data().current_year} All Rights Reserved</p>\n')
+    # footer.append("       <p id=\"citation\"><a href=\"" + indexpath + init_data().cite_url +
+    #               "\">" + fetch_fa_glyph("site cite") + "How to cite this site</a></p>\n")
+    # footer.append("       <p id=\"contact\">Questions or comments about the site? Contact "
+    #               "<a href=\"mailto:" + init_data().site_author_email + "\">" + fetch_fa_glyph("mail") +
+    #               "Dr. Michael S. Rosenberg</a></p>\n")
+    # footer.append("       <p id=\"copyright\">Release: " + init_data().version +
+    #               " &mdash; Copyright &copy; 2003&ndash;" + str(init_data().current_year) +
+    #               " All Rights Reserved</p>\n")
+    footer.append("    </footer>\n")
+    footer.append("  </body>\n")
+    footer.append("</html>\n")
+    return head_start, head_end, "".join(body), "".join(footer)
+
+
+# the rendered blocks shared by the webout HTML files, keyed by (indexpath, include_map), and the initialization
+# data they were rendered from
+PAGE_CHROME_CACHE = {}
+PAGE_CHROME_DATA = None
+
+
+def page_chrome(indexpath: str = "", include_map: bool = False) -> tuple:
+    """
+    return the shared blocks of the webout HTML files with the given index path, rendering them the first time they
+    are needed; they are rendered again if the initialization data are replaced
+    """
+    global PAGE_CHROME_DATA
+    if PAGE_CHROME_DATA is not init_data():
+        PAGE_CHROME_CACHE.clear()
+        PAGE_CHROME_DATA = init_data()
+    key = (indexpath, include_map)
+    try:
+        return PAGE_CHROME_CACHE[key]
+    except KeyError:
+        chrome = render_page_chrome(indexpath, include_map)
+        PAGE_CHROME_CACHE[key] = chrome
+        return chrome
+
+
 def common_header_part1(outfile: TextIO, title: str, indexpath: str = "") -> None:
     """
     part 1 of the common header for all webout HTML files
     """
-    outfile.write("<!DOCTYPE HTML>\n")
-    outfile.write("<html lang=\"en\">\n")
-    outfile.write("  <head>\n")
-    outfile.write("  <!-- Google tag (gtag.js) -->\n")
-    outfile.write("  <script async src=\"https://www.googletagmanager.com/gtag/js?id=G-94FNMMTWTQ\"></script>\n")
-    outfile.write("  <script>\n")
-    outfile.write("    window.dataLayer = window.dataLayer || [];\n")
-    outfile.write("    function gtag(){dataLayer.push(arguments);}\n")
-    outfile.write("    gtag('js', new Date());\n")
-    outfile.write("    gtag('config', 'G-94FNMMTWTQ');\n")
-    outfile.write("  </script>\n")
-    outfile.write("    <meta charset=\"utf-8\" />\n")
-    outfile.write("    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\" />\n")
-    outfile.write("    <title>" + remove_html(title) + "</title>\n")
-    outfile.write("    <meta name=\"description\" content=\"Fiddler Crabs\" />\n")
-    outfile.write("    <link rel=\"icon\" sizes=\"128x128\" href=\"" + indexpath +
-                  "favicon128.png\" type=\"image/png\" />\n")
-    outfile.write("    <link rel=\"icon\" sizes=\"96x96\" href=\"" + indexpath +
-                  "favicon96.png\" type=\"image/png\" />\n")
-    outfile.write("    <link rel=\"icon\" sizes=\"72x72\" href=\"" + indexpath +
-                  "favicon72.png\" type=\"image/png\" />\n")
-    outfile.write("    <link rel=\"icon\" sizes=\"48x48\" href=\"" + indexpath +
-                  "favicon48.png\" type=\"image/png\" />\n")
-    outfile.write("    <link rel=\"icon\" sizes=\"32x32\" href=\"" + indexpath +
-                  "favicon32.png\" type=\"image/png\" />\n")
-    outfile.write("    <link rel=\"icon\" sizes=\"24x24\" href=\"" + indexpath +
-                  "favicon24.png\" type=\"image/png\" />\n")
-    outfile.write("    <link rel=\"icon\" sizes=\"16x16\" href=\"" + indexpath +
-                  "favicon16.png\" type=\"image/png\" />\n")
-    outfile.write("    <link rel=\"apple-touch-icon-precomposed\" href=\"" + indexpath +
-                  "apple-touch-icon-precomposed.png\">\n")
-    outfile.write("    <link rel=\"apple-touch-icon-precomposed\" sizes=\"72x72\" "
-                  "href=\"" + indexpath + "apple-touch-icon-72x72-precomposed.png\">\n")
-    outfile.write("    <link rel=\"apple-touch-icon-precomposed\" sizes=\"114x114\" "
-                  "href=\"" + indexpath + "apple-touch-icon-114x114-precomposed.png\">\n")
-    outfile.write("    <link rel=\"apple-touch-icon-precomposed\" sizes=\"144x144\" "
-                  "href=\"" + indexpath + "apple-touch-icon-144x144-precomposed.png\">\n")
-    outfile.write("    <link rel=\"stylesheet\" href=\"" + indexpath + "uca_style.css\" />\n")
-    outfile.write("    <script defer src=\"" + indexpath + "js/solid.min.js\"></script>\n")
-    outfile.write("    <script defer src=\"" + indexpath + "js/regular.min.js\"></script>\n")
-    outfile.write("    <script defer src=\"" + indexpath + "js/brands.min.js\"></script>\n")
-    outfile.write("    <script defer src=\"" + indexpath + "js/duotone.min.js\"></script>\n")
-    outfile.write("    <script defer src=\"" + indexpath + "js/fontawesome.min.js\"></script>\n")
-    outfile.write("    <link rel=\"stylesheet\" href=\"" + indexpath +
-                  "images/flag-icon-css/css/flag-icons.min.css\" />\n")
-    outfile.write("    <link rel=\"author\" href=\"" + init_data().site_author_email + "\" />\n")
+    head_start, head_end, _, _ = page_chrome(indexpath)
+    outfile.write(head_start + remove_html(title) + head_end)
 
 
 def common_header_part2(outfile: TextIO, indexpath: str = "", include_map: bool = False) -> None:
     """
     part 2 of the common header for all webout HTML files
     """
-    outfile.write("  </head>\n")
-    outfile.write("\n")
-    if include_map:
-        outfile.write("  <body onload=\"initialize()\">\n")
-    else:
-        outfile.write("  <body>\n")
-    outfile.write("    <div id=\"skip-links\" role=\"complementary\" aria-label=\"Skip links menu\">")
-    outfile.write("<a href=\"#Main\" tabindex=\"1\">Skip to content</a></div>\n")
-    outfile.write("    <div id=\"home\">\n")
-    outfile.write("      <a href=\"" + indexpath + "index.html\" class=\"home-title\">Fiddler Crabs</a>\n")
-    outfile.write("      <a href=\"" + indexpath +
-                  "index.html\" class=\"home-link\">" + fetch_fa_glyph("home") + "Home</a>\n")
-    # outfile.write("      <a href=\"" + indexpath +
-    #               "blog\" class=\"home-link\">" + fetch_fa_glyph("blog") + "Blog</a>\n")
-    outfile.write("    </div>\n")
+    outfile.write(page_chrome(indexpath, include_map)[2])
 
 
 # def start_google_map_header(outfile: TextIO) -> None:
@@ -261,29 +481,7 @@ def common_html_footer(outfile: TextIO, indexpath: str = "") -> None:
     """
     common footer and closing elements for all webout HTML files
     """
-    outfile.write("\n")
-    outfile.write("    <footer>\n")
-    # outfile.write("       <figure id=\"footmap\"><script type=\"text/javascript\" "
-    #               "src=\"//rf.revolvermaps.com/0/0/4.js?i=5f9t1sywiez&amp;m=0&amp;h=75&amp;c=ff0000&amp;r=30\" "
-    #               "async=\"async\"></script><figcaption>Visitors</figcaption></figure>\n")
-    outfile.write(f'       <p id="citation"><a href="{indexpath + init_data().cite_url}">'
-                  f'{fetch_fa_glyph("site cite")}How to cite this site</a></p>\n')
-    outfile.write('       <p id="contact">Questions or comments about the site? Contact '
-                  f'<a href="mailto:{init_data().site_author_email}">{fetch_fa_glyph("mail")}'
-                  f'Dr. Michael S. Rosenberg</a></p>\n')
-    outfile.write(f'       <p id="copyright">Release: {init_data().version}'
-                  f' &mdash; Copyright &copy; 2003&ndash;{init_data().current_year} All Rights Reserved</p>\n')
-    # outfile.write("       <p id=\"citation\"><a href=\"" + indexpath + init_data().cite_url +
-    #               "\">" + fetch_fa_glyph("site cite") + "How to cite this site</a></p>\n")
-    # outfile.write("       <p id=\"contact\">Questions or comments about the site? Contact "
-    #               "<a href=\"mailto:" + init_data().site_author_email + "\">" + fetch_fa_glyph("mail") +
-    #               "Dr. Michael S. Rosenberg</a></p>\n")
-    # outfile.write("       <p id=\"copyright\">Release: " + init_data().version +
-    #               " &mdash; Copyright &copy; 2003&ndash;" + str(init_data().current_year) +
-    #               " All Rights Reserved</p>\n")
-    outfile.write("    </footer>\n")
-    outfile.write("  </body>\n")
-    outfile.write("</html>\n")
+    outfile.write(page_chrome(indexpath)[3])
 
 
 def start_page_division(outfile: TextIO, page_class: str) -> None:
@@ -304,7 +502,7 @@ def create_blank_index(fname: str) -> None:
     """
     create a blank index.html file for webout directories to prevent browsers from listing containing files
     """
-    with open(fname, "w") as outfile:
+    with PageWriter(fname) as outfile:
         outfile.write("<!DOCTYPE HTML>\n")
         outfile.write('<html lang="en">\n')
         outfile.write("  <head>\n")
@@ -422,10 +620,7 @@ def format_reference_cite(ref: TMB_Classes.ReferenceClass, do_print: bool, autho
     elif author_style == AUTHOR_NOPAREN:  # Smith 1900
         outstr = ref.author() + " " + ystr
     elif author_style == AUTHOR_TAXON:  # Smith, 1900
-        if ref.taxon_author is not None:  # used to avoid et al. for papers with slightly unusual authority
-            outstr = ref.taxon_author
-        else:
-            outstr = ref.author() + ", " + ystr
+        outstr = ref.taxon_authority
     else:
         outstr = ref.citation
     if ref.cite_key == "<pending>":
@@ -829,6 +1024,38 @@ def create_name_table(citelist: list) -> dict:
     return name_refs
 
 
+def create_citation_index(citelist: list) -> TMB_Classes.CitationIndex:
+    """
+    group the citations by cite key, application, actual species, context, and cleaned name for direct lookup,
+    preserving the order of the citation list within each group
+    """
+    cite_index = TMB_Classes.CitationIndex()
+    for c in citelist:
+        cite_index.by_cite_key.setdefault(c.cite_key, []).append(c)
+        cite_index.by_application.setdefault(c.application, []).append(c)
+        cite_index.by_actual.setdefault(c.actual, []).append(c)
+        cite_index.by_context.setdefault(c.context, []).append(c)
+        cite_index.by_name.setdefault(clean_name(c.name).lower(), []).append(c)
+        if (c.context == "location") or (c.context == "specimen") or (c.context == "sequence"):
+            p = c.application
+            if p not in cite_index.location_names:
+                if (p != "") and (p[0] != "["):
+                    cite_index.location_names[p] = strip_location_subtext(p)
+                else:
+                    cite_index.location_names[p] = None
+    return cite_index
+
+
+def name_key_base(x: str) -> str:
+    """
+    return the primary number of a name key, e.g., 2 for 2.1
+    """
+    if "." in x:
+        return x[:x.find(".")]
+    else:
+        return x
+
+
 def match_num_ref(x: str, y: str) -> bool:
     if (("." in x) and ("." in y)) or (("." not in x) and ("." not in y)):
         return x == y
@@ -842,17 +1069,20 @@ def compute_applied_name_contexts(citelist: list) -> None:
     """
     function to gather list of primary contexts referred to by other citation entries
     """
-    for i, cite in enumerate(citelist):
+    # earlier entries keyed by cite key and primary name number, filled as the list is walked so that only
+    # entries up to the current one can be matched
+    earlier_cites = {}
+    for cite in citelist:
         if (cite.context == "specimen") or (cite.context == "location") or (cite.context == "sequence"):
             cite.applied_cites = {cite}
         elif cite.context == "citation":
-            for j in range(i):  # only look at entries up to the current one
-                tmp = citelist[j]
-                if (tmp.cite_key == cite.application) and match_num_ref(tmp.name_key, cite.cite_n):
+            for tmp in earlier_cites.get((cite.application, name_key_base(cite.cite_n)), []):
+                if match_num_ref(tmp.name_key, cite.cite_n):
                     if (tmp.context == "specimen") or (tmp.context == "location") or (tmp.context == "sequence"):
                         cite.applied_cites |= {tmp}
         if len(cite.applied_cites) == 0:
             cite.applied_cites = None
+        earlier_cites.setdefault((cite.cite_key, name_key_base(cite.name_key)), []).append(cite)
 
         # for testing purposes only
         # if cite.applied_cites is None:
@@ -868,23 +1098,21 @@ def compute_species_from_citation_linking(citelist: list) -> None:
     function to update correct species citations through cross-references to earlier works
     """
     # for i, cite in enumerate(tqdm(citelist)):
-    unrecorded_xrefs = []
-    recorded_refs = set()
-    for i, cite in enumerate(citelist):
-        recorded_refs.add(cite.cite_key)
+    # earlier entries keyed by cite key and primary name number, filled as the list is walked so that only
+    # entries up to the current one can be matched
+    earlier_cites = {}
+    for cite in citelist:
         if cite.actual == "=":
             cname = ""
             crossnames = collections.Counter()
-            for j in range(i):  # only look at entries up to the current one
-                tmp = citelist[j]
-                if (tmp.cite_key == cite.application) and match_num_ref(tmp.name_key, cite.cite_n):
+            for tmp in earlier_cites.get((cite.application, name_key_base(cite.cite_n)), []):
+                if match_num_ref(tmp.name_key, cite.cite_n):
                     cname = tmp.name
                     crossnames.update([tmp.actual])
-            if len(crossnames) == 0:
-                unrecorded_xrefs.append([cite.cite_key, cite.application, cite.name_key, cite.cite_n])
-            elif len(crossnames) == 1:
+            # entries which cannot be matched to an earlier citation are reported by find_citation_order_errors()
+            if len(crossnames) == 1:
                 cite.actual = list(crossnames.keys())[0]
-            else:
+            elif len(crossnames) > 1:
                 # find name(s) with largest count
                 mcnt = max(crossnames.values())
                 keylist = []
@@ -912,11 +1140,7 @@ def compute_species_from_citation_linking(citelist: list) -> None:
                     cite.name_note = "in part"
                 else:
                     cite.name_note = "in part; " + cite.name_note
-
-    for x in unrecorded_xrefs:
-        if x[1] in recorded_refs:
-            report_error("Reference {} ({}) does not appear until after citation from {} ({})".format(x[1], x[3],
-                                                                                                      x[0], x[2]))
+        earlier_cites.setdefault((cite.cite_key, name_key_base(cite.name_key)), []).append(cite)
 
 
 def create_species_link(genus: str, species: str, do_print: bool, status: str = "", path: str = "") -> str:
@@ -973,6 +1197,7 @@ def create_location_link(location: TMB_Classes.LocationClass, display_name: str,
             iconstr + display_name + endstr)
 
 
+@NAME_CACHE.memoize
 def strip_location_subtext(x: str) -> str:
     """
     remove extra information from a location string when present
@@ -986,6 +1211,7 @@ def strip_location_subtext(x: str) -> str:
     return x
 
 
+@NAME_CACHE.memoize
 def format_name_string(x: str) -> str:
     """
     properly emphasize species names, but not non-name signifiers
@@ -1012,6 +1238,7 @@ def format_name_string(x: str) -> str:
         return "<em class=\"species\">" + x + "</em>"
 
 
+@NAME_CACHE.memoize
 def clean_specific_name(x: str) -> str:
     """
     function to extract the specific names from binomials
@@ -1145,9 +1372,6 @@ def output_name_table(outfile: TextIO, do_print: bool, is_name: bool, itemlist:
                                 extraref = " [" + name_table[n.application][nstr][1] + "]"
                                 refname = name_table[n.application][nstr][0]
                             except LookupError:
-                                if is_name:  # only print errors on one pass
-                                    report_error("Error in citation: " + n.cite_key + " cites" + nstr +
-                                                 " in " + n.application)
                                 extraref = ""
                                 refname = ""
                         else:
@@ -1155,8 +1379,6 @@ def output_name_table(outfile: TextIO, do_print: bool, is_name: bool, itemlist:
                             try:
                                 refname = name_table[n.application][int(nstr)]
                             except ValueError:
-                                report_error("Citation " + n.cite_key + " tried to cite " + n.application +
-                                             " #" + nstr)
                                 refname = ""
                         outfile.write("      <td>" + fetch_fa_glyph("citation") + "citation: "
                                       "<a href=\"" + rel_link_prefix(do_print, "../references/") + crossref.cite_key +
@@ -1169,8 +1391,6 @@ def output_name_table(outfile: TextIO, do_print: bool, is_name: bool, itemlist:
             else:
                 outfile.write("      <td>" + fetch_fa_glyph("citation") + "citation: " + n.application +
                               "</td>\n")
-                if is_name and not do_print:  # only print on one pass
-                    report_error("Citation not in DB: " + n.cite_key + " cites " + n.application)
         elif n.context == "specimen":
             if n.application == "?":
                 outfile.write("      <td>" + fetch_fa_glyph("specimen") + "specimen: unknown locality</td>\n")
@@ -1248,37 +1468,81 @@ def output_name_table(outfile: TextIO, do_print: bool, is_name: bool, itemlist:
     outfile.write("    </table>\n")
 
 
-def check_citation_cross_references(citelist: list, refdict: dict, name_table: dict) -> None:
-    for c in citelist:
-        if c.context == "citation":
-            if c.application in refdict:
-                if c.application in name_table:
-                    nstr = c.cite_n
-                    if nstr == "0":
-                        pass
+def find_citation_cross_reference_errors(vdata: TMB_Validate.ValidationData) -> list:
+    """
+    check that every citation of another reference points to a reference and name entry that exist
+    """
+    refdict = vdata.site_data.refdict
+    name_table = vdata.name_table
+    errors = []
+    for c in vdata.cite_index.by_context.get("citation", []):
+        if c.application in refdict:
+            if c.application in name_table:
+                nstr = c.cite_n
+                if nstr == "0":
+                    pass
+                else:
+                    if "." in nstr:
+                        try:
+                            _ = name_table[c.application][nstr][1]
+                            _ = name_table[c.application][nstr][0]
+                        except LookupError:
+                            errors.append("Error in citation: " + c.cite_key + " cites" + nstr + " in " +
+                                          c.application)
                     else:
-                        if "." in nstr:
-                            try:
-                                _ = name_table[c.application][nstr][1]
-                                _ = name_table[c.application][nstr][0]
-                            except LookupError:
-                                report_error("Error in citation: " + c.cite_key + " cites" + nstr +
-                                             " in " + c.application)
-                        else:
-                            try:
-                                _ = name_table[c.application][int(nstr)]
-                            except ValueError:
-                                report_error("Citation " + c.cite_key + " tried to cite " + c.application +
-                                             " #" + nstr + " (Value error)")
-                            except KeyError:
-                                report_error("Citation " + c.cite_key + " tried to cite " + c.application +
-                                             " #" + nstr + " (Key error)")
-            else:
-                report_error("Citation not in DB: " + c.cite_key + " cites " + c.application)
+                        try:
+                            _ = name_table[c.application][int(nstr)]
+                        except ValueError:
+                            errors.append("Citation " + c.cite_key + " tried to cite " + c.application +
+                                          " #" + nstr + " (Value error)")
+                        except KeyError:
+                            errors.append("Citation " + c.cite_key + " tried to cite " + c.application +
+                                          " #" + nstr + " (Key error)")
+        else:
+            errors.append("Citation not in DB: " + c.cite_key + " cites " + c.application)
+    return errors
 
 
-def write_reference_page(outfile: TextIO, do_print: bool, ref: TMB_Classes.ReferenceClass, citelist: list,
-                         refdict: dict, name_table: dict, point_locations: dict) -> None:
+def find_citation_order_errors(vdata: TMB_Validate.ValidationData) -> list:
+    """
+    check that every cross-referenced citation refers to an entry that appears earlier in the citation list
+    """
+    errors = []
+    earlier_cites = {}
+    for cite in vdata.site_data.citelist:
+        if cite.actual == "=":
+            if ((not any(match_num_ref(tmp.name_key, cite.cite_n)
+                         for tmp in earlier_cites.get((cite.application, name_key_base(cite.cite_n)), []))) and
+                    (cite.application in vdata.cite_keys)):
+                errors.append("Reference {} ({}) does not appear until after citation from {} "
+                              "({})".format(cite.application, cite.cite_n, cite.cite_key, cite.name_key))
+        earlier_cites.setdefault((cite.cite_key, name_key_base(cite.name_key)), []).append(cite)
+    return errors
+
+
+def find_duplicate_reference_keys(vdata: TMB_Validate.ValidationData) -> list:
+    errors = []
+    keys = set()
+    for ref in vdata.site_data.references:
+        if ref.cite_key in keys and ref.cite_key != "<pending>":
+            errors.append(f"Duplicate reference key: {ref.cite_key}")
+        keys.add(ref.cite_key)
+    return errors
+
+
+def create_reference_page_index(cite_index: TMB_Classes.CitationIndex) -> Tuple[dict, dict]:
+    """
+    group the data needed by the reference pages: the sorted names appearing in each reference, keyed by cite key,
+    and the set of cite keys citing each reference, keyed by the cited reference
+    """
+    ref_names = {key: sorted(names) for key, names in cite_index.by_cite_key.items()}
+    cited_by = {key: {c.cite_key for c in cites} for key, cites in cite_index.by_application.items()}
+    return ref_names, cited_by
+
+
+def write_reference_page(outfile: TextIO, do_print: bool, ref: TMB_Classes.ReferenceClass,
+                         cite_index: TMB_Classes.CitationIndex, ref_names: dict, cited_by: dict, refdict: dict,
+                         name_table: dict, point_locations: dict) -> None:
     """
     create output page for a reference
     """
@@ -1298,18 +1562,14 @@ def write_reference_page(outfile: TextIO, do_print: bool, ref: TMB_Classes.Refer
     outfile.write("    </header>\n")
     outfile.write("\n")
     # find names for this citation
-    names = []
-    cites_to = []
-    for c in citelist:
-        if c.cite_key == ref.cite_key:
-            names.append(c)
-        if c.application == ref.cite_key:
-            cites_to.append(c)
+    names = ref_names.get(ref.cite_key, [])
+    cites_to = cited_by.get(ref.cite_key, set())
     started_note = False
     comcnt = 0
     notecnt = 0
     uniquenames = set()
-    for n in names:
+    # notes are written in the order of the citation list, the name table in sorted order
+    for n in cite_index.by_cite_key.get(ref.cite_key, []):
         if n.general_note != ".":
             if not started_note:
                 outfile.write("    <p>\n")
@@ -1352,7 +1612,6 @@ def write_reference_page(outfile: TextIO, do_print: bool, ref: TMB_Classes.Refer
         if notecnt > 0:
             outfile.write('        <th class="notes_col">Note(s)</th>\n')
         outfile.write("      </tr>\n")
-        names.sort()
         output_name_table(outfile, do_print, False, names, uniquenames, notecnt, comcnt, refdict, name_table,
                           point_locations)
     else:
@@ -1364,17 +1623,14 @@ def write_reference_page(outfile: TextIO, do_print: bool, ref: TMB_Classes.Refer
         outfile.write('    <h3 class="nobookmark">This Publication is Cited By</h3>\n')
         outfile.write("    <p>\n")
         cs = set()
-        for c in cites_to:
-            if c.cite_key in refdict:
-                crossref = refdict[c.cite_key]
+        for cite_key in cites_to:
+            if cite_key in refdict:
+                crossref = refdict[cite_key]
                 cs |= {"<a href=\"" + rel_link_prefix(do_print) + crossref.cite_key +
                        ".html\">" + crossref.citation + "</a>"}
             else:
-                cs |= {c.cite_key}
-        cl = []
-        for x in cs:
-            cl.append(x)
-        cl.sort()
+                cs |= {cite_key}
+        cl = sorted(cs)
         outfile.write("     " + ", ".join(cl) + "\n")
         outfile.write("    </p>\n")
 
@@ -1385,20 +1641,53 @@ def write_reference_page(outfile: TextIO, do_print: bool, ref: TMB_Classes.Refer
 
 
 def write_reference_pages(printfile: Optional[TextIO], do_print: bool, reflist: list, refdict: dict,
-                          citelist: list, name_table: dict, point_locations: dict) -> None:
+                          cite_index: TMB_Classes.CitationIndex, ref_names: dict, cited_by: dict, name_table: dict,
+                          point_locations: dict) -> None:
     """
     control function to loop through creating a page for every reference
     """
-    # for ref in tqdm(reflist):
-    for ref in reflist:
-        if ref.cite_key != "<pending>":
-            if do_print and printfile is not None:
-                write_reference_page(printfile, do_print, ref, citelist, refdict, name_table, point_locations)
-            else:
-                with open(WEBOUT_PATH + "references/" + ref.cite_key + ".html", "w", encoding="utf-8") as outfile:
-                    write_reference_page(outfile, do_print, ref, citelist, refdict, name_table, point_locations)
+    if do_print and printfile is not None:
+        # for ref in tqdm(reflist):
+        for ref in reflist:
+            if ref.cite_key != "<pending>":
+                write_reference_page(printfile, do_print, ref, cite_index, ref_names, cited_by, refdict, name_table,
+                                     point_locations)
+    else:
+        model = {"refdict": refdict, "cite_index": cite_index, "ref_names": ref_names,
+                 "cited_by": cited_by, "name_table": name_table, "point_locations": point_locations}
+        # a duplicated cite key is only written once, using the last reference with that key (as in refdict)
+        cite_keys = dict.fromkeys(ref.cite_key for ref in reflist if ref.cite_key != "<pending>")
+        write_pages([(write_reference_page_file, cite_key) for cite_key in cite_keys], model)
 
 
+def record_citation_table_reads(cites: list) -> None:
+    """
+    note the records shown for each citation in a table written by output_name_table()
+    """
+    for c in cites:
+        TMB_Dependencies.record_read("reference", c.cite_key)
+        if c.context == "citation":
+            TMB_Dependencies.record_read("reference", c.application)
+            TMB_Dependencies.record_read("citations", c.application)
+        elif c.context in {"location", "specimen", "sequence"}:
+            TMB_Dependencies.record_read("location", strip_location_subtext(c.application))
+        for source in c.source.split(";"):
+            TMB_Dependencies.record_read("reference", source)
+
+
+def write_reference_page_file(model: dict, cite_key: str) -> None:
+    ref = model["refdict"][cite_key]
+    TMB_Dependencies.record_read("reference", cite_key)
+    TMB_Dependencies.record_read("citations", cite_key)
+    record_citation_table_reads(model["cite_index"].by_cite_key.get(cite_key, []))
+    for k in model["cited_by"].get(cite_key, set()):
+        TMB_Dependencies.record_read("reference", k)
+    with PageWriter(WEBOUT_PATH + "references/" + ref.cite_key + ".html", encoding="utf-8") as outfile:
+        write_reference_page(outfile, False, ref, model["cite_index"], model["ref_names"], model["cited_by"],
+                             model["refdict"], model["name_table"], model["point_locations"])
+
+
+@NAME_CACHE.memoize
 def clean_name(x: str) -> str:
     """
     function to clean up names so that variation such as punctuation does not prevent a match
@@ -1409,41 +1698,35 @@ def clean_name(x: str) -> str:
     return x
 
 
-def calculate_binomial_yearly_cnts(name: str, refdict: dict, citelist: list) -> Tuple[dict, int]:
+def calculate_binomial_yearly_cnts(binomial_names: list, name_refs: dict, refdict: dict) -> TMB_Classes.YearCounts:
+    """
+    count the number of references using each name in each year, from the set of cite keys of those references
+    """
     miny = init_data().start_year
     maxy = init_data().current_year
-    # find citations for this name
-    cites = []
-    for c in citelist:
-        clean = clean_name(c.name)
-        if clean.lower() == name.lower():
-            cites.append(c)
-    unique_cites = set()
-    for c in cites:
-        unique_cites |= {c.cite_key}
-    name_by_year = {y: 0 for y in range(miny, maxy+1)}
-    total = 0
-    for c in unique_cites:
-        y = refdict[c].year()
-        if y is not None:
-            if miny <= y <= maxy:
-                name_by_year[y] += 1
-                total += 1
-    return name_by_year, total
+    year_cnts = TMB_Classes.YearCounts(binomial_names, miny, maxy)
+    rows = []
+    years = []
+    for i, name in enumerate(binomial_names):
+        for c in name_refs[name.lower()]:
+            y = refdict[c].year()
+            if y is not None:
+                if miny <= y <= maxy:
+                    rows.append(i)
+                    years.append(y)
+    year_cnts.add(rows, years)
+    return year_cnts
 
 
-def write_binomial_name_page(outfile: TextIO, do_print: bool, name: str, namefile: str, name_by_year: dict,
-                             refdict: dict, citelist: list, name_table: dict, species_name: str, location_set: set,
-                             point_locations: dict) -> None:
+def write_binomial_name_page(outfile: TextIO, do_print: bool, name: str, namefile: str,
+                             name_by_year: TMB_Classes.YearCountView,
+                             refdict: dict, cite_index: TMB_Classes.CitationIndex, name_table: dict,
+                             species_name: str, location_set: set, point_locations: dict) -> None:
     """
     create a page listing all citations using (and other information about) a specific binomial or compound name
     """
     # find citations for this name
-    cites = []
-    for c in citelist:
-        clean = clean_name(c.name)
-        if clean.lower() == name.lower():
-            cites.append(c)
+    cites = cite_index.by_name.get(name.lower(), [])
     comcnt = 0
     notecnt = 0
     uniquecites = set()
@@ -1456,7 +1739,7 @@ def write_binomial_name_page(outfile: TextIO, do_print: bool, name: str, namefil
 
     miny = init_data().start_year
     maxy = init_data().current_year
-    maxcnt = max(name_by_year.values())
+    maxcnt = name_by_year.max()
     image_name = ""
     if do_print:
         start_page_division(outfile, "name_page")
@@ -1559,52 +1842,49 @@ def write_binomial_name_page(outfile: TextIO, do_print: bool, name: str, namefil
         common_html_footer(outfile, indexpath="../")
 
 
-def calculate_specific_name_yearly_cnts(specific_name: TMB_Classes.SpecificNameClass, binomial_names: list,
-                                        binomial_cnts: dict) -> Tuple[dict, int]:
-    miny = init_data().start_year
-    maxy = init_data().current_year
-    year_cnts = {y: 0 for y in range(miny, maxy+1)}
-    total = 0
+def create_specific_name_binomial_index(specific_names: list, binomial_names: list) -> dict:
+    """
+    map each specific name to the (cleaned) binomials whose specific name is one of its variations
+    """
+    variation_index = {}
+    for name in specific_names:
+        for v in set(name.variations.split(";")):
+            variation_index.setdefault(v, []).append(name)
+    specific_binomials = {name: [] for name in specific_names}
     for n in binomial_names:
         sp_name = clean_specific_name(n)
-        tmpnamelist = specific_name.variations.split(";")
-        if (sp_name != "") and (sp_name in tmpnamelist):
-            cnts = binomial_cnts[clean_name(n)]
-            for y in cnts:
-                if miny <= y <= maxy:
-                    year_cnts[y] += cnts[y]
-                    total += cnts[y]
-    return year_cnts, total
+        if sp_name != "":
+            for name in variation_index.get(sp_name, []):
+                specific_binomials[name].append(clean_name(n))
+    return specific_binomials
+
+
+def calculate_specific_name_yearly_cnts(specific_names: list, specific_binomials: dict,
+                                        binomial_cnts: TMB_Classes.YearCounts) -> TMB_Classes.YearCounts:
+    """
+    the yearly counts of each specific name are the sum of the counts of its binomials
+    """
+    year_cnts = TMB_Classes.YearCounts([name.name for name in specific_names], binomial_cnts.miny, binomial_cnts.maxy)
+    for i, name in enumerate(specific_names):
+        year_cnts.counts[i] = binomial_cnts.counts[binomial_cnts.rows(specific_binomials[name])].sum(axis=0)
+    return year_cnts
 
 
-def calculate_specific_locations(specific_name: TMB_Classes.SpecificNameClass, binomial_names: list,
-                                 binomial_locations: dict) -> set:
+def calculate_specific_locations(specific_binomials: list, binomial_locations: dict) -> set:
     locs = set()
-    for n in binomial_names:
-        sp_name = clean_specific_name(n)
-        tmpnamelist = specific_name.variations.split(";")
-        if (sp_name != "") and (sp_name in tmpnamelist):
-            locs |= binomial_locations[clean_name(n)]
+    for n in specific_binomials:
+        locs |= binomial_locations[n]
     return locs
 
 
 def write_specific_name_page(outfile: TextIO, do_print: bool, specific_name: TMB_Classes.SpecificNameClass,
-                             binomial_names: list, refdict: dict, binomial_cnts: dict, location_set: set) -> None:
+                             byears: TMB_Classes.YearCountView, refdict: dict, location_set: set) -> None:
     """
     create a page with the history of a specific name
     """
     miny = init_data().start_year
     maxy = init_data().current_year
-    byears = {y: 0 for y in range(miny, maxy + 1)}
-    for n in binomial_names:
-        sp_name = clean_specific_name(n)
-        tmpnamelist = specific_name.variations.split(";")
-        if (sp_name != "") and (sp_name in tmpnamelist):
-            cnts = binomial_cnts[clean_name(n)]
-            for y in cnts:
-                if miny <= y <= maxy:
-                    byears[y] += cnts[y]
-    maxcnt = max(byears.values())
+    maxcnt = byears.max()
     image_name = ""
     if do_print:
         start_page_division(outfile, "base_page")
@@ -1820,7 +2100,8 @@ def write_chronology_chart_div(outfile: TextIO, do_print: bool, n: Union[str, in
 
 
 def create_synonym_chronology(outfile: TextIO, do_print: bool, species_name: str, binomial_synlist: list,
-                              binomial_name_counts: dict, specific_synlist: list, specific_name_counts: dict) -> None:
+                              binomial_name_counts: TMB_Classes.YearCounts, specific_synlist: list,
+                              specific_name_counts: TMB_Classes.YearCounts) -> None:
     """
     create a page with the chronological history of a specific name and its synonyms
     """
@@ -1828,15 +2109,9 @@ def create_synonym_chronology(outfile: TextIO, do_print: bool, species_name: str
     maxy = init_data().current_year
     # --all totals and specific names--
     # find max count across all synonyms
-    name_cnts = []
-    total_cnts = {y: 0 for y in range(miny, maxy + 1)}
-    for name in specific_synlist:
-        cnts = specific_name_counts[name]
-        for y in cnts:
-            total_cnts[y] += cnts[y]
-        total = sum(cnts.values())
-        name_cnts.append([total, name])
-    maxcnt = max(total_cnts.values())
+    total_cnts = specific_name_counts.sum_of(specific_synlist)
+    maxcnt = total_cnts.max()
+    name_cnts = [[specific_name_counts[name].total(), name] for name in specific_synlist]
     name_cnts.sort(reverse=True)
     # put accepted name first, followed by the rest in decreasing frequency
     sp_order = [species_name]
@@ -1850,10 +2125,8 @@ def create_synonym_chronology(outfile: TextIO, do_print: bool, species_name: str
     name_cnts = []
     for name in binomial_synlist:
         cnts = binomial_name_counts[clean_name(name)]
-        tmpmax = max(cnts.values())
-        bmaxcnt = int(max(bmaxcnt, tmpmax))  # technically unnecessary but prevents type warning
-        total = sum(cnts.values())
-        name_cnts.append([total, name])
+        bmaxcnt = max(bmaxcnt, cnts.max())
+        name_cnts.append([cnts.total(), name])
     name_cnts.sort(reverse=True)
     # put accepted name first, followed by the rest in decreasing frequency
     species = find_species_by_name(species_name)
@@ -1938,7 +2211,37 @@ def create_synonym_chronology(outfile: TextIO, do_print: bool, species_name: str
         common_html_footer(outfile, indexpath="../")
 
 
-def match_specific_name(name: str, specific_names: list) -> str:
+def create_species_synonym_index(specific_names: list, all_names: list) -> dict:
+    """
+    create a dictionary keyed by species name of the (binomial synonyms, specific synonyms) of each species
+    """
+    binomials_by_specific = {}
+    for uname in all_names:
+        binomials_by_specific.setdefault(clean_specific_name(uname), []).append(uname)
+    species_synonyms = {}
+    for spname in specific_names:
+        binomial_synlist, specific_synlist = species_synonyms.setdefault(spname.synonym, ([], []))
+        for varname in spname.variations.split(";"):
+            binomial_synlist.extend(binomials_by_specific.get(varname, []))
+        specific_synlist.append(spname.name)
+    for binomial_synlist, _ in species_synonyms.values():
+        binomial_synlist.sort(key=lambda s: s.lower())
+    return species_synonyms
+
+
+def create_specific_name_match_index(specific_names: list) -> dict:
+    """
+    map every variation of every specific name to the accepted specific name it belongs to (the last one listed,
+    if a variation belongs to more than one)
+    """
+    match_index = {}
+    for x in specific_names:
+        for v in x.variations.split(";"):
+            match_index[v] = x.name
+    return match_index
+
+
+def match_specific_name(name: str, match_index: dict) -> str:
     """
     match the specific name from a binomial to the list of accepted specific names
     """
@@ -1946,12 +2249,7 @@ def match_specific_name(name: str, specific_names: list) -> str:
     if c == "":
         return c
     else:
-        y = ""
-        for x in specific_names:
-            matchlist = x.variations.split(";")
-            if c in matchlist:
-                y = x.name
-        return y
+        return match_index.get(c, "")
 
 
 def create_name_summary(outfile: TextIO, do_print: bool, binomial_year_cnts: dict, specific_year_cnts: dict,
@@ -2191,7 +2489,7 @@ def extract_genus(name: str) -> str:
         return name
 
 
-def create_genus_chronology(outfile: TextIO, do_print: bool, genus_cnts: dict) -> None:
+def create_genus_chronology(outfile: TextIO, do_print: bool, genus_cnts: TMB_Classes.YearCounts) -> None:
     """
     create a page with the chronological history of the genera
     """
@@ -2199,18 +2497,9 @@ def create_genus_chronology(outfile: TextIO, do_print: bool, genus_cnts: dict) -
     maxy = init_data().current_year
     # --all totals and specific names--
     # find max count across all synonyms
-    maxcnt = 0
-    name_cnts = []
-    total_cnts = {y: 0 for y in range(miny, maxy + 1)}
-    for name in genus_cnts:
-        cnts = genus_cnts[name]
-        for y in cnts:
-            total_cnts[y] += cnts[y]
-        tmpmax = max(cnts.values())
-        maxcnt = max(maxcnt, tmpmax)
-        total = sum(cnts.values())
-        name_cnts.append([total, name])
-    maxcnt = max(total_cnts.values())
+    total_cnts = genus_cnts.sum_of(list(genus_cnts))
+    maxcnt = total_cnts.max()
+    name_cnts = [[total, name] for name, total in zip(genus_cnts, genus_cnts.totals())]
     name_cnts.sort(reverse=True)
     # put accepted name first, followed by the rest in decreasing frequency
     order = [x[1] for x in name_cnts]
@@ -2268,22 +2557,6 @@ def create_genus_chronology(outfile: TextIO, do_print: bool, genus_cnts: dict) -
         common_html_footer(outfile, indexpath="../")
 
 
-def calculate_binomial_locations(name: str, citelist: list) -> set:
-    """
-    find all locations this name is applied to
-    """
-    locs = set()
-    for c in citelist:
-        clean = clean_name(c.name)
-        if clean.lower() == name.lower():
-            if c.applied_cites is not None:
-                for a in c.applied_cites:
-                    p = a.application
-                    if (p != ".") and (p[0] != "[") and (p != "?"):
-                        locs |= {strip_location_subtext(p)}
-    return locs
-
-
 def clean_genus(genus: str) -> str:
     """
     fix and match alternate genus spellings when performing summaries
@@ -2302,9 +2575,9 @@ def clean_genus(genus: str) -> str:
         return genus
 
 
-def calculate_name_index_data(refdict: dict, citelist: list, specific_names: list) -> Tuple[list, dict, dict, dict,
-                                                                                            dict, dict, dict, dict,
-                                                                                            dict, dict]:
+def calculate_name_index_data(refdict: dict, citelist: list,
+                              specific_names: list) -> Tuple[list, dict, dict, dict, dict, dict, dict, dict, dict,
+                                                             dict]:
     """
     calculate all the data associated with binomials and specific names
     """
@@ -2312,26 +2585,34 @@ def calculate_name_index_data(refdict: dict, citelist: list, specific_names: lis
     unique_names = list()
     nameset = set()
     total_binomial_year_cnts = collections.Counter()
+    # a single pass through the citations collects, for every cleaned name (lower case), the cite keys of the
+    # references using it and the locations it was applied to, as well as the genera used in each paper
+    name_refs = {}
+    name_locations = {}
+    genera_per_paper = {}
     for c in citelist:
+        clean = clean_name(c.name)
+        name_key = clean.lower()
+        name_refs.setdefault(name_key, set()).add(c.cite_key)
+        locs = name_locations.setdefault(name_key, set())
+        if c.applied_cites is not None:
+            for a in c.applied_cites:
+                p = a.application
+                if (p != ".") and (p[0] != "[") and (p != "?"):
+                    locs.add(strip_location_subtext(p))
         if c.name != ".":
-            clean = clean_name(c.name)
-            if not clean.lower() in nameset:
-                nameset |= {clean.lower()}
+            if name_key not in nameset:
+                nameset.add(name_key)
                 unique_names.append(clean)
                 y = refdict[c.cite_key].year()
                 if y is not None:
                     total_binomial_year_cnts.update([y])
+            genera_per_paper.setdefault(c.cite_key, set()).add(extract_genus(clean))
     unique_names.sort(key=lambda s: s.lower())
 
-    # identify genera used per paper
-    genera_per_paper = {}
-    for c in citelist:
-        if c.name != ".":
-            if c.cite_key not in genera_per_paper:
-                genera_per_paper[c.cite_key] = set()
-            genera_set = genera_per_paper[c.cite_key]
-            genera_set |= {extract_genus(clean_name(c.name))}
-    genus_cnts = {}
+    genus_rows = {}
+    rows = []
+    years = []
     for c in genera_per_paper:
         y = refdict[c].year()
         if y is not None:
@@ -2340,28 +2621,29 @@ def calculate_name_index_data(refdict: dict, citelist: list, specific_names: lis
                 for genus in genera_set:
                     genus = clean_genus(genus)
                     if genus != "":
-                        genus_cnts.setdefault(genus, {y: 0 for y in range(init_data().start_year,
-                                                                          init_data().current_year + 1)})[y] += 1
+                        rows.append(genus_rows.setdefault(genus, len(genus_rows)))
+                        years.append(y)
+    genus_cnts = TMB_Classes.YearCounts(list(genus_rows), init_data().start_year, init_data().current_year)
+    genus_cnts.add(rows, years)
 
-    binomial_usage_cnts_by_year = {}
+    binomial_usage_cnts_by_year = calculate_binomial_yearly_cnts(unique_names, name_refs, refdict)
     binomial_location_applications = {}
     binomial_usage_cnts = {}
-    for name in unique_names:
-        binomial_usage_cnts_by_year[name], tmptotal = calculate_binomial_yearly_cnts(name, refdict, citelist)
+    for name, tmptotal in zip(unique_names, binomial_usage_cnts_by_year.totals()):
         if tmptotal > 0:
             binomial_usage_cnts[name] = tmptotal
-        binomial_location_applications[name] = calculate_binomial_locations(name, citelist)
+        binomial_location_applications[name] = name_locations[name.lower()]
 
     specific_year_cnts = collections.Counter()
-    specific_usage_cnts_by_year = {}
     specific_location_applications = {}
     specific_usage_cnts = {}
-    for name in specific_names:
-        (specific_usage_cnts_by_year[name.name],
-         tmptotal) = calculate_specific_name_yearly_cnts(name, unique_names, binomial_usage_cnts_by_year)
+    specific_binomials = create_specific_name_binomial_index(specific_names, unique_names)
+    specific_usage_cnts_by_year = calculate_specific_name_yearly_cnts(specific_names, specific_binomials,
+                                                                      binomial_usage_cnts_by_year)
+    for name, tmptotal in zip(specific_names, specific_usage_cnts_by_year.totals()):
         if tmptotal > 0:
             specific_usage_cnts[name.name] = tmptotal
-        specific_location_applications[name] = calculate_specific_locations(name, unique_names,
+        specific_location_applications[name] = calculate_specific_locations(specific_binomials[name],
                                                                             binomial_location_applications)
         tmpkey = name.priority_source
         if tmpkey != ".":
@@ -2373,10 +2655,13 @@ def calculate_name_index_data(refdict: dict, citelist: list, specific_names: lis
             binomial_usage_cnts, specific_usage_cnts)
 
 
-def write_all_name_pages(outfile: TextIO, do_print: bool, refdict: dict, citelist: list, unique_names: list,
-                         specific_names: list, name_table: dict, species_refs: dict, genus_cnts: dict,
-                         binomial_usage_cnts_by_year: dict, total_binomial_year_cnts: dict, binomial_locations: dict,
-                         specific_locations: dict, point_locations: dict) -> None:
+def write_all_name_pages(outfile: TextIO, do_print: bool, refdict: dict, cite_index: TMB_Classes.CitationIndex,
+                         unique_names: list,
+                         specific_names: list, name_table: dict, species_refs: dict,
+                         genus_cnts: TMB_Classes.YearCounts,
+                         binomial_usage_cnts_by_year: TMB_Classes.YearCounts,
+                         specific_usage_cnts_by_year: TMB_Classes.YearCounts, total_binomial_year_cnts: dict,
+                         binomial_locations: dict, specific_locations: dict, point_locations: dict) -> None:
     """
     create an index of binomials and specific names
     """
@@ -2447,56 +2732,72 @@ def write_all_name_pages(outfile: TextIO, do_print: bool, refdict: dict, citelis
         create_name_summary(outfile, do_print, total_binomial_year_cnts, specific_year_cnts, species_refs)
         create_genus_chronology(outfile, do_print, genus_cnts)
     else:
-        with open(WEBOUT_PATH + "names/" + init_data().name_sum_url, "w", encoding="utf-8") as suboutfile:
+        with PageWriter(WEBOUT_PATH + "names/" + init_data().name_sum_url, encoding="utf-8") as suboutfile:
             create_name_summary(suboutfile, do_print, total_binomial_year_cnts, specific_year_cnts, species_refs)
-        with open(WEBOUT_PATH + "names/" + init_data().synonyms_genera, "w", encoding="utf-8") as suboutfile:
+        with PageWriter(WEBOUT_PATH + "names/" + init_data().synonyms_genera, encoding="utf-8") as suboutfile:
             create_genus_chronology(suboutfile, do_print, genus_cnts)
 
     # write out individual pages for each binomial name and specific name
     print("..........Unique/Binomial Names..........")
-    # for name in tqdm(unique_names):
-    for name in unique_names:
-        sname = match_specific_name(name, specific_names)
-        namefile = name_to_filename(name)
-        if do_print:
+    match_index = create_specific_name_match_index(specific_names)
+    if do_print:
+        # for name in tqdm(unique_names):
+        for name in unique_names:
+            sname = match_specific_name(name, match_index)
+            namefile = name_to_filename(name)
             write_binomial_name_page(outfile, True, name, namefile, binomial_usage_cnts_by_year[name], refdict,
-                                     citelist, name_table, sname, binomial_locations[name], point_locations)
-        else:
-            with open(WEBOUT_PATH + "names/" + namefile + ".html", "w", encoding="utf-8") as suboutfile:
-                write_binomial_name_page(suboutfile, False, name, namefile, binomial_usage_cnts_by_year[name], refdict,
-                                         citelist, name_table, sname, binomial_locations[name], point_locations)
+                                     cite_index, name_table, sname, binomial_locations[name], point_locations)
+    else:
+        model = {"refdict": refdict, "cite_index": cite_index, "name_table": name_table,
+                 "binomial_usage_cnts_by_year": binomial_usage_cnts_by_year, "binomial_locations": binomial_locations,
+                 "point_locations": point_locations,
+                 "specific_usage_cnts_by_year": specific_usage_cnts_by_year, "specific_locations": specific_locations}
+        write_pages([(write_binomial_name_page_file, name, match_specific_name(name, match_index))
+                     for name in unique_names], model)
     print("..........Specific Names..........")
-    # for name in tqdm(specific_names):
-    for name in specific_names:
-        if do_print:
-            write_specific_name_page(outfile, True, name, unique_names, refdict, binomial_usage_cnts_by_year,
+    if do_print:
+        # for name in tqdm(specific_names):
+        for name in specific_names:
+            write_specific_name_page(outfile, True, name, specific_usage_cnts_by_year[name.name], refdict,
                                      specific_locations[name])
-        else:
-            with open(WEBOUT_PATH + "names/sn_" + name.name + ".html", "w", encoding="utf-8") as suboutfile:
-                write_specific_name_page(suboutfile, False, name, unique_names, refdict, binomial_usage_cnts_by_year,
-                                         specific_locations[name])
+    else:
+        model["specific_name_dict"] = {name.name: name for name in specific_names}
+        write_pages([(write_specific_name_page_file, name.name) for name in specific_names], model)
+
+
+def write_binomial_name_page_file(model: dict, name: str, sname: str) -> None:
+    namefile = name_to_filename(name)
+    TMB_Dependencies.record_read("name", name)
+    if sname != "":
+        TMB_Dependencies.record_read("specific_name", sname)
+    record_citation_table_reads(model["cite_index"].by_name.get(name.lower(), []))
+    with PageWriter(WEBOUT_PATH + "names/" + namefile + ".html", encoding="utf-8") as outfile:
+        write_binomial_name_page(outfile, False, name, namefile, model["binomial_usage_cnts_by_year"][name],
+                                 model["refdict"], model["cite_index"], model["name_table"], sname,
+                                 model["binomial_locations"][name], model["point_locations"])
+
+
+def write_specific_name_page_file(model: dict, sname: str) -> None:
+    name = model["specific_name_dict"][sname]
+    TMB_Dependencies.record_read("specific_name", sname)
+    TMB_Dependencies.record_read("reference", name.priority_source)
+    with PageWriter(WEBOUT_PATH + "names/sn_" + name.name + ".html", encoding="utf-8") as outfile:
+        write_specific_name_page(outfile, False, name, model["specific_usage_cnts_by_year"][name.name],
+                                 model["refdict"], model["specific_locations"][name])
 
 
-def check_specific_names(citelist: list, specific_names: list) -> None:
+def find_missing_specific_names(vdata: TMB_Validate.ValidationData) -> list:
     """
     checks all specific names used to confirm they are accounted for in the full synonymy list
     """
-    unique_names = list()
-    nameset = set()
-    for c in citelist:
+    unique_names = set()
+    for c in vdata.site_data.citelist:
         if c.name != ".":
-            clean = clean_specific_name(c.name)
-            if (not (clean in nameset)) and (clean != ""):
-                nameset |= {clean}
-                unique_names.append(clean)
-    unique_names.sort()
-    for n in unique_names:
-        is_found = False
-        for s in specific_names:
-            if n in s.variations:
-                is_found = True
-        if not is_found:
-            report_error("Missing specific name: " + n)
+            unique_names.add(clean_specific_name(c.name))
+    unique_names.discard("")
+    # the variations of all specific names joined into a single string, which cannot match across entries
+    all_variations = "\n".join(s.variations for s in vdata.site_data.specific_names)
+    return ["Missing specific name: " + n for n in sorted(unique_names) if n not in all_variations]
 
 
 def create_all_taxonomic_keys(point_locations: dict, location_species: dict, location_range_species: dict,
@@ -2757,30 +3058,23 @@ def write_geography_page(outfile: TextIO, do_print: bool, species: list) -> None
 def create_location_hierarchy(point_locations: dict) -> dict:
     """
     go through all locations and add children to the parent locations
+
+    missing parents and duplicate names are reported by find_location_hierarchy_errors()
     """
     loc_dict = {}
     for p in point_locations:
         loc = point_locations[p]
-        if loc.parent is not None:
-            if loc.parent in point_locations:
-                ploc = point_locations[loc.parent]
-                ploc.children.append(loc)
-            else:
-                report_error("Location missing: " + loc.parent)
+        if (loc.parent is not None) and (loc.parent in point_locations):
+            ploc = point_locations[loc.parent]
+            ploc.children.append(loc)
         for sp in loc.secondary_parents:
             if sp in point_locations:
                 ploc = point_locations[sp]
                 ploc.secondary_children.append(loc)
-            else:
-                report_error("Location missing: " + sp)
-        if loc.trimmed_name in loc_dict:
-            report_error("Duplicate trimmed location name: " + loc.trimmed_name)
-        else:
+        if loc.trimmed_name not in loc_dict:
             loc_dict[loc.trimmed_name] = loc
         for a in loc.alternates:
-            if a in loc_dict:
-                report_error("Duplicate trimmed location name: " + a)
-            else:
+            if a not in loc_dict:
                 loc_dict[a] = loc
     return loc_dict
 
@@ -2958,13 +3252,11 @@ def write_location_page(outfile: TextIO, do_print: bool, loc: TMB_Classes.Locati
     range_species -= all_species
     all_species |= range_species
 
-    is_error = True
     print_star = False
     print_double = False
     outfile.write("  <section class=\"spsection\">\n")
     outfile.write("    <h3 class=\"nobookmark\">Currently Recognized Species</h3>\n")
     if len(all_species) > 0:
-        is_error = False
         outfile.write("    <ul class=\"locpagelist\">\n")
         for s in sorted(list(all_species)):
             if s in location_species[loc.name]:
@@ -2984,7 +3276,6 @@ def write_location_page(outfile: TextIO, do_print: bool, loc: TMB_Classes.Locati
     outfile.write("  </section>\n")
 
     if len(all_bi_names) > 0:
-        is_error = False
         outfile.write("  <section class=\"spsection\">\n")
         outfile.write("    <h3 class=\"nobookmark\">Names Which Have Been Used for This Area</h3>\n")
         outfile.write("    <ul class=\"locpagelist\">\n")
@@ -3000,7 +3291,6 @@ def write_location_page(outfile: TextIO, do_print: bool, loc: TMB_Classes.Locati
         outfile.write("  </section>\n")
 
     if len(all_sp_names) > 0:
-        is_error = False
         outfile.write("  <section class=\"spsection\">\n")
         outfile.write("    <h3 class=\"nobookmark\">Specific Names Which Have Been Used for This Area</h3>\n")
         outfile.write("    <ul class=\"locpagelist\">\n")
@@ -3015,10 +3305,6 @@ def write_location_page(outfile: TextIO, do_print: bool, loc: TMB_Classes.Locati
         outfile.write("    </ul>\n")
         outfile.write("  </section>\n")
 
-    # the following is to identify locations which may no longer used in the DB and can be removed
-    if is_error:
-        report_error("Phantom Location: " + loc.name)
-
     write_annotated_reference_list(outfile, do_print, references, all_refs, location_direct_refs[loc.name],
                                    location_cited_refs[loc.name], "../")
 
@@ -3044,8 +3330,8 @@ def write_location_page(outfile: TextIO, do_print: bool, loc: TMB_Classes.Locati
         if do_print:
             write_taxonomic_key(outfile, do_print, location_keys[frozenset(all_species)], loc)
         else:
-            with open(WEBOUT_PATH + "locations/keys/" + place_to_filename(loc.name) + "_taxkey.html", "w",
-                      encoding="utf-8") as suboutfile:
+            with PageWriter(WEBOUT_PATH + "locations/keys/" + place_to_filename(loc.name) + "_taxkey.html",
+                            encoding="utf-8") as suboutfile:
                 write_taxonomic_key(suboutfile, do_print, location_keys[frozenset(all_species)], loc)
 
     # write out children pages (primary children only)
@@ -3056,8 +3342,8 @@ def write_location_page(outfile: TextIO, do_print: bool, loc: TMB_Classes.Locati
                                     location_sp_names, location_direct_refs, location_cited_refs, references,
                                     locations_range_species, location_keys, field_guide_data)
             else:
-                with open(WEBOUT_PATH + "locations/" + place_to_filename(c.name) + ".html", "w",
-                          encoding="utf-8") as suboutfile:
+                with PageWriter(WEBOUT_PATH + "locations/" + place_to_filename(c.name) + ".html",
+                                encoding="utf-8") as suboutfile:
                     write_location_page(suboutfile, do_print, c, point_locations, location_species, location_bi_names,
                                         location_sp_names, location_direct_refs, location_cited_refs, references,
                                         locations_range_species, location_keys, field_guide_data)
@@ -3179,9 +3465,9 @@ def write_location_index(outfile: TextIO, do_print: bool, point_locations: dict,
         #     write_taxonomic_key_guide(outfile, do_print)
         #     write_taxonomic_key(outfile, do_print, location_keys["all"], None)
         # else:
-        #     with open(WEBOUT_PATH + "locations/keys/index.html", "w", encoding="utf-8") as suboutfile:
+        #     with PageWriter(WEBOUT_PATH + "locations/keys/index.html", encoding="utf-8") as suboutfile:
         #         write_taxonomic_key_guide(suboutfile, do_print)
-        #     with open(WEBOUT_PATH + "locations/keys/all_taxkey.html", "w", encoding="utf-8") as suboutfile:
+        #     with PageWriter(WEBOUT_PATH + "locations/keys/all_taxkey.html", encoding="utf-8") as suboutfile:
         #         write_taxonomic_key(suboutfile, do_print, location_keys["all"], None)
 
     # for p in tqdm(top_list):
@@ -3192,54 +3478,107 @@ def write_location_index(outfile: TextIO, do_print: bool, point_locations: dict,
                                 location_sp_names, location_direct_refs, location_cited_refs, references,
                                 location_range_species, location_keys, field_guide_data)
         else:
-            with open(WEBOUT_PATH + "locations/" + place_to_filename(loc.name) + ".html", "w",
-                      encoding="utf-8") as suboutfile:
+            with PageWriter(WEBOUT_PATH + "locations/" + place_to_filename(loc.name) + ".html",
+                            encoding="utf-8") as suboutfile:
                 write_location_page(suboutfile, do_print, loc, point_locations, location_species, location_bi_names,
                                     location_sp_names, location_direct_refs, location_cited_refs, references,
                                     location_range_species, location_keys, field_guide_data)
 
 
-def check_location_page(loc: TMB_Classes.LocationClass, location_species: dict, location_bi_names: dict,
-                        location_sp_names: dict) -> None:
+def find_location_hierarchy_errors(vdata: TMB_Validate.ValidationData) -> list:
     """
-    check the output page for an individual location
+    check that every parent location exists and that no trimmed location name or alias is used twice
     """
-    all_species = set()
-    all_species |= location_species[loc.name]
-    all_bi_names = set()
-    all_bi_names |= location_bi_names[loc.name]
-    all_sp_names = set()
-    all_sp_names |= location_sp_names[loc.name]
-    if loc.n_direct_children() > 0:
-        for c in loc.direct_children():
-            all_species |= fetch_child_data(c, location_species)
-            all_bi_names |= fetch_child_data(c, location_bi_names)
-            all_sp_names |= fetch_child_data(c, location_sp_names)
+    point_locations = vdata.site_data.point_locations
+    errors = []
+    names = set()
+    for loc in point_locations.values():
+        if (loc.parent is not None) and (loc.parent not in point_locations):
+            errors.append("Location missing: " + loc.parent)
+        for sp in loc.secondary_parents:
+            if sp not in point_locations:
+                errors.append("Location missing: " + sp)
+        if loc.trimmed_name in names:
+            errors.append("Duplicate trimmed location name: " + loc.trimmed_name)
+        else:
+            names.add(loc.trimmed_name)
+        for a in loc.alternates:
+            if a in names:
+                errors.append("Duplicate trimmed location name: " + a)
+            else:
+                names.add(a)
+    return errors
 
-    # if (len(all_species) == 0) and (len(all_bi_names) == 0) and (len(all_sp_names) == 0):
-    #     report_error("Phantom Location: " + loc.name)
 
-    if loc.n_children() > 0:
-        for c in loc.children:
-            check_location_page(c, location_species, location_bi_names, location_sp_names)
+def find_missing_point_locations(vdata: TMB_Validate.ValidationData) -> list:
+    """
+    check that every location applied to a species or name is in the location list
+    """
+    point_locations = vdata.site_data.point_locations
+    missing_set = set()
+    for s in vdata.site_data.species:
+        if s.status != "fossil":
+            for c in vdata.cite_index.by_actual.get(s.species, []):
+                if (c.context == "location") or (c.context == "specimen") or (c.context == "sequence"):
+                    p = vdata.cite_index.location_names[c.application]
+                    if (p is not None) and (p not in point_locations) and (p != "?"):
+                        missing_set.add(p)
+    for point_set in list(vdata.binomial_point_locations.values()) + list(vdata.specific_point_locations.values()):
+        for p in point_set:
+            if (p not in point_locations) and (p != "?"):
+                missing_set.add(p)
+    return ["Missing point location: " + m for m in sorted(missing_set)]
 
 
-def check_location_index(point_locations: dict, location_species: dict, location_sp_names: dict,
-                         location_bi_names: dict) -> None:
-    top_list = []
-    for p in point_locations:
-        loc = point_locations[p]
-        if loc.parent is None:
-            top_list.append(loc.name)
-    top_list.sort()
+def find_phantom_locations(vdata: TMB_Validate.ValidationData) -> list:
+    """
+    find locations which no longer have any species or names associated with them, either directly, through their
+    sublocations, or through the species ranges
+    """
+    has_data = {}
 
-    for p in top_list:
-        loc = point_locations[p]
-        check_location_page(loc, location_species, location_bi_names, location_sp_names)
+    def location_has_data(loc: TMB_Classes.LocationClass) -> bool:
+        if loc.name not in has_data:
+            has_data[loc.name] = ((len(vdata.location_species[loc.name]) > 0) or
+                                  (len(vdata.location_bi_names[loc.name]) > 0) or
+                                  (len(vdata.location_sp_names[loc.name]) > 0) or
+                                  any(location_has_data(c) for c in loc.direct_children()))
+        return has_data[loc.name]
+
+    return ["Phantom Location: " + name for name, loc in sorted(vdata.site_data.point_locations.items())
+            if (not location_has_data(loc)) and (len(vdata.location_range_species[loc]) == 0)]
+
+
+# all independent data checks, in the order they are listed in the report
+DATA_CHECKS = {
+    "duplicate reference keys": find_duplicate_reference_keys,
+    "citation order": find_citation_order_errors,
+    "citation cross-references": find_citation_cross_reference_errors,
+    "specific names": find_missing_specific_names,
+    "location hierarchy": find_location_hierarchy_errors,
+    "missing point locations": find_missing_point_locations,
+    "phantom locations": find_phantom_locations
+}
+
+
+def validate_site_data(vdata: TMB_Validate.ValidationData, checks: Optional[dict] = None,
+                       json_file: Optional[str] = None) -> TMB_Validate.ValidationReport:
+    """
+    run the data checks (all of them by default), write their errors to the error log and optionally write the
+    full report to a JSON file
+    """
+    if checks is None:
+        checks = DATA_CHECKS
+    report = TMB_Validate.run_checks(checks, vdata)
+    report.report_errors()
+    if json_file is not None:
+        report.write_json(json_file)
+    return report
 
 
 def match_names_to_locations(species: list, specific_point_locations: dict,  binomial_point_locations: dict,
-                             point_locations: dict, citelist: list) -> Tuple[dict, dict, dict, dict, dict, dict,  dict,
+                             point_locations: dict, citelist: list,
+                             cite_index: TMB_Classes.CitationIndex) -> Tuple[dict, dict, dict, dict, dict, dict, dict,
                                                                              dict, dict, dict]:
     species_plot_locations = {}
     invalid_species_locations = {}
@@ -3249,57 +3588,47 @@ def match_names_to_locations(species: list, specific_point_locations: dict,  bin
     location_sp_names = {x: set() for x in point_locations}
     location_cited_refs = {x: set() for x in point_locations}
     location_direct_refs = {x: set() for x in point_locations}
-    missing_set = set()
+    location_names = cite_index.location_names
+    living_species = {s.species: s for s in species if s.status != "fossil"}
+    places = {s: set() for s in living_species.values()}
+    invalid_places = {s: set() for s in living_species.values()}
+    questionable_ids = {s: set() for s in living_species.values()}
+    good_ids = {s: set() for s in living_species.values()}
+
+    # a single pass through the citations, matching species and references to each location
+    for c in citelist:
+        if (c.context == "location") or (c.context == "specimen") or (c.context == "sequence"):
+            p = location_names[c.application]
+            if p is not None:
+                if p in point_locations:
+                    location_direct_refs[p] |= {c.cite_key}
+                s = living_species.get(c.actual)
+                if s is not None:
+                    if p in point_locations:
+                        places[s].add(p)
+                        if "<!>" in c.application:
+                            invalid_places[s].add(p)
+                        elif "<?>" in c.application:
+                            questionable_ids[s].add(p)
+                        else:
+                            good_ids[s].add(p)
+                            location_species[p] |= {s}
+        if c.applied_cites is not None:
+            for a in c.applied_cites:
+                loc = location_names[a.application]
+                if (loc is not None) and (loc in point_locations):
+                    location_cited_refs[loc] |= {c.cite_key}
+
     for s in species:
         if s.status != "fossil":
-            places = set()
-            invalid_places = set()
-            questionable_ids = set()
-            good_ids = set()
-            for c in citelist:
-                if (c.actual == s.species) and ((c.context == "location") or
-                                                (c.context == "specimen") or
-                                                (c.context == "sequence")):
-                    p = c.application
-                    if p[0] != "[":
-                        p = strip_location_subtext(p)
-                        if p in point_locations:
-                            places.add(p)
-                            # location_species[p] |= {s}
-                            if "<!>" in c.application:
-                                invalid_places.add(p)
-                            elif "<?>" in c.application:
-                                questionable_ids.add(p)
-                            else:
-                                good_ids.add(p)
-                                location_species[p] |= {s}
-                        elif p != "?":
-                            missing_set |= {p}
-            species_plot_locations[s] = sorted(list(places))
-            invalid_species_locations[s] = invalid_places
-            questionable_id_locations[s] = questionable_ids - good_ids
+            species_plot_locations[s] = sorted(list(places[s]))
+            invalid_species_locations[s] = invalid_places[s]
+            questionable_id_locations[s] = questionable_ids[s] - good_ids[s]
         else:
             species_plot_locations[s] = None
             invalid_species_locations[s] = None
             questionable_id_locations[s] = None
 
-    # create set of all citations that refer to each location
-    for c in citelist:
-        if (c.context == "location") or (c.context == "specimen") or (c.context == "sequence"):
-            p = c.application
-            if (p != ".") and (p[0] != "[") and (p != "?"):
-                loc = strip_location_subtext(p)
-                if loc in point_locations:
-                    location_direct_refs[loc] |= {c.cite_key}
-    for c in citelist:
-        if c.applied_cites is not None:
-            for a in c.applied_cites:
-                p = a.application
-                if (p != ".") and (p[0] != "[") and (p != "?"):
-                    loc = strip_location_subtext(p)
-                    if (loc in point_locations) and (loc not in location_direct_refs[loc]):
-                        location_cited_refs[loc] |= {c.cite_key}
-
     binomial_plot_locations = {}
     for name in binomial_point_locations:
         places = set()
@@ -3308,8 +3637,6 @@ def match_names_to_locations(species: list, specific_point_locations: dict,  bin
             if p in point_locations:
                 places |= {p}
                 location_bi_names[p] |= {name}
-            elif p != "?":
-                missing_set |= {p}
         binomial_plot_locations[name] = sorted(list(places))
 
     specific_plot_locations = {}
@@ -3320,15 +3647,8 @@ def match_names_to_locations(species: list, specific_point_locations: dict,  bin
             if p in point_locations:
                 places |= {p}
                 location_sp_names[p] |= {name}
-            elif p != "?":
-                missing_set |= {p}
         specific_plot_locations[name] = sorted(list(places))
 
-    if len(missing_set) > 0:
-        missing_list = sorted(list(missing_set))
-        for m in missing_list:
-            report_error("Missing point location: " + m)
-
     return (species_plot_locations, invalid_species_locations, binomial_plot_locations, specific_plot_locations,
             location_species, location_sp_names, location_bi_names, location_direct_refs, location_cited_refs,
             questionable_id_locations)
@@ -3338,19 +3658,11 @@ def compare_ranges_to_locations(species_range_blocks: dict, point_locations: dic
     """
     create a list of point locations that should contain a species, based on the official range data
     """
-    point_range_species = {}
-    for p in point_locations:
-        dat = point_locations[p]
-        slist = []
-        if not dat.unknown:
-            for species in species_range_blocks:
-                blocks = species_range_blocks[species]
-                inside = False
-                for b in blocks:
-                    if b.inside(dat.latitude, dat.longitude):
-                        inside = True
-                if inside:
-                    slist.append(species)
+    range_index = TMB_Classes.RangeCellIndex(species_range_blocks)
+    known = [dat for dat in point_locations.values() if not dat.unknown]
+    range_species = range_index.classify([dat.latitude for dat in known], [dat.longitude for dat in known])
+    point_range_species = {dat: [] for dat in point_locations.values()}
+    for dat, slist in zip(known, range_species):
         point_range_species[dat] = slist
     return point_range_species
 
@@ -3495,7 +3807,7 @@ def write_field_guides(field_guide_dict: dict, field_guide_data: dict, field_gui
               "eastern_pacific": "Eastern Pacific Realm",
               "iwp": "Indo-West Pacific Realm"}
 
-    with open(WEBOUT_PATH + "field_guides/index.html", "w", encoding="utf-8") as outfile:
+    with PageWriter(WEBOUT_PATH + "field_guides/index.html", encoding="utf-8") as outfile:
         if do_print:
             start_page_division(outfile, "base_page")
         else:
@@ -3606,7 +3918,8 @@ def write_field_guides(field_guide_dict: dict, field_guide_data: dict, field_gui
                 inc_map = False
             else:
                 inc_map = True
-            with open(WEBOUT_PATH + "field_guides/field_guide_" + guide + ".html", "w", encoding="utf-8") as suboutfile:
+            with PageWriter(WEBOUT_PATH + "field_guides/field_guide_" + guide + ".html",
+                            encoding="utf-8") as suboutfile:
                 image_list.extend(write_field_guide_page(suboutfile, do_print, guide, field_guide_data[guide], inc_map))
     return image_list
 
@@ -3775,7 +4088,7 @@ def write_species_video_page(fname: str, video: TMB_Classes.VideoClass, vn: int)
     """
     create a page for a specific video
     """
-    with open(fname, "w", encoding="utf-8") as outfile:
+    with PageWriter(fname, encoding="utf-8") as outfile:
         if ";" in video.species:
             spname = video.species.replace(";", "_")
             tmplist = video.species.split(";")
@@ -3891,10 +4204,10 @@ def size_label(w: float) -> str:
 
 
 def write_species_page(outfile: TextIO, do_print: bool, species: TMB_Classes.SpeciesClass, references: list,
-                       specific_names: list, all_names: list, photos: list, videos: list, artlist: list,
-                       sprefs: dict, refdict: dict, binomial_name_counts: dict, specific_name_cnts: dict,
-                       higher_dict: dict, measurement_data: dict, handedness_data: list,
-                       field_guide_data: dict) -> None:
+                       species_synonyms: dict, photos: list, videos: list, artlist: list,
+                       sprefs: dict, refdict: dict, binomial_name_counts: TMB_Classes.YearCounts,
+                       specific_name_cnts: TMB_Classes.YearCounts, higher_dict: dict, measurement_data: dict,
+                       handedness_data: list, field_guide_data: dict) -> None:
     """
     create the master page for a valid species
     """
@@ -3927,7 +4240,7 @@ def write_species_page(outfile: TextIO, do_print: bool, species: TMB_Classes.Spe
         if do_print:
             mean, std = create_species_cb_page(outfile, do_print, species, mdata, refdict)
         else:
-            with open(WEBOUT_PATH + "sizes/" + species.species + "_cb.html", "w", encoding="utf-8") as suboutfile:
+            with PageWriter(WEBOUT_PATH + "sizes/" + species.species + "_cb.html", encoding="utf-8") as suboutfile:
                 mean, std = create_species_cb_page(suboutfile, do_print, species, mdata, refdict)
     else:
         mdata = None
@@ -3938,8 +4251,8 @@ def write_species_page(outfile: TextIO, do_print: bool, species: TMB_Classes.Spe
         if do_print:
             create_species_handedness_page(outfile, species, handedness_data, refdict, do_print)
         else:
-            with open(WEBOUT_PATH + "handedness/" + species.species + "_handedness.html", "w",
-                      encoding="utf-8") as suboutfile:
+            with PageWriter(WEBOUT_PATH + "handedness/" + species.species + "_handedness.html",
+                            encoding="utf-8") as suboutfile:
                 create_species_handedness_page(suboutfile, species, handedness_data, refdict, do_print)
 
     outfile.write("    <header id=\"u_" + species.species + ".html\">\n")
@@ -4035,19 +4348,8 @@ def write_species_page(outfile: TextIO, do_print: bool, species: TMB_Classes.Spe
             outfile.write("        <dd>{}: {}</dd>\n".format(format_language(language), ", ".join(name_list)))
 
     # Synonyms
-    binomial_synlist = []
-    specific_synlist = []
-    for spname in specific_names:
-        if spname.synonym == species.species:
-            varlist = spname.variations.split(";")
-            for varname in varlist:
-                for uname in all_names:
-                    cleanname = clean_specific_name(uname)
-                    if varname == cleanname:
-                        binomial_synlist.append(uname)
-            specific_synlist.append(spname.name)
+    binomial_synlist, specific_synlist = species_synonyms.get(species.species, ([], []))
     if len(binomial_synlist) > 0:
-        binomial_synlist.sort(key=lambda s: s.lower())
         llist = []
         for n in binomial_synlist:
             namefile = name_to_filename(n)
@@ -4300,7 +4602,8 @@ def write_species_page(outfile: TextIO, do_print: bool, species: TMB_Classes.Spe
             create_synonym_chronology(outfile, do_print, species.species, binomial_synlist, binomial_name_counts,
                                       specific_synlist, specific_name_cnts)
         else:
-            with open(WEBOUT_PATH + "names/synonyms_" + species.species + ".html", "w", encoding="utf-8") as suboutfile:
+            with PageWriter(WEBOUT_PATH + "names/synonyms_" + species.species + ".html",
+                            encoding="utf-8") as suboutfile:
                 create_synonym_chronology(suboutfile, do_print, species.species, binomial_synlist, binomial_name_counts,
                                           specific_synlist, specific_name_cnts)
 
@@ -4350,8 +4653,10 @@ def create_species_handedness_page(outfile: TextIO, species: TMB_Classes.Species
         outfile.write("<p>Observed handedness (based on raw totals across all data sets) is "
                       f"{right_total/(right_total + left_total):0.2%} right-handed, "
                       f"{left_total/(right_total + left_total):0.2%} left-handed</p>\n")
-        filename = WEBOUT_PATH + "handedness/" + species.species + "_handedness.png"
-        TMB_Create_Graphs.create_handedness_chart_file(filename, data)
+        # the chart is drawn in memory so it is only written if it has changed
+        image = io.BytesIO()
+        TMB_Create_Graphs.create_handedness_chart_file(image, data)
+        TMB_Manifest.write_output(WEBOUT_PATH + "handedness/" + species.species + "_handedness.png", image.getvalue())
 
         outfile.write("    <p>The following figure displays the left and right counts for each individual data "
                       "set.</p>\n")
@@ -4360,7 +4665,7 @@ def create_species_handedness_page(outfile: TextIO, species: TMB_Classes.Species
                       "title=\"handedness data for {1}\"/>\n".format(species.species, species.binomial()))
         outfile.write("    </figure>\n")
 
-        with open(WEBOUT_PATH + "handedness/" + species.species + "_handedness.txt", "w") as datfile:
+        with PageWriter(WEBOUT_PATH + "handedness/" + species.species + "_handedness.txt") as datfile:
             outfile.write("    <h2>Data</h2>\n")
             outfile.write("    <p><a href=\"" + species.species + "_handedness.txt\">" +
                           fetch_fa_glyph("file download") + " Download Data</a></p>")
@@ -4414,8 +4719,10 @@ def create_species_cb_page(outfile: TextIO, do_print: bool, species: TMB_Classes
     mdat = TMB_Measurements.combine_measurement_data(measurement_data.male)
     fdat = TMB_Measurements.combine_measurement_data(measurement_data.female)
 
-    filename = WEBOUT_PATH + "sizes/" + species.species + "_cb.png"
-    TMB_Measurements.plot_measurement_data(measurement_data, cdat, mdat, fdat, filename)
+    # the chart is drawn in memory so it is only written if it has changed
+    image = io.BytesIO()
+    TMB_Measurements.plot_measurement_data(measurement_data, cdat, mdat, fdat, image)
+    TMB_Manifest.write_output(WEBOUT_PATH + "sizes/" + species.species + "_cb.png", image.getvalue())
 
     mean = numpy.mean(cdat)
     std = numpy.std(cdat)
@@ -4430,7 +4737,7 @@ def create_species_cb_page(outfile: TextIO, do_print: bool, species: TMB_Classes
                   "title=\"size data for {1}\"/>\n".format(species.species, species.binomial()))
     outfile.write("    </figure>\n")
 
-    with open(WEBOUT_PATH + "sizes/" + species.species + "_cb.txt", "w") as datfile:
+    with PageWriter(WEBOUT_PATH + "sizes/" + species.species + "_cb.txt") as datfile:
         outfile.write("    <h2>Data</h2>\n")
         outfile.write("    <p>All measurements are in millimeters (mm). <a href=\"" + species.species + "_cb.txt\">" +
                       fetch_fa_glyph("file download") + " Download Data</a></p>")
@@ -4639,14 +4946,14 @@ def write_photo_index(outfile: TextIO, do_print: bool, specieslist: list, photos
                     # copy photos and thumbnails to web output directory
                     tmp_name = "photos/U_" + spname + format(pn, "0>2")
                     try:
-                        shutil.copy2(MEDIA_PATH + tmp_name + ".jpg",  WEBOUT_PATH + "photos/")
+                        TMB_Manifest.copy_output(MEDIA_PATH + tmp_name + ".jpg",  WEBOUT_PATH + "photos/")
                     except FileNotFoundError:
                         report_error("Missing file: " + tmp_name + ".jpg")
                     try:
-                        shutil.copy2(MEDIA_PATH + tmp_name + "tn.jpg", WEBOUT_PATH + "photos/")
+                        TMB_Manifest.copy_output(MEDIA_PATH + tmp_name + "tn.jpg", WEBOUT_PATH + "photos/")
                     except FileNotFoundError:
                         report_error("Missing file: " + tmp_name + "tn.jpg")
-                    with open(WEBOUT_PATH + "photos/" + pfname, "w", encoding="utf-8") as suboutfile:
+                    with PageWriter(WEBOUT_PATH + "photos/" + pfname, encoding="utf-8") as suboutfile:
                         write_species_photo_page(suboutfile, False, pfname, species, sp.common, photo.caption, pn,
                                                  photo.species, refdict)
 
@@ -4727,7 +5034,7 @@ def write_video_index(outfile: TextIO, do_print: bool, videos: list) -> None:
             # copy video to web output directory
             tmp_name = "video/U_" + spname + format(vn, "0>2") + "." + video.format.lower()
             try:
-                shutil.copy2(MEDIA_PATH + tmp_name, WEBOUT_PATH + "video/")
+                TMB_Manifest.copy_output(MEDIA_PATH + tmp_name, WEBOUT_PATH + "video/")
             except FileNotFoundError:
                 report_error("Missing file: " + tmp_name)
 
@@ -4849,7 +5156,7 @@ def write_art_science_pages(outfile: TextIO, do_print: bool, artlist: list, refd
                         write_specific_art_page(outfile, do_print, art, init_data().art_sci_url,
                                                 "All Scientific Drawings", refdict)
                     else:
-                        with open(WEBOUT_PATH + "art/" + art.image + ".html", "w", encoding="utf-8") as suboutfile:
+                        with PageWriter(WEBOUT_PATH + "art/" + art.image + ".html", encoding="utf-8") as suboutfile:
                             write_specific_art_page(suboutfile, do_print, art, init_data().art_sci_url,
                                                     "All Scientific Drawings", refdict)
 
@@ -4909,7 +5216,7 @@ def write_art_stamps_pages(outfile: TextIO, do_print: bool, artlist: list, refdi
                         write_specific_art_page(outfile, do_print, art, init_data().art_stamp_url, "All Stamps",
                                                 refdict)
                     else:
-                        with open(WEBOUT_PATH + "art/" + art.image + ".html", "w", encoding="utf-8") as suboutfile:
+                        with PageWriter(WEBOUT_PATH + "art/" + art.image + ".html", encoding="utf-8") as suboutfile:
                             write_specific_art_page(suboutfile, do_print, art, init_data().art_stamp_url, "All Stamps",
                                                     refdict)
 
@@ -4974,7 +5281,7 @@ def write_art_crafts_pages(outfile: TextIO, do_print: bool, artlist: list, refdi
                         write_specific_art_page(outfile, do_print, art, init_data().art_craft_url, "All Crafts",
                                                 refdict)
                     else:
-                        with open(WEBOUT_PATH + "art/" + art.image + ".html", "w", encoding="utf-8") as suboutfile:
+                        with PageWriter(WEBOUT_PATH + "art/" + art.image + ".html", encoding="utf-8") as suboutfile:
                             write_specific_art_page(suboutfile, do_print, art, init_data().art_craft_url, "All Crafts",
                                                     refdict)
 
@@ -4988,29 +5295,29 @@ def write_all_art_pages(outfile: Optional[TextIO], do_print: bool, artlist: list
         write_art_stamps_pages(outfile, do_print, artlist, refdict)
         write_art_crafts_pages(outfile, do_print, artlist, refdict)
     else:
-        with open(WEBOUT_PATH + init_data().art_craft_url, "w", encoding="utf-8") as suboutfile:
+        with PageWriter(WEBOUT_PATH + init_data().art_craft_url, encoding="utf-8") as suboutfile:
             write_art_crafts_pages(suboutfile, do_print, artlist, refdict)
-        with open(WEBOUT_PATH + init_data().art_stamp_url, "w", encoding="utf-8") as suboutfile:
+        with PageWriter(WEBOUT_PATH + init_data().art_stamp_url, encoding="utf-8") as suboutfile:
             write_art_stamps_pages(suboutfile, do_print, artlist, refdict)
-        with open(WEBOUT_PATH + init_data().art_sci_url, "w", encoding="utf-8") as suboutfile:
+        with PageWriter(WEBOUT_PATH + init_data().art_sci_url, encoding="utf-8") as suboutfile:
             write_art_science_pages(suboutfile, do_print, artlist, refdict)
     # copy art files
     if not do_print:
         for art in artlist:
             try:
-                shutil.copy2(MEDIA_PATH + "art/" + art.image + "." + art.ext, WEBOUT_PATH + "art/")
+                TMB_Manifest.copy_output(MEDIA_PATH + "art/" + art.image + "." + art.ext, WEBOUT_PATH + "art/")
             except FileNotFoundError:
                 report_error("Missing file: " + MEDIA_PATH + "art/" + art.image + "." + art.ext)
             try:
-                shutil.copy2(MEDIA_PATH + "art/" + art.image + "_tn." + art.ext, WEBOUT_PATH + "art/")
+                TMB_Manifest.copy_output(MEDIA_PATH + "art/" + art.image + "_tn." + art.ext, WEBOUT_PATH + "art/")
             except FileNotFoundError:
                 report_error("Missing file: " + MEDIA_PATH + "art/" + art.image + "_tn." + art.ext)
 
 
 def write_species_info_pages(outfile: Optional[TextIO], do_print: bool, specieslist: list, references: list,
-                             specific_names: list, all_names: list, photos: list, videos: list, art: list,
-                             species_refs: dict, refdict: dict, binomial_name_cnts: dict,
-                             specific_name_cnts: dict, higher_dict: dict, measurement_data: dict,
+                             species_synonyms: dict, photos: list, videos: list, art: list, species_refs: dict,
+                             refdict: dict, binomial_name_cnts: TMB_Classes.YearCounts,
+                             specific_name_cnts: TMB_Classes.YearCounts, higher_dict: dict, measurement_data: dict,
                              handedness_data: list, field_guide_data: dict) -> None:
     """
     create the species index and all individual species pages
@@ -5018,31 +5325,64 @@ def write_species_info_pages(outfile: Optional[TextIO], do_print: bool, speciesl
     if do_print and (outfile is not None):
         write_species_list(outfile, True, specieslist)
     else:
-        with open(WEBOUT_PATH + init_data().species_url, "w", encoding="utf-8") as suboutfile:
+        with PageWriter(WEBOUT_PATH + init_data().species_url, encoding="utf-8") as suboutfile:
             write_species_list(suboutfile, False, specieslist)
-    # for species in tqdm(specieslist):
-    for species in specieslist:
-        sprefs = species_refs[species.species]
-        if do_print and (outfile is not None):
-            write_species_page(outfile, True, species, references, specific_names, all_names, photos, videos, art,
-                               sprefs, refdict, binomial_name_cnts, specific_name_cnts, higher_dict, measurement_data,
+    if do_print and (outfile is not None):
+        # for species in tqdm(specieslist):
+        for species in specieslist:
+            sprefs = species_refs[species.species]
+            write_species_page(outfile, True, species, references, species_synonyms, photos, videos, art, sprefs,
+                               refdict, binomial_name_cnts, specific_name_cnts, higher_dict, measurement_data,
                                handedness_data, field_guide_data)
-        else:
-            with open(WEBOUT_PATH + "u_" + species.species + ".html", "w", encoding="utf-8") as suboutfile:
-                write_species_page(suboutfile, False, species, references, specific_names, all_names, photos, videos,
-                                   art, sprefs, refdict, binomial_name_cnts, specific_name_cnts, higher_dict,
-                                   measurement_data, handedness_data, field_guide_data)
+    else:
+        model = {"references": references, "species_synonyms": species_synonyms,
+                 "photos": photos, "videos": videos, "art": art, "species_refs": species_refs, "refdict": refdict,
+                 "binomial_name_cnts": binomial_name_cnts, "specific_name_cnts": specific_name_cnts,
+                 "higher_dict": higher_dict, "measurement_data": measurement_data, "handedness_data": handedness_data,
+                 "field_guide_data": field_guide_data}
+        model["species_dict"] = {species.species: species for species in specieslist}
+        write_pages([(write_species_page_file, species.species) for species in specieslist], model)
 
     if do_print and (outfile is not None):
         write_measurement_guide(outfile, True)
         write_handedness_guide(outfile, refdict, True)
     else:
-        with open(WEBOUT_PATH + "sizes/index.html", "w") as suboutfile:
+        with PageWriter(WEBOUT_PATH + "sizes/index.html") as suboutfile:
             write_measurement_guide(suboutfile, False)
-        with open(WEBOUT_PATH + "handedness/index.html", "w") as suboutfile:
+        with PageWriter(WEBOUT_PATH + "handedness/index.html") as suboutfile:
             write_handedness_guide(suboutfile, refdict, False)
 
 
+def write_species_page_file(model: dict, species_name: str) -> None:
+    species = model["species_dict"][species_name]
+    for kind in ("species", "photos", "videos", "art"):
+        TMB_Dependencies.record_read(kind, species_name)
+    for cite_key in model["species_refs"][species_name]:
+        TMB_Dependencies.record_read("reference", cite_key)
+    for cite_key in species.range_references.split(";"):
+        TMB_Dependencies.record_read("reference", cite_key)
+    if species.type_reference is not None:
+        TMB_Dependencies.record_read("reference", species.type_reference.cite_key)
+    binomial_synlist, specific_synlist = model["species_synonyms"].get(species_name, ([], []))
+    for name in binomial_synlist:
+        TMB_Dependencies.record_read("name", name)
+    for name in specific_synlist:
+        TMB_Dependencies.record_read("specific_name", name)
+    # the size and handedness pages written with the species page cite the reference of every data row
+    if species_name in model["measurement_data"]:
+        for data in model["measurement_data"][species_name].all.values():
+            for d in data:
+                TMB_Dependencies.record_read("reference", d.ref)
+    for d in model["handedness_data"]:
+        if d.species == species_name:
+            TMB_Dependencies.record_read("reference", d.ref)
+    with PageWriter(WEBOUT_PATH + "u_" + species.species + ".html", encoding="utf-8") as outfile:
+        write_species_page(outfile, False, species, model["references"], model["species_synonyms"], model["photos"],
+                           model["videos"], model["art"], model["species_refs"][species.species], model["refdict"],
+                           model["binomial_name_cnts"], model["specific_name_cnts"], model["higher_dict"],
+                           model["measurement_data"], model["handedness_data"], model["field_guide_data"])
+
+
 def write_handedness_guide(outfile: TextIO, refdict: dict, do_print: bool = False):
     """
     output a general guide to the measurement data
@@ -5888,7 +6228,7 @@ def write_morphology_page(outfile: TextIO, do_print: bool, morph: TMB_Classes.Mo
             # copy images to web output directory
             tmp_name = "morphology/" + plist[i]
             try:
-                shutil.copy2(MEDIA_PATH + tmp_name, WEBOUT_PATH + "morphology/")
+                TMB_Manifest.copy_output(MEDIA_PATH + tmp_name, WEBOUT_PATH + "morphology/")
             except FileNotFoundError:
                 report_error("Missing file: " + tmp_name)
     if do_print:
@@ -6006,10 +6346,10 @@ def write_main_morphology_pages(outfile: TextIO, do_print: bool, morphology: lis
     else:
         common_html_footer(outfile)
         for m in morphology:
-            with open(WEBOUT_PATH + "morphology/" + morphology_link(m.parent, m.character) + ".html", "w",
-                      encoding="utf-8") as suboutfile:
+            with PageWriter(WEBOUT_PATH + "morphology/" + morphology_link(m.parent, m.character) + ".html",
+                            encoding="utf-8") as suboutfile:
                 write_morphology_page(suboutfile, do_print, m, morphology)
-        with open(WEBOUT_PATH + "morphology/index.html", "w", encoding="utf-8") as suboutfile:
+        with PageWriter(WEBOUT_PATH + "morphology/index.html", encoding="utf-8") as suboutfile:
             write_morphology_index(suboutfile, do_print, morphology)
 
 
@@ -6017,7 +6357,7 @@ def write_citation_page(refdict: dict) -> None:
     """
     create page with site citation info
     """
-    with open(WEBOUT_PATH + init_data().cite_url, "w", encoding="utf-8") as outfile:
+    with PageWriter(WEBOUT_PATH + init_data().cite_url, encoding="utf-8") as outfile:
         common_html_header(outfile, "Fiddler Crab Website Citation")
         outfile.write("    <header id=\"" + init_data().cite_url + "\">\n")
         outfile.write("      <h1>Citation Info</h1>\n")
@@ -6213,12 +6553,12 @@ def copy_special_species_images(species: list) -> None:
     for s in species:
         if s.phy_photo:
             try:
-                shutil.copy2(f"media/photos/phy_{s.species}.jpg", WEBOUT_PATH + "photos/")
+                TMB_Manifest.copy_output(f"media/photos/phy_{s.species}.jpg", WEBOUT_PATH + "photos/")
             except FileNotFoundError:
                 report_error(f"Missing file: media/photos/phy_{s.species}.jpg")
         if s.key_photo:
             try:
-                shutil.copy2(f"media/photos/ex_{s.species}.jpg", WEBOUT_PATH + "photos/")
+                TMB_Manifest.copy_output(f"media/photos/ex_{s.species}.jpg", WEBOUT_PATH + "photos/")
             except FileNotFoundError:
                 report_error(f"Missing file: media/photos/ex_{s.species}.jpg")
 
@@ -6248,7 +6588,7 @@ def copy_support_files() -> None:
                 "uca_style.css"}
     for filename in filelist:
         try:
-            shutil.copy2("resources/" + filename, WEBOUT_PATH)
+            TMB_Manifest.copy_output("resources/" + filename, WEBOUT_PATH)
         except FileNotFoundError:
             report_error("Missing file: resources/" + filename)
     # image folder files
@@ -6270,14 +6610,14 @@ def copy_support_files() -> None:
                 "icon_region.png"}
     for filename in filelist:
         try:
-            shutil.copy2("resources/images/" + filename, WEBOUT_PATH + "images/")
+            TMB_Manifest.copy_output("resources/images/" + filename, WEBOUT_PATH + "images/")
         except FileNotFoundError:
             report_error("Missing file: resources/images/" + filename)
     filelist = {"specific_word_cloud.png",
                 "binomial_word_cloud.png"}
     for filename in filelist:
         try:
-            shutil.copy2(TMP_PATH + filename, WEBOUT_PATH + "images/")
+            TMB_Manifest.copy_output(TMP_PATH + filename, WEBOUT_PATH + "images/")
         except FileNotFoundError:
             report_error("Missing file: " + TMP_PATH + filename)
     # font-awesome files
@@ -6288,14 +6628,15 @@ def copy_support_files() -> None:
                 "solid.min.js"}
     for filename in filelist:
         try:
-            shutil.copy2("resources/font-awesome/js/" + filename, WEBOUT_PATH + "js/")
+            TMB_Manifest.copy_output("resources/font-awesome/js/" + filename, WEBOUT_PATH + "js/")
         except FileNotFoundError:
             report_error("Missing file: resources/font-awesome/js/" + TMP_PATH + filename)
     # flag-icon files
     filelist = {"flag-icons.min.css"}
     for filename in filelist:
         try:
-            shutil.copy2("resources/flag-icon-css/css/" + filename, WEBOUT_PATH + "images/flag-icon-css/css/")
+            TMB_Manifest.copy_output("resources/flag-icon-css/css/" + filename,
+                                     WEBOUT_PATH + "images/flag-icon-css/css/")
         except FileNotFoundError:
             report_error("Missing file: images/flag-icon-css/css/" + TMP_PATH + filename)
     filelist = {"de.svg",  # Germany
@@ -6324,8 +6665,8 @@ def copy_support_files() -> None:
                 "vn.svg"}  # Vietnam
     for filename in filelist:
         try:
-            shutil.copy2("resources/flag-icon-css/flags/4x3/" + filename, WEBOUT_PATH +
-                         "images/flag-icon-css/flags/4x3/")
+            TMB_Manifest.copy_output("resources/flag-icon-css/flags/4x3/" + filename, WEBOUT_PATH +
+                                     "images/flag-icon-css/flags/4x3/")
         except FileNotFoundError:
             report_error("Missing file: images/flag-icon-css/flags/4x3/" + TMP_PATH + filename)
 
@@ -6336,7 +6677,7 @@ def copy_map_files(species: list, all_names: list, specific_names: list, point_l
     """
     def copy_file(filename: str) -> None:
         try:
-            shutil.copy2(filename, WEBOUT_PATH + "maps/")
+            TMB_Manifest.copy_output(filename, WEBOUT_PATH + "maps/")
         except FileNotFoundError:
             report_error("Missing file: " + filename)
 
@@ -6391,7 +6732,7 @@ def copy_field_guide_files(field_guides: dict, images_list: list) -> None:
     """
     def copy_file(filename: str) -> None:
         try:
-            shutil.copy2(filename, WEBOUT_PATH + "field_guides/")
+            TMB_Manifest.copy_output(filename, WEBOUT_PATH + "field_guides/")
         except FileNotFoundError:
             report_error("Missing file: " + filename)
 
@@ -6580,66 +6921,291 @@ def end_print(outfile: TextIO) -> None:
     outfile.write("</html>\n")
 
 
-# def build_site(init_data):
-def build_site() -> None:
+def read_site_data(use_threads: bool = True) -> TMB_Classes.SiteData:
+    """
+    read all of the input data files and link the resulting objects to each other
+
+    the data files are independent of each other, so they are read concurrently on a thread pool (unless use_threads
+    is False) before the steps which connect the data from different files are run
+    """
+    data = TMB_Classes.SiteData()
+    print("...Reading Data Files...")
+    readers = {
+        "references": (TMB_Import.read_reference_data, init_data().reference_ciation_file,
+                       init_data().reference_file, init_data().citation_info_file),
+        "species": (TMB_Import.read_species_data, init_data().species_data_file),
+        "specific names": (TMB_Import.read_specific_names_data, init_data().specific_names_file),
+        "common names": (TMB_Import.read_common_name_data, init_data().common_names_file),
+        "taxon ranks": (TMB_Import.read_taxon_rank_data, init_data().taxon_ranks_file),
+        "higher taxa": (TMB_Import.read_higher_taxa_data, init_data().higher_taxa_file),
+        "photos": (TMB_Import.read_photo_data, init_data().photo_file),
+        "videos": (TMB_Import.read_video_data, init_data().video_file),
+        "art": (TMB_Import.read_art_data, init_data().art_file),
+        "morphology": (TMB_Import.read_morphology_data, init_data().morphology_file),
+        "unusual development": (TMB_Import.read_unusual_development_data, init_data().unusual_development_file),
+        "ranges": (TMB_Import.read_species_blocks, init_data().species_range_blocks),
+        "locations": (TMB_Import.read_location_data, init_data().location_file),
+        "field guide maps": (TMB_Import.read_species_blocks, init_data().field_guide_map_file),
+        "measurements": (TMB_Import.read_measurement_data, init_data().measurement_file),
+        "handedness": (TMB_Import.read_handedness_data, init_data().handedness_file)
+    }
+    # the errors found by each reader are held back and reported in the order the readers are listed, so the error
+    # log is the same however the reads overlap
+    outputs = {}
+    try:
+        if use_threads:
+            max_workers = min(len(readers), (os.cpu_count() or 1) + 4)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {key: executor.submit(TMB_Error.collect_errors, *reader) for key, reader in readers.items()}
+                for key in futures:
+                    outputs[key] = futures[key].result()
+        else:
+            for key, reader in readers.items():
+                outputs[key] = TMB_Error.collect_errors(*reader)
+    finally:
+        # if a reader fails, the errors of the readers listed before it are still reported
+        for result, errors in outputs.values():
+            for e in errors:
+                report_error(e)
+    results = {key: result for key, (result, _) in outputs.items()}
+
+    (data.references, data.refdict, data.citelist, data.yeardict, data.citecount) = results["references"]
+    data.species = results["species"]
+    data.specific_names = results["specific names"]
+    data.common_name_data = results["common names"]
+    data.taxon_ranks = results["taxon ranks"]
+    data.higher_taxa, data.higher_dict = results["higher taxa"]
+    data.photos = results["photos"]
+    data.videos = results["videos"]
+    data.art = results["art"]
+    data.morphology = results["morphology"]
+    data.unusual_development_data = results["unusual development"]
+    data.species_range_blocks = results["ranges"]
+    # a dict of locations, keys = full location names
+    data.point_locations = results["locations"]
+    data.field_guide_map_data = results["field guide maps"]
+    data.measurement_data = TMB_Measurements.sort_measurement_data(results["measurements"])
+    data.handedness_data = results["handedness"]
+
+    print("...Connecting References...")
+    clean_references(data.references)
+    init_species_crossref(data.species)
+    connect_type_references(data.species, data.refdict)
+    print("......Computing Species from Citation Linking......")
+    compute_species_from_citation_linking(data.citelist)
+    # print("......Computing Applied Name Contexts......")
+    compute_applied_name_contexts(data.citelist)
+
+    print("...Connecting Locations...")
+    # a dict of locations, keys = trimmed location names and aliases
+    data.location_dict = create_location_hierarchy(data.point_locations)
+
+    # field guides
+    data.field_guide_list = TMB_Import.read_field_guide_list(init_data().field_guide_file, data.species)
+    data.field_guide_data = TMB_Import.read_field_guide_data(data.field_guide_list,
+                                                             init_data().field_guide_data_path)
+    return data
+
+
+def site_input_files() -> list:
+    """
+    list of the input files named in the initialization data which are read by read_site_data()
+    """
+    return [init_data().reference_ciation_file, init_data().reference_file, init_data().citation_info_file,
+            init_data().species_data_file, init_data().specific_names_file, init_data().common_names_file,
+            init_data().taxon_ranks_file, init_data().higher_taxa_file, init_data().photo_file,
+            init_data().video_file, init_data().art_file, init_data().morphology_file,
+            init_data().unusual_development_file, init_data().species_range_blocks, init_data().location_file,
+            init_data().field_guide_file, init_data().field_guide_map_file, init_data().measurement_file,
+            init_data().handedness_file]
+
+
+def site_data_files(data: TMB_Classes.SiteData) -> list:
+    """
+    list of every input file read by read_site_data()
+    """
+    file_list = site_input_files()
+    for guide in data.field_guide_list:
+        if guide != "":
+            file_list.append(init_data().field_guide_data_path + guide + ".txt")
+    return file_list
+
+
+def module_files(modules: tuple) -> list:
+    """
+    the source files of a list of modules, which are all in the same directory as this one
+    """
+    code_path = os.path.dirname(os.path.abspath(__file__))
+    return [os.path.join(code_path, m + ".py") for m in modules]
+
+
+def site_data_key() -> tuple:
+    """
+    the configured input paths and a hash of the code which reads and links the data, which must match for a data
+    snapshot to be used
+    """
+    return (site_input_files() + [init_data().field_guide_data_path],
+            TMB_Snapshot.code_digest(module_files(SNAPSHOT_CODE_MODULES)))
+
+
+def load_site_data() -> TMB_Classes.SiteData:
+    if USE_DATA_SNAPSHOT:
+        return TMB_Snapshot.cached_import(DATA_SNAPSHOT_FILE, read_site_data, site_data_files, site_data_key())
+    else:
+        return read_site_data()
+
+
+def create_validation_data(site_data: TMB_Classes.SiteData, cite_index: TMB_Classes.CitationIndex, name_table: dict,
+                           binomial_point_locations: dict, specific_point_locations: dict, location_species: dict,
+                           location_sp_names: dict, location_bi_names: dict,
+                           location_range_species: dict) -> TMB_Validate.ValidationData:
+    vdata = TMB_Validate.ValidationData()
+    vdata.site_data = site_data
+    vdata.cite_index = cite_index
+    vdata.cite_keys = set(cite_index.by_cite_key)
+    vdata.name_table = name_table
+    vdata.binomial_point_locations = binomial_point_locations
+    vdata.specific_point_locations = specific_point_locations
+    vdata.location_species = location_species
+    vdata.location_sp_names = location_sp_names
+    vdata.location_bi_names = location_bi_names
+    vdata.location_range_species = location_range_species
+    return vdata
+
+
+def create_record_fingerprints(site_data: TMB_Classes.SiteData, cite_index: TMB_Classes.CitationIndex,
+                               ref_names: dict, cited_by: dict, species_refs: dict, species_synonyms: dict,
+                               all_names: list, binomial_name_cnts: TMB_Classes.YearCounts,
+                               binomial_point_locations: dict, specific_name_cnts: TMB_Classes.YearCounts,
+                               specific_point_locations: dict) -> dict:
+    """
+    fingerprint each record read by the individual reference, name, and species pages, together with the data
+    derived from it which those pages show (e.g., the yearly counts of a name), keyed by kind and then record key
+
+    the data which are not split into records are fingerprinted as a whole under the kind "site"
+    """
+    fingerprint = TMB_Dependencies.fingerprint
+    site = {attr: fingerprint(getattr(site_data, attr))
+            for attr in ("common_name_data", "taxon_ranks", "higher_taxa", "morphology", "unusual_development_data",
+                         "species_range_blocks", "field_guide_list", "field_guide_data", "field_guide_map_data",
+                         "measurement_data", "handedness_data")}
+    # species names are linked from notes and captions on every kind of page
+    site["species names"] = fingerprint([(s.species, s.genus) for s in site_data.species])
+    # every page shows the initialization data (except the release stamp, which is also left out of the hashes of the
+    # output manifest, so a page which is not written keeps its earlier stamp either way) and is rendered by the
+    # page-writing code
+    site["init data"] = fingerprint({attr: value for attr, value in vars(init_data()).items() if attr != "version"})
+    site["page code"] = TMB_Snapshot.code_digest(module_files(PAGE_CODE_MODULES))
+    fingerprints = {
+        "site": site,
+        "reference": {ref.cite_key: fingerprint(ref) for ref in site_data.references},
+        "citations": {cite_key: fingerprint(cites, ref_names.get(cite_key), cited_by.get(cite_key))
+                      for cite_key, cites in cite_index.by_cite_key.items()},
+        "name": {name: fingerprint(cite_index.by_name.get(name.lower(), []), binomial_name_cnts[name].values(),
+                                   binomial_point_locations.get(name)) for name in all_names},
+        "specific_name": {name.name: fingerprint(name, specific_name_cnts[name.name].values(),
+                                                 specific_point_locations.get(name))
+                          for name in site_data.specific_names},
+        "species": {s.species: fingerprint(s, species_refs[s.species], species_synonyms.get(s.species))
+                    for s in site_data.species},
+        "location": {name: fingerprint(loc) for name, loc in site_data.point_locations.items()}
+    }
+    # media are grouped by the species they show
+    for kind, media in (("photos", site_data.photos), ("videos", site_data.videos), ("art", site_data.art)):
+        by_species = {}
+        for m in media:
+            for s in m.species.split(";"):
+                by_species.setdefault(s, []).append(m)
+        fingerprints[kind] = {s: fingerprint(m) for s, m in by_species.items()}
+    return fingerprints
+
+
+def check_site_data() -> int:
+    """
+    read and link the data and run every data check without creating any output
+
+    returns the number of problems found, so it can be used as a quick check before committing changes to the data
+    """
+    start_time = datetime.datetime.now()
+    create_temp_output_paths()
+    with open(init_data().error_log, "w", encoding="utf-8") as TMB_Error.LOGFILE:
+        site_data = load_site_data()
+        init_species_crossref(site_data.species)
+        cite_index = create_citation_index(site_data.citelist)
+        (_, _, _, _, _, name_table, specific_point_locations, binomial_point_locations, _,
+         _) = calculate_name_index_data(site_data.refdict, site_data.citelist, site_data.specific_names)
+        (_, _, _, _, location_species, location_sp_names, location_bi_names, _, _,
+         _) = match_names_to_locations(site_data.species, specific_point_locations, binomial_point_locations,
+                                       site_data.point_locations, site_data.citelist, cite_index)
+        location_range_species = compare_ranges_to_locations(site_data.species_range_blocks,
+                                                             site_data.point_locations)
+        vdata = create_validation_data(site_data, cite_index, name_table, binomial_point_locations,
+                                       specific_point_locations, location_species, location_sp_names,
+                                       location_bi_names, location_range_species)
+        report = validate_site_data(vdata, json_file=init_data().validation_report)
+    print(f"{report.n_issues()} data problems found in {datetime.datetime.now() - start_time}")
+    return report.n_issues()
+
+
+def build_site(incremental: bool = False) -> None:
+    """
+    read the data and create the output
+
+    in incremental mode, the individual reference, name, and species web pages are only written if one of the input
+    records they read has changed since the last build; the errors found in the pages which are not written are
+    repeated from the build which last wrote them, so the error log is the same as after a full build
+    """
     start_time = datetime.datetime.now()
     print("Start Time:", start_time)
     create_temp_output_paths()
     with open(init_data().error_log, "w", encoding="utf-8") as TMB_Error.LOGFILE:
         # read data and do computation
-        print("...Reading References...")
-        (references, refdict, citelist,
-         yeardict, citecount) = TMB_Import.read_reference_data(init_data().reference_ciation_file,
-                                                               init_data().reference_file,
-                                                               init_data().citation_info_file)
-        clean_references(references)
-        yeardat, yeardat1900 = summarize_year(yeardict)
-        languages, languages_by_year = summarize_languages(references)
-        print("...Reading Species...")
-        species = TMB_Import.read_species_data(init_data().species_data_file)
+        site_data = load_site_data()
+        read_end_time = datetime.datetime.now()
+        print("...Data Read Time:", read_end_time - start_time)
+        references = site_data.references
+        refdict = site_data.refdict
+        citelist = site_data.citelist
+        citecount = site_data.citecount
+        species = site_data.species
+        specific_names = site_data.specific_names
+        taxon_ranks = site_data.taxon_ranks
+        higher_taxa = site_data.higher_taxa
+        higher_dict = site_data.higher_dict
+        photos = site_data.photos
+        videos = site_data.videos
+        art = site_data.art
+        morphology = site_data.morphology
+        unusual_development_data = site_data.unusual_development_data
+        species_range_blocks = site_data.species_range_blocks
+        point_locations = site_data.point_locations
+        location_dict = site_data.location_dict
+        field_guide_list = site_data.field_guide_list
+        field_guide_data = site_data.field_guide_data
+        field_guide_map_data = site_data.field_guide_map_data
+        measurement_data = site_data.measurement_data
+        handedness_data = site_data.handedness_data
         init_species_crossref(species)
-        connect_type_references(species, refdict)
+        cite_index = create_citation_index(citelist)
+        ref_names, cited_by = create_reference_page_index(cite_index)
 
-        print("...Connecting References...")
-        print("......Computing Species from Citation Linking......")
-        compute_species_from_citation_linking(citelist)
-        # print("......Computing Applied Name Contexts......")
-        compute_applied_name_contexts(citelist)
+        yeardat, yeardat1900 = summarize_year(site_data.yeardict)
+        languages, languages_by_year = summarize_languages(references)
         print("......Connecting References to Species......")
         species_refs = connect_refs_to_species(species, citelist)
 
-        print("...Reading Species Names...")
-        specific_names = TMB_Import.read_specific_names_data(init_data().specific_names_file)
-        check_specific_names(citelist, specific_names)
         (all_names, binomial_name_cnts, specific_name_cnts, genus_cnts, total_binomial_year_cnts,
          name_table, specific_point_locations, binomial_point_locations, binomial_usage_cnts,
          specific_usage_cnts) = calculate_name_index_data(refdict, citelist, specific_names)
-        common_name_data = TMB_Import.read_common_name_data(init_data().common_names_file)
-        common_name_data = replace_species_references(common_name_data)
+        species_synonyms = create_species_synonym_index(specific_names, all_names)
+        common_name_data = replace_species_references(site_data.common_name_data)
 
-        taxon_ranks = TMB_Import.read_taxon_rank_data(init_data().taxon_ranks_file)
-        higher_taxa, higher_dict = TMB_Import.read_higher_taxa_data(init_data().higher_taxa_file)
         if not CHECK_DATA:
             print("...Creating Wordclouds...")
             TMB_Create_Graphs.create_word_cloud_image(binomial_usage_cnts, specific_usage_cnts,
                                                       init_data().wc_font_path)
             # TMB_Create_Graphs.create_word_cloud_image(binomial_usage_cnts, specific_usage_cnts, )
 
-        print("...Reading Photos and Videos...")
-        photos = TMB_Import.read_photo_data(init_data().photo_file)
-        videos = TMB_Import.read_video_data(init_data().video_file)
-        art = TMB_Import.read_art_data(init_data().art_file)
-        morphology = TMB_Import.read_morphology_data(init_data().morphology_file)
-        unusual_development_data = TMB_Import.read_unusual_development_data(init_data().unusual_development_file)
-
-        print("...Reading Ranges...")
-        species_range_blocks = TMB_Import.read_species_blocks(init_data().species_range_blocks)
-
-        print("...Reading Locations...")
-        # a dict of locations, keys = full location names
-        point_locations = TMB_Import.read_location_data(init_data().location_file)
-        # a dict of locations, keys = trimmed location names and aliases
-        location_dict = create_location_hierarchy(point_locations)
         """
         location_species is a dict of sets of species objects, key = location full names
         location_sp_names is a dict of sets of specific name objects, key = location full names
@@ -6649,13 +7215,13 @@ def build_site() -> None:
          specific_plot_locations, location_species, location_sp_names, location_bi_names, location_direct_refs,
          location_cited_refs, questionable_id_locations) = match_names_to_locations(species, specific_point_locations,
                                                                                     binomial_point_locations,
-                                                                                    point_locations, citelist)
+                                                                                    point_locations, citelist,
+                                                                                    cite_index)
         location_range_species = compare_ranges_to_locations(species_range_blocks, point_locations)
-
-        # field guides
-        field_guide_list = TMB_Import.read_field_guide_list(init_data().field_guide_file, species)
-        field_guide_data = TMB_Import.read_field_guide_data(field_guide_list, init_data().field_guide_data_path)
-        field_guide_map_data = TMB_Import.read_species_blocks(init_data().field_guide_map_file)
+        vdata = create_validation_data(site_data, cite_index, name_table, binomial_point_locations,
+                                       specific_point_locations, location_species, location_sp_names,
+                                       location_bi_names, location_range_species)
+        validate_site_data(vdata, json_file=init_data().validation_report)
 
         # print("...Creating Taxonomic Keys...")
         # (tk_trait_data, tk_generic_notes,
@@ -6669,27 +7235,22 @@ def build_site() -> None:
 
         genera_tree, species_tree = create_html_phylogenies()
 
-        measurement_data = TMB_Import.read_measurement_data(init_data().measurement_file)
-        measurement_data = TMB_Measurements.sort_measurement_data(measurement_data)
-
-        handedness_data = TMB_Import.read_handedness_data(init_data().handedness_file)
-
         if INCLUDE_INAT and (not CHECK_DATA) and DRAW_MAPS:
-            species_inat = TMB_Import.fetch_inat_data(species)
+            species_inat = TMB_Import.fetch_inat_data(species, INAT_STORE_FILE, INAT_CACHE_DAYS*86400,
+                                                      INAT_FULL_SYNC_DAYS*86400)
         else:
             species_inat = None
 
         if CHECK_DATA:
-            # run functions that cross-check data but skip the output
-            check_location_index(point_locations, location_species, location_sp_names, location_bi_names)
-            check_citation_cross_references(citelist, refdict, name_table)
-
+            # the data checks were run above, so skip the output
+            pass
         elif CHECK_LOCATIONS:
             if DRAW_MAPS:
                 print("...Creating Maps...")
                 TMB_Create_Maps.create_all_maps(init_data(), point_locations)  # only draw location maps
             print("......Writing Locations......")
-            with open(WEBOUT_PATH + "locations/index.html", "w", encoding="utf-8") as outfile:
+            OUTPUT_STATS.start_stage("Locations")
+            with PageWriter(WEBOUT_PATH + "locations/index.html", encoding="utf-8") as outfile:
                 # write_location_index(outfile, False, point_locations, location_dict, location_species,
                 #                      location_sp_names, location_bi_names, location_direct_refs,
                 #                      location_cited_refs, references, location_range_species, location_keys,
@@ -6713,35 +7274,59 @@ def build_site() -> None:
 
             # output website version
             if OUTPUT_WEB:
-                create_web_output_paths()
                 print("...Creating Web Version...")
+                if USE_OUTPUT_MANIFEST:
+                    # a page which only differs from the previous build by its release stamp is not rewritten
+                    TMB_Manifest.MANIFEST = TMB_Manifest.load_manifest(OUTPUT_MANIFEST_FILE, WEBOUT_PATH,
+                                                                       (release_stamp(),))
+                fingerprints = create_record_fingerprints(site_data, cite_index, ref_names, cited_by, species_refs,
+                                                          species_synonyms, all_names, binomial_name_cnts,
+                                                          binomial_point_locations, specific_name_cnts,
+                                                          specific_point_locations)
+                TMB_Dependencies.DEPENDENCIES = TMB_Dependencies.load_dependencies(PAGE_DEPENDENCY_FILE, fingerprints,
+                                                                                   incremental)
+                if incremental:
+                    n_changed = TMB_Dependencies.DEPENDENCIES.n_changed()
+                    if n_changed is None:
+                        print("......Incremental Build: Writing All Pages......")
+                    else:
+                        print(f"......Incremental Build: {n_changed} Changed Records......")
+                OUTPUT_STATS.start_stage("Setup")
+                create_web_output_paths()
                 copy_support_files()
                 copy_special_species_images(species)
 
                 if OUTPUT_REFS:
                     print("......Writing References......")
-                    with open(WEBOUT_PATH + init_data().ref_url, "w", encoding="utf-8") as outfile:
+                    OUTPUT_STATS.start_stage("References")
+                    with PageWriter(WEBOUT_PATH + init_data().ref_url, encoding="utf-8") as outfile:
                         write_reference_bibliography(outfile, False, references)
-                    with open(WEBOUT_PATH + init_data().ref_sum_url, "w", encoding="utf-8") as outfile:
+                    with PageWriter(WEBOUT_PATH + init_data().ref_sum_url, encoding="utf-8") as outfile:
                         write_reference_summary(outfile, False, len(references), yeardat, yeardat1900, citecount,
                                                 languages, languages_by_year)
-                    write_reference_pages(None, False, references, refdict, citelist, name_table, point_locations)
+                    write_reference_pages(None, False, references, refdict, cite_index, ref_names, cited_by, name_table,
+                                          point_locations)
                 print("......Writing Names Info......")
-                with open(WEBOUT_PATH + "names/index.html", "w", encoding="utf-8") as outfile:
-                    write_all_name_pages(outfile, False, refdict, citelist, all_names, specific_names, name_table,
-                                         species_refs, genus_cnts, binomial_name_cnts, total_binomial_year_cnts,
-                                         binomial_point_locations, specific_point_locations, point_locations)
+                OUTPUT_STATS.start_stage("Names Info")
+                with PageWriter(WEBOUT_PATH + "names/index.html", encoding="utf-8") as outfile:
+                    write_all_name_pages(outfile, False, refdict, cite_index, all_names, specific_names, name_table,
+                                         species_refs, genus_cnts, binomial_name_cnts, specific_name_cnts,
+                                         total_binomial_year_cnts, binomial_point_locations, specific_point_locations,
+                                         point_locations)
 
                 print("......Writing Species......")
-                write_species_info_pages(None, False, species, references, specific_names, all_names, photos, videos,
-                                         art, species_refs, refdict, binomial_name_cnts, specific_name_cnts,
+                OUTPUT_STATS.start_stage("Species")
+                write_species_info_pages(None, False, species, references, species_synonyms, photos, videos, art,
+                                         species_refs, refdict, binomial_name_cnts, specific_name_cnts,
                                          higher_dict, measurement_data, handedness_data, field_guide_data)
                 if DRAW_MAPS:
                     print("......Copying Maps......")
+                    OUTPUT_STATS.start_stage("Maps")
                     copy_map_files(species, all_names, specific_names, point_locations)
                 if OUTPUT_LOCS:
                     print("......Writing Locations......")
-                    with open(WEBOUT_PATH + "locations/index.html", "w", encoding="utf-8") as outfile:
+                    OUTPUT_STATS.start_stage("Locations")
+                    with PageWriter(WEBOUT_PATH + "locations/index.html", encoding="utf-8") as outfile:
                         # write_location_index(outfile, False, point_locations, location_dict, location_species,
                         #                      location_sp_names, location_bi_names, location_direct_refs,
                         #                      location_cited_refs, references, location_range_species, location_keys,
@@ -6750,41 +7335,55 @@ def build_site() -> None:
                                          location_sp_names, location_bi_names, location_direct_refs,
                                          location_cited_refs, references, location_range_species, None,
                                          field_guide_data)
-                    with open(WEBOUT_PATH + init_data().map_url, "w", encoding="utf-8") as outfile:
+                    with PageWriter(WEBOUT_PATH + init_data().map_url, encoding="utf-8") as outfile:
                         write_geography_page(outfile, False, species)
                 print("......Writing Media Pages......")
-                with open(WEBOUT_PATH + init_data().photo_url, "w", encoding="utf-8") as outfile:
+                OUTPUT_STATS.start_stage("Media Pages")
+                with PageWriter(WEBOUT_PATH + init_data().photo_url, encoding="utf-8") as outfile:
                     write_photo_index(outfile, False, species, photos, refdict)
                 write_all_art_pages(None, False, art, refdict)
-                with open(WEBOUT_PATH + init_data().video_url, "w", encoding="utf-8") as outfile:
+                with PageWriter(WEBOUT_PATH + init_data().video_url, encoding="utf-8") as outfile:
                     write_video_index(outfile, False, videos)
 
                 print("......Writing Field Guides and Maps......")
+                OUTPUT_STATS.start_stage("Field Guides and Maps")
                 field_guide_images = write_field_guides(field_guide_list, field_guide_data, field_guide_map_data)
                 TMB_Create_Maps.draw_field_guide_maps(init_data(), field_guide_map_data)
                 copy_field_guide_files(field_guide_list, field_guide_images)
 
                 print("......Writing Misc......")
-                with open(WEBOUT_PATH + init_data().syst_url, "w", encoding="utf-8") as outfile:
+                OUTPUT_STATS.start_stage("Misc")
+                with PageWriter(WEBOUT_PATH + init_data().syst_url, encoding="utf-8") as outfile:
                     write_systematics_overview(outfile, False, taxon_ranks, higher_taxa, species, refdict)
-                with open(WEBOUT_PATH + init_data().common_url, "w", encoding="utf-8") as outfile:
+                with PageWriter(WEBOUT_PATH + init_data().common_url, encoding="utf-8") as outfile:
                     write_common_names_pages(outfile, False, replace_references(common_name_data, refdict, False))
-                with open(WEBOUT_PATH + init_data().lifecycle_url, "w", encoding="utf-8") as outfile:
+                with PageWriter(WEBOUT_PATH + init_data().lifecycle_url, encoding="utf-8") as outfile:
                     write_life_cycle_pages(outfile, False)
-                with open(WEBOUT_PATH + init_data().unsuual_dev_url, "w", encoding="utf-8") as outfile:
+                with PageWriter(WEBOUT_PATH + init_data().unsuual_dev_url, encoding="utf-8") as outfile:
                     write_unusual_development_pages(outfile, unusual_development_data, refdict, False)
-                with open(WEBOUT_PATH + init_data().tree_url, "w", encoding="utf-8") as outfile:
+                with PageWriter(WEBOUT_PATH + init_data().tree_url, encoding="utf-8") as outfile:
                     write_phylogeny_pages(outfile, genera_tree, species_tree, False, refdict)
-                with open(WEBOUT_PATH + init_data().morph_url, "w", encoding="utf-8") as outfile:
+                with PageWriter(WEBOUT_PATH + init_data().morph_url, encoding="utf-8") as outfile:
                     write_main_morphology_pages(outfile, False, morphology)
-                with open(WEBOUT_PATH + "index.html", "w", encoding="utf-8") as outfile:
+                with PageWriter(WEBOUT_PATH + "index.html", encoding="utf-8") as outfile:
                     write_introduction(outfile, False, species, higher_taxa)
                 write_citation_page(refdict)
+                TMB_Dependencies.DEPENDENCIES.save(PAGE_DEPENDENCY_FILE)
+                TMB_Dependencies.DEPENDENCIES = None
+                if TMB_Manifest.MANIFEST is not None:
+                    # files which were not written are only removed when every part of the site was output
+                    changes = TMB_Manifest.MANIFEST.finish(complete=OUTPUT_REFS and OUTPUT_LOCS and DRAW_MAPS)
+                    TMB_Manifest.MANIFEST.save(OUTPUT_MANIFEST_FILE)
+                    TMB_Manifest.write_json(init_data().deploy_changes, changes)
+                    TMB_Manifest.MANIFEST = None
+                    print("......Web Output Changes: {} added, {} changed, {} removed......".format(
+                          len(changes["added"]), len(changes["changed"]), len(changes["removed"])))
 
             # output print version
             if OUTPUT_PRINT:
                 print("...Creating Print Version...")
-                with open("print.html", "w", encoding="utf-8") as printfile:
+                OUTPUT_STATS.start_stage("Print Version")
+                with PageWriter("print.html", encoding="utf-8") as printfile:
                     start_print(printfile)
                     write_print_only_pages(printfile, species, refdict)
                     write_introduction(printfile, True, species, higher_taxa)
@@ -6794,13 +7393,14 @@ def build_site() -> None:
                     write_life_cycle_pages(printfile, True)
                     write_unusual_development_pages(printfile, unusual_development_data, refdict, True)
                     print("......Writing Species Pages......")
-                    write_species_info_pages(printfile, True, species, references, specific_names, all_names, photos,
-                                             videos, art, species_refs, refdict, binomial_name_cnts, specific_name_cnts,
+                    write_species_info_pages(printfile, True, species, references, species_synonyms, photos, videos,
+                                             art, species_refs, refdict, binomial_name_cnts, specific_name_cnts,
                                              higher_dict, measurement_data, handedness_data, field_guide_data)
                     print("......Writing Name Pages......")
-                    write_all_name_pages(printfile, True, refdict, citelist, all_names, specific_names, name_table,
-                                         species_refs, genus_cnts, binomial_name_cnts, total_binomial_year_cnts,
-                                         binomial_point_locations, specific_point_locations, point_locations)
+                    write_all_name_pages(printfile, True, refdict, cite_index, all_names, specific_names, name_table,
+                                         species_refs, genus_cnts, binomial_name_cnts, specific_name_cnts,
+                                         total_binomial_year_cnts, binomial_point_locations, specific_point_locations,
+                                         point_locations)
                     if OUTPUT_LOCS:
                         print("......Writing Location Pages......")
                         write_geography_page(printfile, True, species)
@@ -6818,12 +7418,18 @@ def build_site() -> None:
                         write_reference_summary(printfile, True, len(references), yeardat, yeardat1900, citecount,
                                                 languages, languages_by_year)
                         write_reference_bibliography(printfile, True, references)
-                        write_reference_pages(printfile, True, references, refdict, citelist, name_table,
-                                              point_locations)
+                        write_reference_pages(printfile, True, references, refdict, cite_index, ref_names, cited_by,
+                                              name_table, point_locations)
                     end_print(printfile)
     end_time = datetime.datetime.now()
     print("End Time:", end_time)
     print("Total Run Time:", end_time - start_time)
+    print("Name Cache:")
+    for line in NAME_CACHE.report():
+        print("   " + line)
+    print("Output Written:")
+    for line in OUTPUT_STATS.report():
+        print("   " + line)
     print("done")
 
 
@@ -6831,8 +7437,11 @@ def main():
     # will eventually need to put options here for choosing different paths, etc.
     TMB_Initialize.initialize()
     random.seed()
+    if "--check" in sys.argv[1:]:
+        # only run the data checks, exiting with an error status if any problems are found
+        sys.exit(1 if check_site_data() > 0 else 0)
     # will need to read options from file
-    build_site()
+    build_site(incremental=INCREMENTAL_BUILD or ("--incremental" in sys.argv[1:]))
 
 
 if __name__ == "__main__":
@@ -2,14 +2,20 @@
 General Data Classes for the Taxonomy Manuscript Builder
 """
 
+import collections.abc
 from typing import Optional
-from TMB_Common import Number
+from TMB_Common import Number, LazyModule
 from TMB_Error import report_error
 
+numpy = LazyModule("numpy")
+
 
 # ----classes----
 class ReferenceClass:
     """ A class to hold references """
+    __slots__ = ("formatted_html", "citation", "cite_key", "language", "doi", "url", "taxon_author", "pub_year",
+                 "pub_author", "taxon_authority")
+
     def __init__(self):
         self.formatted_html = ""
         self.citation = ""
@@ -18,8 +24,18 @@ class ReferenceClass:
         self.doi = None
         self.url = None
         self.taxon_author = None
-
-    def year(self) -> Optional[int]:
+        # the following are extracted from the citation by parse_citation()
+        self.pub_year = None
+        self.pub_author = ""
+        self.taxon_authority = ""
+
+    def parse_citation(self) -> None:
+        """
+        extract the year, author, and taxonomic authority (Smith, 1900) from the citation string
+
+        called once when the reference is read, so any errors in the citation are only reported once
+        """
+        self.pub_year = None
         try:
             y = self.citation
             y = y[y.find("(") + 1:y.find(")")]
@@ -29,18 +45,24 @@ class ReferenceClass:
                 if len(y) > 4:
                     y = y[:4]
                 try:
-                    y = int(y)
+                    self.pub_year = int(y)
                 except ValueError:
                     report_error(f"Error finding year in reference citation info: {self.citation}")
-                    y = None
-                return y
         except IndexError:
             report_error(f"Citation Import Error: {self.formatted_html}")
+        self.pub_author = self.citation[:self.citation.find("(")].strip()
+        if self.taxon_author is not None:  # used to avoid et al. for papers with slightly unusual authority
+            self.taxon_authority = self.taxon_author
+        elif self.pub_year is None:
+            self.taxon_authority = self.pub_author + ", "
         else:
-            return None
+            self.taxon_authority = self.pub_author + ", " + str(self.pub_year)
+
+    def year(self) -> Optional[int]:
+        return self.pub_year
 
     def author(self) -> str:
-        return self.citation[:self.citation.find("(")].strip()
+        return self.pub_author
 
 
 class SpecificNameClass:
@@ -179,6 +201,9 @@ class SpeciesClass:
 
 class CitationClass:
     """ a class to hold citation data """
+    __slots__ = ("cite_key", "name_key", "name", "common", "where", "context", "application", "cite_n", "actual",
+                 "source", "name_note", "general_note", "applied_cites")
+
     def __init__(self):
         self.cite_key = ""
         self.name_key = ""
@@ -206,6 +231,9 @@ class CitationClass:
 
 class LocationClass:
     """ a class to hold location data """
+    __slots__ = ("name", "trimmed_name", "latitude", "longitude", "parent", "secondary_parents", "notes", "children",
+                 "secondary_children", "alternates", "validity", "unknown", "field_guide", "region")
+
     def __init__(self):
         self.name = ""
         self.trimmed_name = ""
@@ -256,12 +284,16 @@ class LocationClass:
 
 
 class Point:
+    __slots__ = ("lat", "lon")
+
     def __init__(self, lat: Number = 0, lon: Number = 0):
         self.lat = lat
         self.lon = lon
 
 
 class RangeCell:
+    __slots__ = ("lower_left_lat", "lower_left_lon", "upper_right_lat", "upper_right_lon", "wrap")
+
     def __init__(self, startlat=0, startlon=0, endlat=0, endlon=0):
         self.lower_left_lat = startlat
         self.lower_left_lon = startlon
@@ -291,6 +323,92 @@ class RangeCell:
             return False
 
 
+class RangeCellIndex:
+    """
+    a spatial index of the range cells of a group of species (or any other keys), bucketed on a regular lat/lon grid
+
+    a cell which wraps across the date line is added to the buckets on both sides of it; all of the candidate cells
+    for a set of points are tested at once with the same rules as RangeCell.inside()
+    """
+    def __init__(self, range_blocks: dict, bucket_size: Number = 10):
+        self.keys = list(range_blocks)
+        self.bucket_size = bucket_size
+        self.n_lat = int(-(-180 // bucket_size))
+        self.n_lon = int(-(-360 // bucket_size))
+        cells = [(i, c) for i, key in enumerate(self.keys) for c in range_blocks[key]]
+        self.owner = numpy.array([i for i, _ in cells], dtype=numpy.intp)
+        self.min_lat = numpy.array([c.lower_left_lat for _, c in cells], dtype=float)
+        self.max_lat = numpy.array([c.upper_right_lat for _, c in cells], dtype=float)
+        self.min_lon = numpy.array([c.lower_left_lon for _, c in cells], dtype=float)
+        self.max_lon = numpy.array([c.upper_right_lon for _, c in cells], dtype=float)
+        self.wrap = numpy.array([c.wrap for _, c in cells], dtype=bool)
+        buckets = {}
+        for j, (_, c) in enumerate(cells):
+            if c.wrap:
+                # the part west of the date line and the part east of it
+                lon_ranges = ((c.lower_left_lon, c.upper_right_lon + 360), (c.lower_left_lon - 360, c.upper_right_lon))
+            else:
+                lon_ranges = ((c.lower_left_lon, c.upper_right_lon),)
+            for row in range(self.lat_bucket(c.lower_left_lat), self.lat_bucket(c.upper_right_lat) + 1):
+                for minlon, maxlon in lon_ranges:
+                    for col in range(self.lon_bucket(minlon), self.lon_bucket(maxlon) + 1):
+                        buckets.setdefault(row * self.n_lon + col, set()).add(j)
+        self.buckets = {b: numpy.array(sorted(buckets[b]), dtype=numpy.intp) for b in buckets}
+
+    def lat_bucket(self, lat: Number) -> int:
+        return min(max(int((lat + 90) // self.bucket_size), 0), self.n_lat - 1)
+
+    def lon_bucket(self, lon: Number) -> int:
+        return min(max(int((lon + 180) // self.bucket_size), 0), self.n_lon - 1)
+
+    def hits(self, lats: list, lons: list) -> list:
+        """
+        return the (point, cell) index pairs of every cell which contains each point
+        """
+        lats = numpy.asarray(lats, dtype=float)
+        lons = numpy.asarray(lons, dtype=float)
+        rows = numpy.clip(((lats + 90) // self.bucket_size).astype(numpy.intp), 0, self.n_lat - 1)
+        cols = numpy.clip(((lons + 180) // self.bucket_size).astype(numpy.intp), 0, self.n_lon - 1)
+        point_buckets = rows * self.n_lon + cols
+        result = []
+        for b in numpy.unique(point_buckets):
+            cells = self.buckets.get(int(b))
+            if cells is None:
+                continue
+            points = numpy.flatnonzero(point_buckets == b)
+            lat = lats[points][:, None]
+            lon = lons[points][:, None]
+            wrapped_lon = numpy.where(lon < 0, lon + 360, lon)
+            inside_lat = (self.min_lat[cells] <= lat) & (lat <= self.max_lat[cells])
+            inside_lon = numpy.where(self.wrap[cells],
+                                     (self.min_lon[cells] <= wrapped_lon) & (wrapped_lon <= self.max_lon[cells] + 360),
+                                     (self.min_lon[cells] <= lon) & (lon <= self.max_lon[cells]))
+            p, c = numpy.nonzero(inside_lat & inside_lon)
+            result.extend(zip(points[p].tolist(), cells[c].tolist()))
+        return result
+
+    def classify(self, lats: list, lons: list) -> list:
+        """
+        for each point, the list of keys with a cell containing it, in the order the keys were given
+        """
+        found = [set() for _ in range(len(lats))]
+        for p, c in self.hits(lats, lons):
+            found[p].add(int(self.owner[c]))
+        return [[self.keys[i] for i in sorted(f)] for f in found]
+
+    def points_inside(self, lats: list, lons: list) -> list:
+        """
+        for each point, whether any cell contains it
+        """
+        inside = [False for _ in range(len(lats))]
+        for p, _ in self.hits(lats, lons):
+            inside[p] = True
+        return inside
+
+    def contains(self, lat: Number, lon: Number) -> bool:
+        return self.points_inside([lat], [lon])[0]
+
+
 class INatData:
     def __init__(self, coords: Point, url: str = ""):
         self.coords = coords
@@ -316,6 +434,8 @@ class MeasurementMean:
 
 
 class Measurement:
+    __slots__ = ("ref", "location", "id", "species", "sex", "notes", "type", "n", "value", "class_id")
+
     def __init__(self):
         self.ref = ""
         self.location = ""
@@ -347,3 +467,113 @@ class Handedness:
         self.right_p = 0
         self.left_p = 0
         self.notes = ""
+
+
+class SiteData:
+    """ a class to hold all of the data read and linked from the input files """
+    def __init__(self):
+        self.references = []
+        self.refdict = {}
+        self.citelist = []
+        self.yeardict = {}
+        self.citecount = 0
+        self.species = []
+        self.specific_names = []
+        self.common_name_data = []
+        self.taxon_ranks = []
+        self.higher_taxa = []
+        self.higher_dict = {}
+        self.photos = []
+        self.videos = []
+        self.art = []
+        self.morphology = []
+        self.unusual_development_data = []
+        self.species_range_blocks = {}
+        self.point_locations = {}
+        self.location_dict = {}
+        self.field_guide_list = {}
+        self.field_guide_data = {}
+        self.field_guide_map_data = {}
+        self.measurement_data = {}
+        self.handedness_data = []
+
+
+class CitationIndex:
+    """ a class to hold the citations grouped by their most commonly searched fields """
+    def __init__(self):
+        self.by_cite_key = {}
+        self.by_application = {}
+        self.by_actual = {}
+        self.by_context = {}
+        self.by_name = {}  # keyed by cleaned, lower-case name
+        # the location name of the application of each location, specimen, or sequence citation, with the extra
+        # location information stripped (None if the application is not a location), keyed by the raw application
+        self.location_names = {}
+
+
+class YearCountView(collections.abc.Mapping):
+    """ a read-only, dictionary-like view of the counts of a single name, keyed by year """
+    def __init__(self, counts, miny: int):
+        self.counts = counts  # one-dimensional numpy array, the first entry is for year miny
+        self.miny = miny
+
+    def __getitem__(self, year: int) -> int:
+        i = year - self.miny
+        if 0 <= i < len(self.counts):
+            return int(self.counts[i])
+        raise KeyError(year)
+
+    def __iter__(self):
+        return iter(range(self.miny, self.miny + len(self.counts)))
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def values(self) -> list:
+        return self.counts.tolist()
+
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def max(self) -> int:
+        return int(self.counts.max())
+
+
+class YearCounts(collections.abc.Mapping):
+    """ a class to hold the yearly counts of a set of names as a dense names by years matrix """
+    def __init__(self, names: list, miny: int, maxy: int):
+        self.miny = miny
+        self.maxy = maxy
+        self.row_index = {name: i for i, name in enumerate(names)}
+        self.counts = numpy.zeros((len(names), maxy - miny + 1), dtype=numpy.int64)
+
+    def __getitem__(self, name: str) -> YearCountView:
+        return YearCountView(self.counts[self.row_index[name]], self.miny)
+
+    def __iter__(self):
+        return iter(self.row_index)
+
+    def __len__(self) -> int:
+        return len(self.row_index)
+
+    def add(self, rows: list, years: list) -> None:
+        """
+        add one to the count of each (row, year) pair
+        """
+        columns = numpy.array(years, dtype=numpy.intp) - self.miny
+        numpy.add.at(self.counts, (numpy.array(rows, dtype=numpy.intp), columns), 1)
+
+    def rows(self, names: list) -> list:
+        return [self.row_index[name] for name in names]
+
+    def totals(self) -> list:
+        """
+        the total count of every row
+        """
+        return self.counts.sum(axis=1).tolist()
+
+    def sum_of(self, names: list) -> YearCountView:
+        """
+        the combined yearly counts of a list of names
+        """
+        return YearCountView(self.counts[self.rows(names)].sum(axis=0), self.miny)
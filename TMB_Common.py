@@ -2,11 +2,201 @@
 Module containing miscellaneous functions used by a variety of other modules
 """
 
-from typing import Union
+import collections
+import functools
+import importlib
+import locale
+import os
+import re
+import threading
+from typing import Callable, Optional, Union
+import TMB_Manifest
 
 Number = Union[int, float]
 
 
+class LazyModule:
+    """ a placeholder for a module which is only imported the first time one of its attributes is used """
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+class MemoCache:
+    """
+    a bounded cache shared by the pure string functions, with hit and miss counts kept for each function
+
+    the cache can be used from several threads at once; each process has its own cache, and the counts from the
+    page-writing worker processes are added back with add_counts()
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data = {}  # keyed by (function name, argument)
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+        self.lock = threading.Lock()
+
+    def memoize(self, func: Callable[[str], str]) -> Callable[[str], str]:
+        """
+        decorator which caches the results of a single-argument function
+        """
+        fname = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(x: str) -> str:
+            key = (fname, x)
+            with self.lock:
+                try:
+                    result = self.data[key]
+                    self.hits[fname] += 1
+                    return result
+                except KeyError:
+                    self.misses[fname] += 1
+            # the function is called without holding the lock, as it may itself use the cache
+            result = func(x)
+            with self.lock:
+                if len(self.data) >= self.maxsize:
+                    # drop the oldest entry
+                    self.data.pop(next(iter(self.data)), None)
+                self.data[key] = result
+            return result
+        return wrapper
+
+    def counts(self) -> tuple:
+        """
+        copies of the hit and miss counts
+        """
+        with self.lock:
+            return collections.Counter(self.hits), collections.Counter(self.misses)
+
+    def add_counts(self, hits: collections.Counter, misses: collections.Counter) -> None:
+        """
+        add hit and miss counts gathered by another process
+        """
+        with self.lock:
+            self.hits.update(hits)
+            self.misses.update(misses)
+
+    def report(self) -> list:
+        """
+        one line of hit and miss counts for each function which has used the cache
+        """
+        lines = []
+        for fname in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits[fname]
+            total = hits + self.misses[fname]
+            lines.append(f"{fname}: {hits} hits, {self.misses[fname]} misses ({100 * hits / total:0.1f}% hit rate)")
+        return lines
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+            self.hits.clear()
+            self.misses.clear()
+
+
+NAME_CACHE = MemoCache(100000)
+
+
+class OutputStats:
+    """ counts of the files and bytes written through PageWriter, kept for each stage of the build """
+    def __init__(self):
+        self.stage = ""
+        self.stages = []
+        self.files = collections.Counter()
+        self.bytes = collections.Counter()
+        self.unchanged = collections.Counter()  # files not rewritten because their content was the same
+        self._lock = threading.Lock()
+
+    def start_stage(self, stage: str) -> None:
+        self.stage = stage
+        if stage not in self.stages:
+            self.stages.append(stage)
+
+    def add(self, n_files: int, n_bytes: int, n_unchanged: int = 0) -> None:
+        with self._lock:
+            self.files[self.stage] += n_files
+            self.bytes[self.stage] += n_bytes
+            self.unchanged[self.stage] += n_unchanged
+
+    def totals(self) -> tuple:
+        """
+        the total number of files and bytes written, and of unchanged files, across every stage
+        """
+        return sum(self.files.values()), sum(self.bytes.values()), sum(self.unchanged.values())
+
+    def report(self) -> list:
+        """
+        one line of file and byte counts for each stage, in the order the stages were started
+        """
+        lines = []
+        for stage in self.stages:
+            if self.files[stage] + self.unchanged[stage] > 0:
+                lines.append(f"{stage}: {self.files[stage]} files, {self.bytes[stage]:,} bytes, "
+                             f"{self.unchanged[stage]} unchanged")
+        n_files, n_bytes, n_unchanged = self.totals()
+        lines.append(f"Total: {n_files} files, {n_bytes:,} bytes, {n_unchanged} unchanged")
+        return lines
+
+    def clear(self) -> None:
+        self.stage = ""
+        self.stages.clear()
+        self.files.clear()
+        self.bytes.clear()
+        self.unchanged.clear()
+
+
+OUTPUT_STATS = OutputStats()
+
+
+class PageWriter:
+    """
+    a write-only text file which collects its fragments in memory and writes them in a single call when closed
+
+    the text is written through the output manifest (if any), so a page whose content has not changed is not
+    rewritten, and otherwise to a temporary file which then replaces the target, so a page is never left half-written
+    """
+    def __init__(self, filename: str, encoding: Optional[str] = None):
+        self.filename = filename
+        self.encoding = encoding
+        self.fragments = []
+        self.write = self.fragments.append
+
+    def writelines(self, lines) -> None:
+        self.fragments.extend(lines)
+
+    def getvalue(self) -> str:
+        return "".join(self.fragments)
+
+    def close(self) -> None:
+        text = self.getvalue()
+        # match the newline translation and default encoding of a file opened in text mode
+        if os.linesep != "\n":
+            text = text.replace("\n", os.linesep)
+        data = text.encode(self.encoding or locale.getpreferredencoding(False))
+        if TMB_Manifest.write_output(self.filename, data):
+            OUTPUT_STATS.add(1, len(data))
+        else:
+            OUTPUT_STATS.add(0, 0, 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        # a page which failed part way through is discarded rather than written
+        if exc_type is None:
+            self.close()
+        return False
+
+
 def indent(n: int) -> str:
     return n * " "
 
@@ -19,55 +209,59 @@ def pointmap_name(name: str) -> str:
     return name + "_point_map"
 
 
+NAME_FILENAME_TABLE = str.maketrans({
+    " ": "_",
+    "(": "",
+    ")": "",
+    ",": "",
+    ".": "",
+    "\"": "",
+    "æ": "_ae_",
+    "ö": "_o_",
+    "œ": "_oe_",
+    "ç": "_c_",
+    "[": "_",
+    "]": "_"
+})
+
+
+@NAME_CACHE.memoize
 def name_to_filename(x: str) -> str:
     """
     Convert a full species name into a valid file name
     """
-    name_replace_list = [
-        [" ", "_"],
-        ["(", ""],
-        [")", ""],
-        [",", ""],
-        [".", ""],
-        ["\"", ""],
-        ["æ", "_ae_"],
-        ["ö", "_o_"],
-        ["œ", "_oe_"],
-        ["ç", "_c_"],
-        ["[", "_"],
-        ["]", "_"]
-    ]
-    for r in name_replace_list:
-        x = x.replace(r[0], r[1])
-    return x
+    return x.translate(NAME_FILENAME_TABLE)
 
 
+PLACE_FILENAME_REPLACE = {
+    ", ": "_-_",
+    " (": "_-_",
+    ")": "",
+    "/": "-",
+    " ": "_",
+    "\"": "",
+    "'": "",
+    "ç": "c",
+    "ñ": "n",
+    "ã": "a",
+    "á": "a",
+    "é": "e",
+    "í": "i",
+    "ó": "o",
+    "ơ": "o",
+    "ú": "u",
+    "ū": "u"
+}
+# the two-character patterns are listed first so they take precedence over a lone space
+PLACE_FILENAME_PATTERN = re.compile("|".join(re.escape(k) for k in PLACE_FILENAME_REPLACE))
+
+
+@NAME_CACHE.memoize
 def place_to_filename(x: str) -> str:
     """
     Convert a location name into a valid file name
     """
-    place_replace_list = [
-        [", ", "_-_"],
-        [" (", "_-_"],
-        [")", ""],
-        ["/", "-"],
-        [" ", "_"],
-        ["\"", ""],
-        ["'", ""],
-        ["ç", "c"],
-        ["ñ", "n"],
-        ["ã", "a"],
-        ["á", "a"],
-        ["é", "e"],
-        ["í", "i"],
-        ["ó", "o"],
-        ["ơ", "o"],
-        ["ú", "u"],
-        ["ū", "u"]
-    ]
-    for r in place_replace_list:
-        x = x.replace(r[0], r[1])
-    return x
+    return PLACE_FILENAME_PATTERN.sub(lambda m: PLACE_FILENAME_REPLACE[m.group(0)], x)
 
 
 def unicode_to_html_encoding(x: str) -> str:
@@ -3,7 +3,7 @@ Module containing the various graph and chart drawing algorithms (except for tho
 """
 
 # external dependencies
-from typing import Optional
+from typing import BinaryIO, Optional, Union
 import matplotlib.pyplot as mplpy
 import matplotlib.ticker
 from wordcloud import WordCloud
@@ -208,7 +208,7 @@ def create_word_cloud_image(binomial_cnts: dict, specific_cnts: dict, font_path:
     wordcloud.to_file(__TMP_PATH__ + "specific_word_cloud.png")
 
 
-def create_handedness_chart_file(filename: str, data: list, graph_font: Optional[str] = None) -> None:
+def create_handedness_chart_file(filename: Union[str, BinaryIO], data: list, graph_font: Optional[str] = None) -> None:
     y_list = [i for i in range(len(data))]
     right_x = [d.right_cnt for d in data]
     left_x = [-d.left_cnt for d in data]
@@ -17,7 +17,7 @@ import numpy
 import TMB_Initialize
 from TMB_Error import report_error
 from TMB_Common import *
-from TMB_Classes import Point
+from TMB_Classes import Point, RangeCellIndex
 import TMB_ImportShape
 
 
@@ -40,25 +40,24 @@ class BaseMap:
             return False
 
 
-def point_in_blocks(p: Point, blocks: list) -> bool:
+def point_in_blocks(p: Point, blocks: RangeCellIndex) -> bool:
     """
     test whether the point is in any of the blocks
     """
-    for b in blocks:
-        if b.inside(p.lat, p.lon):
-            return True
-    return False
+    return blocks.contains(p.lat, p.lon)
 
 
 def get_range_map_overlap(blocks: list, coastline: list) -> list:
     species_range = []
+    block_index = RangeCellIndex({"range": blocks})
     for part in coastline:
+        # test every point of the part at once
+        inside = block_index.points_inside([p.lat for p in part], [p.lon for p in part])
         p1 = part[0]
-        p1in = point_in_blocks(p1, blocks)
+        p1in = inside[0]
         startline = True
         newline = []
-        for p2 in part[1:]:
-            p2in = point_in_blocks(p2, blocks)
+        for p2, p2in in zip(part[1:], inside[1:]):
             if p1in and p2in:
                 if startline:
                     newline = [p1, p2]
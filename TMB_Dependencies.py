@@ -0,0 +1,176 @@
+"""
+Dependency tracking for incremental builds
+
+While each individual page is written, the input records it reads are noted as (kind, key) pairs, such as
+("species", "pugilator") or ("citations", cite_key), along with the output files it writes and the errors it
+reports. After a build these are
+saved with a fingerprint of every record. On the next build the fingerprints are compared to find the records which
+were added, changed, or removed, and only the pages which read one of them (or which did not exist before) need to
+be written again; the errors of the pages which are not written are reported again from the previous build, so the
+error log is the same as after a full build. Data which are not split into records are fingerprinted as a whole under the kind "site"; if any
+of them change, every page is written again.
+"""
+
+import os
+import json
+import hashlib
+from typing import Optional
+
+# increase whenever the record kinds or the fingerprints change so that old dependencies are ignored
+DEPENDENCY_VERSION = 2
+
+# the records read and the files written by the page currently being written, if any
+READING = None
+WRITING = None
+
+
+def canonical(x, inside: bool = False):
+    """
+    convert data into nested lists of basic values which do not depend on memory addresses or set ordering
+
+    records nested inside another record (e.g., the parent of a location) are represented only by their key, so a
+    change to one record does not change the fingerprint of every record linked to it
+    """
+    if (x is None) or isinstance(x, (str, int, float, bool)):
+        return x
+    if isinstance(x, (list, tuple)):
+        return [canonical(v, inside) for v in x]
+    if isinstance(x, (set, frozenset)):
+        return sorted((canonical(v, inside) for v in x), key=repr)
+    if isinstance(x, dict):
+        return sorted(([canonical(k, inside), canonical(v, inside)] for k, v in x.items()), key=repr)
+    if hasattr(x, "tolist"):  # numpy arrays and scalars
+        return canonical(x.tolist(), inside)
+    if hasattr(x, "__dict__") or hasattr(type(x), "__slots__"):
+        if inside:
+            for attr in ("cite_key", "species", "name"):
+                if hasattr(x, attr):
+                    return [type(x).__name__, getattr(x, attr)]
+        return [type(x).__name__, canonical(record_attributes(x), True)]
+    return repr(x)
+
+
+def record_attributes(x) -> dict:
+    if hasattr(x, "__dict__"):
+        return vars(x)
+    slots = [attr for cls in type(x).__mro__ for attr in getattr(cls, "__slots__", ())]
+    return {attr: getattr(x, attr, None) for attr in slots}
+
+
+def fingerprint(record, *derived) -> str:
+    """
+    the content hash of a record (or list of records) and of any data derived from it
+    """
+    data = [canonical(record), canonical(derived, True)]
+    return hashlib.sha256(repr(data).encode("utf-8")).hexdigest()
+
+
+def record_read(kind: str, key: str) -> None:
+    """
+    note that the page currently being written reads a record
+    """
+    if READING is not None:
+        READING.add((kind, key))
+
+
+def record_write(filename: str) -> None:
+    """
+    note that the page currently being written writes a file
+    """
+    if WRITING is not None:
+        WRITING.append(filename)
+
+
+def start_page() -> None:
+    global READING, WRITING
+    READING = set()
+    WRITING = []
+
+
+def end_page() -> tuple:
+    """
+    return the records read and the files written since the page was started
+    """
+    global READING, WRITING
+    reads, files = READING, WRITING
+    READING = None
+    WRITING = None
+    return reads, files
+
+
+class PageDependencies:
+    """ the records read, the files written, and the errors reported by each page, keyed by page """
+    def __init__(self, fingerprints: dict):
+        self.fingerprints = fingerprints  # keyed by kind, then by record key
+        self.pages = {}  # (set of (kind, key) pairs, list of files, list of errors), keyed by page
+        self.previous_pages = {}
+        self.changed = None  # the changed records, or None if every page must be written
+
+    def compare(self, previous_fingerprints: dict, previous_pages: dict) -> None:
+        """
+        find the records which differ from the previous build, so that only the pages which read them are written
+        """
+        changed = set()
+        for kind in set(previous_fingerprints) | set(self.fingerprints):
+            old = previous_fingerprints.get(kind, {})
+            new = self.fingerprints.get(kind, {})
+            for key in set(old) | set(new):
+                if old.get(key) != new.get(key):
+                    changed.add((kind, key))
+        if any(kind == "site" for kind, _ in changed):
+            return
+        self.changed = changed
+        self.previous_pages = previous_pages
+
+    def needs_update(self, page: str) -> bool:
+        """
+        return True if a page must be written, otherwise keep its dependencies and errors from the previous build
+        """
+        if self.changed is None:
+            return True
+        previous = self.previous_pages.get(page)
+        if previous is None:
+            return True
+        reads, files, _ = previous
+        if (not reads.isdisjoint(self.changed)) or not all(os.path.exists(f) for f in files):
+            return True
+        self.pages[page] = previous
+        return False
+
+    def add(self, page: str, reads: set, files: list, errors: list) -> None:
+        self.pages[page] = (reads, files, errors)
+
+    def n_changed(self) -> Optional[int]:
+        return None if self.changed is None else len(self.changed)
+
+    def save(self, filename: str) -> None:
+        pages = {page: {"reads": sorted(list(r) for r in reads), "files": files, "errors": errors}
+                 for page, (reads, files, errors) in self.pages.items()}
+        output = {"version": DEPENDENCY_VERSION, "fingerprints": self.fingerprints, "pages": pages}
+        tmp_name = filename + ".tmp"
+        with open(tmp_name, "w", encoding="utf-8") as outfile:
+            json.dump(output, outfile, ensure_ascii=False)
+        os.replace(tmp_name, filename)
+
+
+# the dependencies of the pages of the current build, or None if they are not being tracked
+DEPENDENCIES = None
+
+
+def load_dependencies(filename: str, fingerprints: dict, incremental: bool) -> PageDependencies:
+    """
+    start tracking the dependencies of a build with the given record fingerprints; for an incremental build, the
+    dependencies saved by the previous build (if any) are used to decide which pages must be written
+    """
+    dependencies = PageDependencies(fingerprints)
+    if incremental:
+        try:
+            with open(filename, "r", encoding="utf-8") as infile:
+                data = json.load(infile)
+        except (OSError, ValueError):
+            return dependencies
+        if data.get("version") == DEPENDENCY_VERSION:
+            previous_pages = {page: ({tuple(r) for r in p["reads"]}, p["files"], p["errors"])
+                              for page, p in data["pages"].items()}
+            dependencies.compare(data["fingerprints"], previous_pages)
+    return dependencies
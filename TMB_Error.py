@@ -2,10 +2,45 @@
 Error reporting
 """
 
+import threading
+from typing import Callable
+
 LOGFILE = None
+ERROR_RECORD = None  # if set to a list, every reported error is also collected here
+ECHO = True  # if False, errors are not printed to the screen (e.g., in worker processes whose errors are collected)
+# the errors held back by each thread which is collecting its errors rather than reporting them
+COLLECTED = threading.local()
 
 
 def report_error(outstr: str) -> None:
-    print(outstr)
+    held = getattr(COLLECTED, "errors", None)
+    if held is not None:
+        held.append(outstr)
+        return
+    if ECHO:
+        print(outstr)
     if LOGFILE is not None:
         print(outstr, file=LOGFILE)
+    if ERROR_RECORD is not None:
+        ERROR_RECORD.append(outstr)
+
+
+def collect_errors(func: Callable, *args) -> tuple:
+    """
+    call func(*args) while holding back the errors it reports in the current thread, so that errors from functions
+    run at the same time on different threads can afterwards be reported in a fixed order
+
+    returns the result of the function and the list of errors; if the function fails, the errors it reported are
+    reported straight away before the exception is passed on, as they usually explain the failure
+    """
+    errors = []
+    COLLECTED.errors = errors
+    try:
+        result = func(*args)
+    except BaseException:
+        COLLECTED.errors = None
+        for e in errors:
+            report_error(e)
+        raise
+    COLLECTED.errors = None
+    return result, errors
@@ -3,7 +3,10 @@ Functions to read data from files
 """
 
 import collections
-from typing import Tuple, Optional
+import concurrent.futures
+import sqlite3
+import threading
+from typing import Tuple, Optional, Callable, Iterator
 import urllib.request
 import csv
 import time
@@ -13,49 +16,112 @@ from TMB_Error import report_error
 from TMB_Common import str_to_number
 
 
-def read_simple_file(filename: str) -> list:
+class Column:
+    """ a class describing how one column of a tab-delimited data file is stored in a data object """
+    def __init__(self, attribute: Optional[str] = None, convert: Optional[Callable] = None, skip: tuple = ()):
+        self.attribute = attribute  # None for columns which are not stored
+        self.convert = convert  # optional function to convert the text of the column into the stored value
+        self.skip = skip  # column values which leave the attribute at its default, usually "."
+
+
+def yes_no(x: str) -> bool:
+    return x == "Yes"
+
+
+def split_list(x: str) -> list:
+    return list(x.split(";"))
+
+
+CITATION_SCHEMA = (Column("cite_key"), Column("name_key"), Column("name"), Column("common"), Column("where"),
+                   Column("context"), Column("application"), Column("cite_n"), Column("actual"), Column("source"),
+                   Column("name_note"), Column("general_note"))
+
+SPECIES_SCHEMA = (Column("species"), Column("genus"), Column("subgenus", skip=(".",)), Column("type_species"),
+                  Column("type_reference"), Column("common"), Column("commonext"), Column("range"),
+                  Column("range_references"), Column("realm"), Column("status"), Column("key_photo", yes_no),
+                  Column("taxonid"), Column("eolid"), Column("inatid"), Column("gbifid"), Column("phy_photo", yes_no))
+
+PHOTO_SCHEMA = (Column("species"), Column("n"), Column("caption"))
+
+VIDEO_SCHEMA = (Column("species"), Column("n"), Column("activity"), Column("caption"), Column("length"),
+                Column("width", int), Column("height", int), Column("format"), Column("date_location"),
+                Column("author"), Column("notes"))
+
+HIGHER_TAXA_SCHEMA = (Column("name"), Column("taxon_rank"), Column("parent", skip=(".",)), Column("author"),
+                      Column("type_species"), Column("notes"), Column("taxonid"), Column("eolid"))
+
+TAXON_RANK_SCHEMA = (Column("rank"), Column("plural"), Column("notes"))
+
+SPECIFIC_NAME_SCHEMA = (Column("name"), Column("variations"), Column("synonym"), Column("original_binomial"),
+                        Column("priority_source"), Column("meaning"), Column("notes"))
+
+ART_SCHEMA = (Column("art_type"), Column("cite_key"), Column("author"), Column("year"), Column("title"),
+              Column("image"), Column("ext"), Column("species"), Column("notes"))
+
+MORPHOLOGY_SCHEMA = (Column("character"), Column("parent"), Column("image"), Column("caption"),
+                     Column("description"))
+
+# latitude and longitude are converted separately, as failure marks the location as unknown rather than an error
+# column 4 is for reference but not needed as data
+LOCATION_SCHEMA = (Column("name"), Column("latitude"), Column("longitude"), Column("notes", skip=(".",)), Column(),
+                   Column("trimmed_name"), Column("alternates", split_list, skip=(".",)),
+                   Column("parent", skip=(".",)), Column("secondary_parents", split_list, skip=(".",)),
+                   Column("validity"), Column("field_guide", skip=(".", "n/a")),
+                   Column("region", lambda x: x == "region"))
+
+
+def read_data_rows(filename: str) -> Iterator[Tuple[int, list]]:
     """
-    read data from generic flatfile
+    stream the rows of a generic flatfile, yielding the line number and list of column values of each data row
     """
     with open(filename, "r", encoding="utf-8") as infile:
-        data_list = []
-        got_header = False
-        for line in infile:
-            if got_header:
-                line = line.strip()
-                line = line.replace('""', '"')  # replace consecutive double quotation marks with a single one
-                line_data = line.split("\t")
+        next(infile, None)  # skip header
+        lines = (line.strip() for line in infile)
+        for row_n, line_data in enumerate(csv.reader(lines, delimiter="\t", quoting=csv.QUOTE_NONE), start=2):
+            if len(line_data) > 0:
                 for i, x in enumerate(line_data):
+                    x = x.replace('""', '"')  # replace consecutive double quotation marks with a single one
                     if x.startswith('"') and x.endswith('"'):  # strip double quotation marks off ends if present
-                        line_data[i] = x[1:len(x)-1]
-                data_list.append(line_data)
-            else:
-                got_header = True
-    return data_list
+                        x = x[1:len(x)-1]
+                    line_data[i] = x
+                yield row_n, line_data
+
+
+def read_simple_file(filename: str) -> list:
+    """
+    read data from generic flatfile
+    """
+    return [line_data for _, line_data in read_data_rows(filename)]
+
+
+def read_data_objects(filename: str, data_class: type, schema: tuple) -> Iterator:
+    """
+    stream the rows of a generic flatfile as new objects of data_class, filled as described by the column schema
+    """
+    for row_n, line_data in read_data_rows(filename):
+        if len(line_data) < len(schema):
+            message = f"Import Error: {filename}, row {row_n}: expected {len(schema)} columns, found {len(line_data)}"
+            report_error(message)
+            raise ValueError(message)
+        new_object = data_class()
+        for column, x in zip(schema, line_data):
+            if (column.attribute is not None) and (x not in column.skip):
+                if column.convert is not None:
+                    try:
+                        x = column.convert(x)
+                    except ValueError as e:
+                        message = f"Import Error: {filename}, row {row_n}: invalid value for {column.attribute}: {x}"
+                        report_error(message)
+                        raise ValueError(message) from e
+                setattr(new_object, column.attribute, x)
+        yield new_object
 
 
 def read_citation_file(filename: str) -> list:
     """
     read citation info
     """
-    tmplist = read_simple_file(filename)
-    cite_list = []
-    for cite in tmplist:
-        newcite = TMB_Classes.CitationClass()
-        newcite.cite_key = cite[0]
-        newcite.name_key = cite[1]
-        newcite.name = cite[2]
-        newcite.common = cite[3]
-        newcite.where = cite[4]
-        newcite.context = cite[5]
-        newcite.application = cite[6]
-        newcite.cite_n = cite[7]
-        newcite.actual = cite[8]
-        newcite.source = cite[9]
-        newcite.name_note = cite[10]
-        newcite.general_note = cite[11]
-        cite_list.append(newcite)
-    return cite_list
+    return list(read_data_objects(filename, TMB_Classes.CitationClass, CITATION_SCHEMA))
 
 
 def read_reference_data(ref_filename: str, formatref_filename: str,
@@ -87,12 +153,6 @@ def read_reference_data(ref_filename: str, formatref_filename: str,
                 newref.url = ref[4]
             if ref[5] != "":
                 newref.taxon_author = ref[5]  # used to avoid et al. for papers with slightly unusual authority
-
-            # calculate publishing trend
-            y = newref.year()
-            if y is not None:
-                year_dat.update([y])
-            cite_done[newref.cite_key] = [False, y]
             ref_list.append(newref)
 
             if newref.citation == "":
@@ -117,10 +177,19 @@ def read_reference_data(ref_filename: str, formatref_filename: str,
                 c += 1
                 newref = ref_list[c]
                 newref.formatted_html = line
+
+    # parsed once the formatted references are known, so a citation error can name the full reference
+    for ref in ref_list:
+        ref.parse_citation()
+        # calculate publishing trend
+        y = ref.year()
+        if y is not None:
+            year_dat.update([y])
+        cite_done[ref.cite_key] = [False, y]
+
+    # duplicate keys are reported by the data checks
     refdict = {}
     for ref in ref_list:
-        if ref.cite_key in refdict and ref.cite_key != "<pending>":
-            report_error(f"Duplicate reference key: {ref.cite_key}")
         refdict[ref.cite_key] = ref
 
     # citation records information
@@ -144,35 +213,7 @@ def read_species_data(filename: str) -> list:
     """
     read data from species flatfile
     """
-    tmplist = read_simple_file(filename)
-    species_list = []
-    for s in tmplist:
-        newspecies = TMB_Classes.SpeciesClass()
-        newspecies.species = s[0]
-        newspecies.genus = s[1]
-        if s[2] != ".":
-            newspecies.subgenus = s[2]
-        newspecies.type_species = s[3]
-        newspecies.type_reference = s[4]
-        newspecies.common = s[5]
-        newspecies.commonext = s[6]
-        newspecies.range = s[7]
-        newspecies.range_references = s[8]
-        newspecies.realm = s[9]
-        newspecies.status = s[10]
-        if s[11] == "Yes":
-            newspecies.key_photo = True
-        else:
-            newspecies.key_photo = False
-        newspecies.taxonid = s[12]
-        newspecies.eolid = s[13]
-        newspecies.inatid = s[14]
-        newspecies.gbifid = s[15]
-        if s[16] == "Yes":
-            newspecies.phy_photo = True
-        else:
-            newspecies.phy_photo = False
-        species_list.append(newspecies)
+    species_list = list(read_data_objects(filename, TMB_Classes.SpeciesClass, SPECIES_SCHEMA))
     species_list.sort()  # sort into alphabetical order
     return species_list
 
@@ -181,63 +222,31 @@ def read_photo_data(filename: str) -> list:
     """
     read data from photo flatfile
     """
-    tmplist = read_simple_file(filename)
-    photo_list = []
-    for p in tmplist:
-        newphoto = TMB_Classes.PhotoClass()
-        newphoto.species = p[0]
-        newphoto.n = p[1]
-        newphoto.caption = p[2]
-        photo_list.append(newphoto)
-    return photo_list
+    return list(read_data_objects(filename, TMB_Classes.PhotoClass, PHOTO_SCHEMA))
 
 
 def read_video_data(filename: str) -> list:
     """
     read data from video flatfile
     """
-    tmplist = read_simple_file(filename)
-    video_list = []
-    for v in tmplist:
-        newvideo = TMB_Classes.VideoClass()
-        newvideo.species = v[0]
-        newvideo.n = v[1]
-        newvideo.activity = v[2]
-        newvideo.caption = v[3]
-        newvideo.length = v[4]
-        newvideo.width = int(v[5])
-        newvideo.height = int(v[6])
-        newvideo.format = v[7]
-        newvideo.date_location = v[8]
-        newvideo.author = v[9]
-        newvideo.notes = v[10]
-        video_list.append(newvideo)
-    return video_list
+    return list(read_data_objects(filename, TMB_Classes.VideoClass, VIDEO_SCHEMA))
 
 
 def read_higher_taxa_data(filename: str) -> Tuple[list, dict]:
     """
     read data on taxa of ranks other than species
     """
-    tmplist = read_simple_file(filename)
     taxon_list = []
     tmpdict = {}
-    for g in tmplist:
-        new_taxon = TMB_Classes.RankedTaxonClass()
-        new_taxon.name = g[0]
-        new_taxon.taxon_rank = g[1]
-        if g[2] != ".":
-            if g[2] in tmpdict:
-                p = tmpdict[g[2]]
+    for new_taxon in read_data_objects(filename, TMB_Classes.RankedTaxonClass, HIGHER_TAXA_SCHEMA):
+        if new_taxon.parent is not None:
+            if new_taxon.parent in tmpdict:
+                p = tmpdict[new_taxon.parent]
                 new_taxon.parent = p
                 p.children.append(new_taxon)
             else:
-                report_error(f"Import Error: Taxon Parent Not Found: {g[2]}")
-        new_taxon.author = g[3]
-        new_taxon.type_species = g[4]
-        new_taxon.notes = g[5]
-        new_taxon.taxonid = g[6]
-        new_taxon.eolid = g[7]
+                report_error(f"Import Error: Taxon Parent Not Found: {new_taxon.parent}")
+                new_taxon.parent = None
         taxon_list.append(new_taxon)
         tmpdict[new_taxon.taxon_rank + new_taxon.name] = new_taxon
     return taxon_list, tmpdict
@@ -247,72 +256,28 @@ def read_taxon_rank_data(filename: str) -> list:
     """
     read data on type of taxonomic ranks
     """
-    tmplist = read_simple_file(filename)
-    rank_list = []
-    for g in tmplist:
-        new_rank = TMB_Classes.TaxonTypeClass()
-        new_rank.rank = g[0]
-        new_rank.plural = g[1]
-        new_rank.notes = g[2]
-        rank_list.append(new_rank)
-    return rank_list
+    return list(read_data_objects(filename, TMB_Classes.TaxonTypeClass, TAXON_RANK_SCHEMA))
 
 
 def read_specific_names_data(filename: str) -> list:
     """
     read specific name data
     """
-    tmplist = read_simple_file(filename)
-    spec_name_list = []
-    for s in tmplist:
-        newname = TMB_Classes.SpecificNameClass()
-        newname.name = s[0]
-        newname.variations = s[1]
-        newname.synonym = s[2]
-        newname.original_binomial = s[3]
-        newname.priority_source = s[4]
-        newname.meaning = s[5]
-        newname.notes = s[6]
-        spec_name_list.append(newname)
-    return spec_name_list
+    return list(read_data_objects(filename, TMB_Classes.SpecificNameClass, SPECIFIC_NAME_SCHEMA))
 
 
 def read_art_data(filename: str) -> list:
     """
     read art data
     """
-    tmplist = read_simple_file(filename)
-    art_list = []
-    for a in tmplist:
-        newart = TMB_Classes.ArtClass()
-        newart.art_type = a[0]
-        newart.cite_key = a[1]
-        newart.author = a[2]
-        newart.year = a[3]
-        newart.title = a[4]
-        newart.image = a[5]
-        newart.ext = a[6]
-        newart.species = a[7]
-        newart.notes = a[8]
-        art_list.append(newart)
-    return art_list
+    return list(read_data_objects(filename, TMB_Classes.ArtClass, ART_SCHEMA))
 
 
 def read_morphology_data(filename: str) -> list:
     """
     read morphology data
     """
-    tmplist = read_simple_file(filename)
-    morph_list = []
-    for m in tmplist:
-        newmorph = TMB_Classes.MorphologyClass()
-        newmorph.character = m[0]
-        newmorph.parent = m[1]
-        newmorph.image = m[2]
-        newmorph.caption = m[3]
-        newmorph.description = m[4]
-        morph_list.append(newmorph)
-    return morph_list
+    return list(read_data_objects(filename, TMB_Classes.MorphologyClass, MORPHOLOGY_SCHEMA))
 
 
 def read_common_name_data(filename: str) -> list:
@@ -327,35 +292,42 @@ def read_location_data(filename: str) -> dict:
     """
     read location data
     """
-    tmplist = read_simple_file(filename)
     locdict = {}
-    for loc in tmplist:
-        newloc = TMB_Classes.LocationClass()
-        newloc.name = loc[0]
+    for newloc in read_data_objects(filename, TMB_Classes.LocationClass, LOCATION_SCHEMA):
+        lat, lon = newloc.latitude, newloc.longitude
+        newloc.latitude, newloc.longitude = 0, 0
         try:
-            newloc.latitude = float(loc[1])
-            newloc.longitude = float(loc[2])
+            newloc.latitude = float(lat)
+            newloc.longitude = float(lon)
         except ValueError:
             newloc.unknown = True
-        if loc[3] != ".":
-            newloc.notes = loc[3]
-        # column 4 is for reference but not needed as data
-        newloc.trimmed_name = loc[5]
-        if loc[6] != ".":
-            newloc.alternates = list(loc[6].split(";"))
-        if loc[7] != ".":
-            newloc.parent = loc[7]
-        if loc[8] != ".":
-            newloc.secondary_parents = list(loc[8].split(";"))
-        newloc.validity = loc[9]
-        if (loc[10] != ".") and (loc[10] != "n/a"):
-            newloc.field_guide = loc[10]
-        if loc[11] == "region":
-            newloc.region = True
         locdict[newloc.name] = newloc
     return locdict
 
 
+INAT_URL = "https://www.inaturalist.org"
+INAT_PER_PAGE = 200
+
+
+class RateLimiter:
+    """ a class to space out the start of web requests shared among several threads """
+    def __init__(self, requests_per_second: float):
+        self.interval = 1 / requests_per_second
+        self.next_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        """
+        block until the next request is allowed to start
+        """
+        with self.lock:
+            now = time.monotonic()
+            start_time = max(now, self.next_time)
+            self.next_time = start_time + self.interval
+        if start_time > now:
+            time.sleep(start_time - now)
+
+
 def get_webpage(url: str, encoding: str) -> list:
     """
     function to fetch the webpage specifed by url and return a list containing the contents of the page
@@ -367,37 +339,172 @@ def get_webpage(url: str, encoding: str) -> list:
     return lines
 
 
-def fetch_inat_data(species: list) -> dict:
+class INatStore:
+    """ a class holding a local SQLite copy of the iNaturalist observations of each taxon and when they were synced """
+    def __init__(self, filename: str = ":memory:"):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS observations (taxon TEXT, id INTEGER, latitude REAL, "
+                                    "longitude REAL, url TEXT, PRIMARY KEY (taxon, id))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS sync_status (taxon TEXT PRIMARY KEY, last_sync REAL, "
+                                    "last_full_sync REAL, last_id INTEGER DEFAULT 0)")
+            # stores created before the highest downloaded id was recorded
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(sync_status)")]
+            if "last_id" not in columns:
+                self.connection.execute("ALTER TABLE sync_status ADD COLUMN last_id INTEGER DEFAULT 0")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def sync_status(self, taxon: str) -> Tuple[float, float, int]:
+        """
+        return the times of the last sync and the last full sync of a taxon (0 if never synced), and the highest
+        observation id downloaded by the last sync, including observations which were not stored
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT last_sync, last_full_sync, last_id FROM sync_status WHERE taxon = ?",
+                                          (taxon,)).fetchone()
+        if row is None:
+            return 0, 0, 0
+        return row
+
+    def set_sync_status(self, taxon: str, last_sync: float, last_full_sync: float, last_id: int) -> None:
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO sync_status VALUES (?, ?, ?, ?)",
+                                    (taxon, last_sync, last_full_sync, last_id))
+
+    def max_id(self, taxon: str) -> int:
+        with self.lock:
+            row = self.connection.execute("SELECT MAX(id) FROM observations WHERE taxon = ?", (taxon,)).fetchone()
+        if row[0] is None:
+            return 0
+        return row[0]
+
+    def add_observations(self, taxon: str, observations: list) -> None:
+        """
+        add or update a list of (id, latitude, longitude, url) observations of a taxon
+        """
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?)",
+                                        [(taxon, *obs) for obs in observations])
+
+    def remove_other_observations(self, taxon: str, keep_ids: set) -> None:
+        """
+        delete every stored observation of a taxon whose id is not in keep_ids
+        """
+        with self.lock, self.connection:
+            stored_ids = [row[0] for row in self.connection.execute("SELECT id FROM observations WHERE taxon = ?",
+                                                                    (taxon,))]
+            self.connection.executemany("DELETE FROM observations WHERE taxon = ? AND id = ?",
+                                        [(taxon, i) for i in stored_ids if i not in keep_ids])
+
+    def observations(self, taxon: str) -> list:
+        """
+        return the stored observations of a taxon as INatData, in order of observation id
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT latitude, longitude, url FROM observations WHERE taxon = ? "
+                                           "ORDER BY id", (taxon,)).fetchall()
+        return [TMB_Classes.INatData(coords=TMB_Classes.Point(lat, lon), url=url) for lat, lon, url in rows]
+
+
+def parse_inat_observations(raw_data: list) -> Tuple[list, int, int]:
+    """
+    extract (id, latitude, longitude, url) for each observation in a downloaded csv page
+
+    also returns the number of records on the page and the highest observation id on the page (0 if none), both
+    including records without valid coordinates
+    """
+    observations = []
+    n = 0
+    last_id = 0
+    for data in csv.reader(raw_data[1:]):
+        if len(data) > 0:
+            n += 1
+            try:
+                last_id = max(last_id, int(data[0]))
+            except ValueError:
+                continue
+            try:
+                observations.append((int(data[0]), str_to_number(data[4]), str_to_number(data[5]), data[8]))
+            except SyntaxError:
+                pass
+            except ValueError:
+                pass
+    return observations, n, last_id
+
+
+def sync_inat_species(store: INatStore, inatid: str, max_age: float, full_sync_age: float,
+                      limiter: Optional[RateLimiter], fetcher: Callable, base_url: str) -> list:
+    """
+    bring the stored observations of a single iNaturalist taxon up to date and return them
+
+    nothing is downloaded if the taxon was synced less than max_age seconds ago. Otherwise only observations with an
+    id above the highest id downloaded so far are fetched, except every full_sync_age seconds when all observations
+    are fetched again so that those deleted from iNaturalist are also removed from the store. Every page is stored as
+    soon as it is downloaded, so an interrupted sync continues from where it stopped
+    """
+    now = time.time()
+    last_sync, last_full_sync, last_id = store.sync_status(inatid)
+    if now - last_sync < max_age:
+        return store.observations(inatid)
+    full_sync = now - last_full_sync >= full_sync_age
+    if full_sync:
+        id_above = 0
+    else:
+        # observations without valid coordinates are not stored, so the highest id downloaded is kept separately
+        id_above = max(last_id, store.max_id(inatid))
+    seen_ids = set()
+    next_page = True
+    while next_page:
+        if limiter is not None:
+            limiter.wait()
+        raw_data = fetcher(f"{base_url}/observations.csv?taxon_id={inatid}&per_page={INAT_PER_PAGE}"
+                           f"&quality_grade=research&order_by=id&order=asc&id_above={id_above}", "utf-8")
+        observations, n, page_last_id = parse_inat_observations(raw_data)
+        store.add_observations(inatid, observations)
+        seen_ids.update(obs[0] for obs in observations)
+        # page on the highest id of every record, so a page whose records all lack valid coordinates does not stop
+        # the sync
+        if page_last_id > id_above:
+            id_above = page_last_id
+        else:
+            next_page = False
+        if n < INAT_PER_PAGE:
+            next_page = False
+    if full_sync:
+        store.remove_other_observations(inatid, seen_ids)
+        last_full_sync = now
+    store.set_sync_status(inatid, now, last_full_sync, id_above)
+    return store.observations(inatid)
+
+
+def fetch_inat_data(species: list, store_file: str = ":memory:", max_age: float = 0, full_sync_age: float = 0,
+                    requests_per_second: float = 1, max_workers: int = 4, fetcher: Callable = get_webpage,
+                    base_url: str = INAT_URL) -> dict:
     """
     function to fetch species observation data from iNaturalist
+
+    observations are kept in a local store (see sync_inat_species) and species are synced concurrently on
+    max_workers threads, with the start of every request spaced by a shared rate limit. fetcher is called with a url
+    and encoding and must return the lines of the page, allowing a stand-in for the web server
     """
     inat_data = {}
     print("...Importing iNaturalist Data...")
-    for s in tqdm(species):
-        time.sleep(5)  # pause 5 seconds between each species
-        if s.inatid != ".":
-            coords = []
-            page = 0
-            next_page = True
-            while next_page:
-                page += 1
-                raw_data = get_webpage(f"https://www.inaturalist.org/observations.csv?taxon_id={s.inatid}"
-                                       f"&per_page=200&quality_grade=research&page={page}", "utf-8")
-                if len(raw_data) > 2:  # header plus the blank line at the end; data would require at least 3 lines
-                    for data in csv.reader(raw_data[1:]):
-                        if len(data) > 0:
-                            try:
-                                point = TMB_Classes.Point(str_to_number(data[4]), str_to_number(data[5]))
-                                urlstr = data[8]
-                                coords.append(TMB_Classes.INatData(coords=point, url=urlstr))
-                            except SyntaxError:
-                                pass
-                            except ValueError:
-                                pass
-                else:
-                    next_page = False
-            inat_data[s.species] = coords
-    return inat_data
+    limiter = RateLimiter(requests_per_second)
+    store = INatStore(store_file)
+    inat_species = [s for s in species if s.inatid != "."]
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(sync_inat_species, store, s.inatid, max_age, full_sync_age, limiter, fetcher,
+                                       base_url): s for s in inat_species}
+            for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures)):
+                inat_data[futures[future].species] = future.result()
+    finally:
+        store.close()
+    # keep the species in their original order
+    return {s.species: inat_data[s.species] for s in inat_species}
 
 
 def read_species_blocks(filename: str) -> dict:
@@ -8,9 +8,11 @@ both z and m elements if present.
 
 import struct
 from typing import Tuple, Literal
-import matplotlib.pyplot as mplpy  # only for testing
 import TMB_Initialize
 from TMB_Classes import Point
+from TMB_Common import LazyModule
+
+mplpy = LazyModule("matplotlib.pyplot")  # only for testing
 
 
 VALIDSHAPES = {0, 1, 3, 5, 8, 11, 13, 15, 18, 21, 23, 25, 28, 31}
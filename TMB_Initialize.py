@@ -46,6 +46,8 @@ class InitializationData:
         self.tax_key_taxa_file = "data/tax_key_taxa_data.txt"
 
         self.error_log = "errorlog.txt"
+        self.validation_report = "validation_report.json"
+        self.deploy_changes = "deploy_changes.json"
 
         # map data
         self.map_primary = "resources/ne_10m_admin_0_countries.shp"
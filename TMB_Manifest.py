@@ -0,0 +1,165 @@
+"""
+Content-hash manifest of the web output
+
+The manifest records the SHA-256 hash of every file written to the web output directory, keyed by its path within
+the directory. A file whose new content has the same hash as the file already there is not rewritten, so its
+modification time is unchanged, and at the end of a build the new manifest is compared with the one from the
+previous build to list the files which were added, changed, or removed for the deploy step.
+
+Text which changes with every build without changing the content, such as the release stamp in the page footers, is
+left out of the hashes, so a page which only differs from the previous build by its stamp keeps its old copy.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from typing import Optional
+import TMB_Dependencies
+
+# increase whenever the format of the stored manifest changes so that old manifests are ignored
+MANIFEST_VERSION = 2
+
+
+class OutputManifest:
+    """ the content hashes of the files written to an output directory, keyed by path relative to the directory """
+    def __init__(self, root: str, previous: Optional[dict] = None, volatile: tuple = ()):
+        self.root = root
+        self.previous = {} if previous is None else previous  # hashes from the last build
+        self.current = {}  # hashes of the files written or checked by this build
+        self.volatile = [v.encode("utf-8") for v in volatile if v != ""]  # text left out of the hashes
+
+    def digest(self, data: bytes) -> str:
+        for v in self.volatile:
+            data = data.replace(v, b"")
+        return hashlib.sha256(data).hexdigest()
+
+    def relative_path(self, filename: str) -> Optional[str]:
+        if filename.startswith(self.root):
+            return filename[len(self.root):]
+        return None
+
+    def record(self, filename: str, digest: str) -> bool:
+        """
+        record the new hash of a file, returning True if the file already holds exactly this content
+        """
+        rel_path = self.relative_path(filename)
+        if rel_path is None:
+            return False
+        # a file written earlier in this build (e.g., a blank index which is later replaced) is compared with what
+        # was written then, not with the previous build
+        old_digest = self.current.get(rel_path, self.previous.get(rel_path))
+        self.current[rel_path] = digest
+        return old_digest == digest and os.path.exists(filename)
+
+    def write(self, filename: str, data: bytes) -> bool:
+        """
+        write data to a file unless the file already holds the same content, returning True if it was written
+        """
+        if self.record(filename, self.digest(data)):
+            return False
+        write_file(filename, data)
+        return True
+
+    def copy(self, src: str, dst_path: str) -> bool:
+        """
+        copy a file into a directory unless the copy there is already the same, returning True if it was copied
+        """
+        filename = dst_path + os.path.basename(src)
+        if self.record(filename, file_digest(src)):
+            return False
+        shutil.copy2(src, filename)
+        return True
+
+    def keep(self, filenames: list) -> None:
+        """
+        keep the previous hashes of files which were left in place, rather than written, by this build
+        """
+        for filename in filenames:
+            rel_path = self.relative_path(filename)
+            if (rel_path in self.previous) and (rel_path not in self.current):
+                self.current[rel_path] = self.previous[rel_path]
+
+    def finish(self, complete: bool = True) -> dict:
+        """
+        return the sorted lists of files which were added, changed, and removed since the previous build
+
+        files are only counted as removed after a complete build; after a partial build, the files which were not
+        written are assumed to be unchanged and are kept in the manifest
+        """
+        added = sorted(f for f in self.current if f not in self.previous)
+        changed = sorted(f for f in self.current if f in self.previous and self.current[f] != self.previous[f])
+        removed = sorted(f for f in self.previous if f not in self.current)
+        if not complete:
+            for f in removed:
+                self.current[f] = self.previous[f]
+            removed = []
+        return {"added": added, "changed": changed, "removed": removed}
+
+    def save(self, filename: str) -> None:
+        write_json(filename, {"version": MANIFEST_VERSION, "root": self.root, "files": self.current})
+
+
+# the manifest of the web output for the current build, or None to always write every file
+MANIFEST = None
+
+
+def file_digest(filename: str) -> str:
+    with open(filename, "rb") as infile:
+        return hashlib.file_digest(infile, "sha256").hexdigest()
+
+
+def write_file(filename: str, data: bytes) -> None:
+    """
+    write data to a temporary file which then replaces the target, so a file is never left half-written
+    """
+    tmp_name = filename + ".tmp"
+    with open(tmp_name, "wb") as outfile:
+        outfile.write(data)
+    os.replace(tmp_name, filename)
+
+
+def write_json(filename: str, data: dict) -> None:
+    tmp_name = filename + ".tmp"
+    with open(tmp_name, "w", encoding="utf-8") as outfile:
+        json.dump(data, outfile, indent=2, ensure_ascii=False)
+    os.replace(tmp_name, filename)
+
+
+def load_manifest(filename: str, root: str, volatile: tuple = ()) -> OutputManifest:
+    """
+    return a manifest holding the hashes stored by the previous build, or an empty manifest if there is none
+
+    volatile is a list of strings (e.g., the release stamp of this build) which are left out of the hashes of the
+    written files
+    """
+    try:
+        with open(filename, "r", encoding="utf-8") as infile:
+            data = json.load(infile)
+    except (OSError, ValueError):
+        return OutputManifest(root, volatile=volatile)
+    if data.get("version") != MANIFEST_VERSION or data.get("root") != root:
+        return OutputManifest(root, volatile=volatile)
+    return OutputManifest(root, data["files"], volatile)
+
+
+def write_output(filename: str, data: bytes) -> bool:
+    """
+    write data to an output file through the current manifest, returning True if the file was written
+    """
+    TMB_Dependencies.record_write(filename)
+    if MANIFEST is None:
+        write_file(filename, data)
+        return True
+    return MANIFEST.write(filename, data)
+
+
+def copy_output(src: str, dst_path: str) -> bool:
+    """
+    copy a file into an output directory through the current manifest, returning True if the file was copied
+    """
+    TMB_Dependencies.record_write(dst_path + os.path.basename(src))
+    if MANIFEST is None:
+        shutil.copy2(src, dst_path)
+        return True
+    return MANIFEST.copy(src, dst_path)
@@ -4,12 +4,16 @@ Module related to species size data
 
 import math
 import random
-import matplotlib.pyplot as mplpy
-from matplotlib.lines import Line2D
-from matplotlib.patches import Rectangle
-from matplotlib.collections import PatchCollection
-import numpy
+from typing import BinaryIO, Union
 import TMB_Classes
+from TMB_Common import LazyModule
+
+# plotting libraries are slow to load and only needed when a figure is drawn
+mplpy = LazyModule("matplotlib.pyplot")
+mpl_lines = LazyModule("matplotlib.lines")
+mpl_patches = LazyModule("matplotlib.patches")
+mpl_collections = LazyModule("matplotlib.collections")
+numpy = LazyModule("numpy")
 
 DATA_TYPES = ["individual", "range", "mean", "mean/sd", "mean/se", "classcount", "mean/sd/min/max", "mean/se/min/max"]
 
@@ -246,11 +250,11 @@ def plot_classcount(faxes, data: dict, yv: float, color) -> float:
                     current_class.append(d)
                     maxn = max(maxn, d.n)
             for d in current_class:
-                rect = Rectangle((d.value.min_val, yv), d.value.max_val-d.value.min_val, d.n/maxn)
+                rect = mpl_patches.Rectangle((d.value.min_val, yv), d.value.max_val-d.value.min_val, d.n/maxn)
                 boxes.append(rect)
             yv += 1.25
 
-        pc = PatchCollection(boxes, facecolor=color, edgecolor="black", linewidths=0.25, alpha=0.5)
+        pc = mpl_collections.PatchCollection(boxes, facecolor=color, edgecolor="black", linewidths=0.25, alpha=0.5)
         faxes.add_collection(pc)
     return yv
 
@@ -322,7 +326,7 @@ def plot_combined_data(faxes, combined_data: list, yv: float, color) -> float:
 
 
 def plot_measurement_data(species_dat: TMB_Classes.SpeciesMeasurements, combined_data: list, comb_male_data: list,
-                          comb_female_data: list, filename: str) -> None:
+                          comb_female_data: list, filename: Union[str, BinaryIO]) -> None:
     """
     create figure of all measurement data, including the simulated distribution
     """
@@ -375,9 +379,9 @@ def plot_measurement_data(species_dat: TMB_Classes.SpeciesMeasurements, combined
     y = plot_combined_data(faxes, comb_male_data, y, "blue")
     plot_combined_data(faxes, combined_data, y, "black")
 
-    custom_lines = [Line2D([0], [0], color="black", lw=4),
-                    Line2D([0], [0], color="blue", lw=4),
-                    Line2D([0], [0], color="red", lw=4)]
+    custom_lines = [mpl_lines.Line2D([0], [0], color="black", lw=4),
+                    mpl_lines.Line2D([0], [0], color="blue", lw=4),
+                    mpl_lines.Line2D([0], [0], color="red", lw=4)]
     faxes.legend(custom_lines, ["All", "Males", "Females"], ncol=3, loc="lower center", bbox_to_anchor=(0.5, 1.01))
 
     mplpy.savefig(filename, format="png", dpi=600)
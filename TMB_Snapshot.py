@@ -0,0 +1,103 @@
+"""
+Snapshot cache for the parsed and linked input data
+
+The complete object graph created by reading the data files is pickled to a single binary file, along with the
+size, modification time, and content hash of every input file that was read to build it and a key describing how
+the data were read (the configured input paths and a hash of the parsing code). On later runs the snapshot is only
+used if the key is the same and every recorded input file is unchanged, otherwise the data are re-read from scratch.
+"""
+
+import os
+import pickle
+import hashlib
+from typing import Optional, Callable
+import TMB_Error
+from TMB_Error import report_error
+
+# increase whenever the layout of the snapshot file itself changes; changes to the code which creates the stored
+# data are detected through the key passed by the caller
+SNAPSHOT_VERSION = 4
+
+
+def file_signature(filename: str) -> Optional[tuple]:
+    """
+    return the size, modification time, and content hash of a file, or None if the file does not exist
+    """
+    try:
+        stats = os.stat(filename)
+        with open(filename, "rb") as infile:
+            digest = hashlib.sha256(infile.read()).hexdigest()
+    except OSError:
+        return None
+    return stats.st_size, stats.st_mtime_ns, digest
+
+
+def input_signatures(filenames: list) -> dict:
+    return {f: file_signature(f) for f in filenames}
+
+
+def code_digest(filenames: list) -> str:
+    """
+    return a hash of a list of source files, so a change to the code which creates the data can be detected
+    """
+    digest = hashlib.sha256()
+    for filename in filenames:
+        with open(filename, "rb") as infile:
+            digest.update(infile.read())
+    return digest.hexdigest()
+
+
+def load_snapshot(snapshot_file: str, key: object = None) -> Optional[object]:
+    """
+    return the stored data if the snapshot exists, was stored with the same key, and all of its input files are
+    unchanged, otherwise None
+    """
+    try:
+        with open(snapshot_file, "rb") as infile:
+            version, stored_key, signatures, errors, data = pickle.load(infile)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError, TypeError):
+        return None
+    if (version != SNAPSHOT_VERSION) or (stored_key != key):
+        return None
+    for filename, signature in signatures.items():
+        if file_signature(filename) != signature:
+            return None
+    # repeat any errors found while the data were originally imported, so the error log is the same as a full read
+    for e in errors:
+        report_error(e)
+    return data
+
+
+def save_snapshot(snapshot_file: str, filenames: list, errors: list, data: object, key: object = None) -> None:
+    """
+    write the data, the key, and the signatures of the files the data were read from to the snapshot file
+    """
+    tmp_name = snapshot_file + ".tmp"
+    with open(tmp_name, "wb") as outfile:
+        pickle.dump((SNAPSHOT_VERSION, key, input_signatures(filenames), errors, data), outfile,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_name, snapshot_file)
+
+
+def cached_import(snapshot_file: str, reader: Callable, input_files: Callable, key: object = None) -> object:
+    """
+    return the data created by reader(), using the snapshot when it is still valid
+
+    input_files is called with the newly read data and must return the list of all files the data were read from;
+    key is any comparable value which must be the same for the snapshot to be used
+    """
+    data = load_snapshot(snapshot_file, key)
+    if data is not None:
+        print("......Loaded Data from Snapshot......")
+        return data
+    previous_record = TMB_Error.ERROR_RECORD
+    TMB_Error.ERROR_RECORD = []
+    try:
+        data = reader()
+        errors = TMB_Error.ERROR_RECORD
+    finally:
+        TMB_Error.ERROR_RECORD = previous_record
+    if previous_record is not None:
+        previous_record.extend(errors)
+    save_snapshot(snapshot_file, input_files(data), errors, data, key)
+    return data
@@ -0,0 +1,97 @@
+"""
+Data integrity checking engine
+
+Each check is a function which takes the shared ValidationData and returns a list of error messages; it must not
+modify the data so that independent checks can be run at the same time. The results are gathered into a
+ValidationReport, which removes repeated messages, keeps the checks in the order they were listed regardless of
+which finished first, and can be written to the text error log and to a JSON file.
+"""
+
+import json
+import os
+import time
+import concurrent.futures
+from typing import Callable
+from TMB_Error import report_error
+
+
+class ValidationData:
+    """ a class to hold the data and the shared indexes used by the data checks """
+    def __init__(self):
+        self.site_data = None
+        self.cite_index = None
+        self.cite_keys = set()
+        self.name_table = {}
+        self.binomial_point_locations = {}
+        self.specific_point_locations = {}
+        self.location_species = {}
+        self.location_sp_names = {}
+        self.location_bi_names = {}
+        self.location_range_species = {}
+
+
+class ValidationReport:
+    """ a class to hold the de-duplicated error messages found by each data check """
+    def __init__(self):
+        self.issues = {}  # lists of messages, keyed by check name
+        self.run_times = {}  # seconds, keyed by check name
+        self.seen = set()
+
+    def add(self, check: str, messages: list, run_time: float = 0) -> None:
+        """
+        add the messages from a check, skipping any message which has already been reported
+        """
+        new_messages = []
+        for m in messages:
+            if m not in self.seen:
+                self.seen.add(m)
+                new_messages.append(m)
+        self.issues[check] = new_messages
+        self.run_times[check] = run_time
+
+    def n_issues(self) -> int:
+        return len(self.seen)
+
+    def report_errors(self) -> None:
+        """
+        write every message to the standard error log
+        """
+        for messages in self.issues.values():
+            for m in messages:
+                report_error(m)
+
+    def write_json(self, filename: str) -> None:
+        """
+        write the report to a JSON file, replacing the file in a single step so a partial report is never left behind
+        """
+        output = {"total_issues": self.n_issues(),
+                  "checks": [{"check": check, "n_issues": len(messages), "run_time": round(self.run_times[check], 4),
+                              "issues": messages} for check, messages in self.issues.items()]}
+        tmp_name = filename + ".tmp"
+        with open(tmp_name, "w", encoding="utf-8") as outfile:
+            json.dump(output, outfile, indent=2, ensure_ascii=False)
+        os.replace(tmp_name, filename)
+
+
+def timed_check(check: Callable[[ValidationData], list], data: ValidationData) -> tuple:
+    start_time = time.perf_counter()
+    messages = check(data)
+    return messages, time.perf_counter() - start_time
+
+
+def run_checks(checks: dict, data: ValidationData, use_threads: bool = True) -> ValidationReport:
+    """
+    run every check in a dictionary of checks keyed by name, concurrently on a thread pool unless use_threads is False
+    """
+    report = ValidationReport()
+    if use_threads and len(checks) > 1:
+        max_workers = min(len(checks), (os.cpu_count() or 1) + 4)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {name: executor.submit(timed_check, check, data) for name, check in checks.items()}
+            results = {name: futures[name].result() for name in futures}
+    else:
+        results = {name: timed_check(check, data) for name, check in checks.items()}
+    for name in checks:
+        messages, run_time = results[name]
+        report.add(name, messages, run_time)
+    return report
@@ -0,0 +1,184 @@
+"""
+This module is for benchmarking the memory and time used by parts of the main code without having to run a full
+build
+"""
+
+import io
+import sys
+import time
+import subprocess
+import tracemalloc
+import TMB_Initialize
+import TMB_Classes
+import TMB_Import
+import TMB_ImportShape
+import Build_Website
+
+
+def object_size(x: object) -> int:
+    """
+    size of an object in bytes, including its attribute dictionary if it has one (but not the attribute values)
+    """
+    size = sys.getsizeof(x)
+    if hasattr(x, "__dict__"):
+        size += sys.getsizeof(x.__dict__)
+    return size
+
+
+def benchmark_memory() -> None:
+    """
+    report the bytes per object of the high-cardinality data classes and the total memory used by a full data load
+    """
+    TMB_Initialize.initialize()
+    t_init_data = TMB_Initialize.INIT_DATA
+
+    tracemalloc.start()
+    site_data = Build_Website.read_site_data()
+    data_size = tracemalloc.get_traced_memory()[0]
+    coastline = TMB_ImportShape.import_arcinfo_shp(t_init_data.map_coastline)
+    total_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    n_points = sum(len(part) for part in coastline)
+    range_cells = [c for blocks in site_data.species_range_blocks.values() for c in blocks]
+    samples = (("ReferenceClass", site_data.references),
+               ("CitationClass", site_data.citelist),
+               ("LocationClass", list(site_data.point_locations.values())),
+               ("RangeCell", range_cells),
+               ("Measurement", [TMB_Classes.Measurement()]),
+               ("Point", [TMB_Classes.Point()]))
+    print("Bytes per object:")
+    for name, objects in samples:
+        if len(objects) > 0:
+            print(f"   {name}: {object_size(objects[0])}")
+    print(f"Citations: {len(site_data.citelist)}")
+    print(f"Coastline points: {n_points}")
+    print(f"Total size of loaded data: {data_size / 1048576:0.1f} MB")
+    print(f"Total size of loaded data and coastline: {total_size / 1048576:0.1f} MB")
+
+
+def write_scaled_citation_file(filename: str, outname: str, scale: int) -> None:
+    """
+    write a synthetic citation file containing scale copies of every entry, where each copy only cites within itself
+    """
+    with open(filename, "r", encoding="utf-8") as infile:
+        lines = infile.readlines()
+    with open(outname, "w", encoding="utf-8") as outfile:
+        outfile.write(lines[0])
+        for k in range(scale):
+            for line in lines[1:]:
+                d = line.rstrip("\n").split("\t")
+                if len(d) > 6:
+                    d[0] += f"_{k}"
+                    if d[5] == "citation":
+                        d[6] += f"_{k}"
+                outfile.write("\t".join(d) + "\n")
+
+
+def benchmark_citation_linking(scale: int = 10) -> None:
+    """
+    time the citation cross-reference resolution on the real citation file and on a synthetic file scale times larger
+    """
+    TMB_Initialize.initialize()
+    t_init_data = TMB_Initialize.INIT_DATA
+    Build_Website.create_temp_output_paths()
+    scaled_file = Build_Website.TMP_PATH + "citeinfo_scaled.txt"
+    for s in (1, scale):
+        write_scaled_citation_file(t_init_data.citation_info_file, scaled_file, s)
+        citelist = TMB_Import.read_citation_file(scaled_file)
+        start_time = time.perf_counter()
+        Build_Website.compute_species_from_citation_linking(citelist)
+        Build_Website.compute_applied_name_contexts(citelist)
+        run_time = time.perf_counter() - start_time
+        print(f"{s}x citations ({len(citelist)} entries): {run_time:0.3f} seconds")
+
+
+def benchmark_data_loading() -> None:
+    """
+    compare the time to read and link all of the data files serially and on a thread pool
+    """
+    TMB_Initialize.initialize()
+    times = {}
+    for use_threads in (False, True):
+        start_time = time.perf_counter()
+        Build_Website.read_site_data(use_threads)
+        times[use_threads] = time.perf_counter() - start_time
+    print(f"Serial data loading: {times[False]:0.3f} seconds")
+    print(f"Concurrent data loading: {times[True]:0.3f} seconds")
+
+
+def benchmark_name_matching(scale: int = 10) -> None:
+    """
+    time matching every binomial to its specific name for the name pages, on the real names and on a synthetic name
+    list scale times larger
+    """
+    TMB_Initialize.initialize()
+    site_data = Build_Website.read_site_data()
+    unique_names = Build_Website.calculate_name_index_data(site_data.refdict, site_data.citelist,
+                                                           site_data.specific_names)[0]
+    for s in (1, scale):
+        # copies of each binomial with a modified genus, so each still matches the same specific name
+        names = [name.replace(" ", f"{k} ", 1) if k > 0 else name for k in range(s) for name in unique_names]
+        start_time = time.perf_counter()
+        match_index = Build_Website.create_specific_name_match_index(site_data.specific_names)
+        for name in names:
+            Build_Website.match_specific_name(name, match_index)
+        run_time = time.perf_counter() - start_time
+        print(f"{s}x names ({len(names)} binomials): {run_time:0.3f} seconds")
+
+
+def benchmark_import_time(repeats: int = 5) -> None:
+    """
+    time a fresh import of the main module in a new interpreter and check that no plotting library was loaded by it
+    """
+    script = ("import sys, time\n"
+              "start_time = time.perf_counter()\n"
+              "import Build_Website\n"
+              "run_time = time.perf_counter() - start_time\n"
+              "heavy = [m for m in ('matplotlib', 'wordcloud', 'numpy') if m in sys.modules]\n"
+              "print(run_time, ','.join(heavy))")
+    times = []
+    heavy = ""
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        run_time, _, heavy = result.stdout.strip().partition(" ")
+        times.append(float(run_time))
+    print(f"Import time of Build_Website: {min(times):0.3f} seconds (best of {repeats})")
+    if heavy != "":
+        print(f"   Libraries loaded at import: {heavy}")
+
+
+def benchmark_page_chrome(n_pages: int = 10000) -> None:
+    """
+    time writing the common header and footer of many pages from the cached page blocks, compared to rendering the
+    blocks again for every page
+    """
+    TMB_Initialize.initialize()
+    indexpaths = ("", "../", "../../")
+    start_time = time.perf_counter()
+    for i in range(n_pages):
+        outfile = io.StringIO()
+        indexpath = indexpaths[i % len(indexpaths)]
+        head_start, head_end, body_start, footer = Build_Website.render_page_chrome(indexpath, False)
+        outfile.write(head_start + Build_Website.remove_html(f"Page {i}") + head_end)
+        outfile.write(body_start)
+        outfile.write(footer)
+    render_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for i in range(n_pages):
+        outfile = io.StringIO()
+        indexpath = indexpaths[i % len(indexpaths)]
+        Build_Website.common_html_header(outfile, f"Page {i}", indexpath=indexpath)
+        Build_Website.common_html_footer(outfile, indexpath=indexpath)
+    cached_time = time.perf_counter() - start_time
+    print(f"Headers and footers of {n_pages} pages, rendered each time: {render_time:0.3f} seconds")
+    print(f"Headers and footers of {n_pages} pages, from cached blocks: {cached_time:0.3f} seconds")
+
+
+if __name__ == "__main__":
+    benchmark_import_time()
+    benchmark_memory()
+    benchmark_citation_linking()
+    benchmark_data_loading()
+    benchmark_name_matching()
+    benchmark_page_chrome()
@@ -0,0 +1,81 @@
+"""
+This module is for testing that errors reported by data readers run on a thread pool reach the error log, in a
+fixed order and also when a reader fails, without having to run the entirety of the main code
+"""
+
+import os
+import random
+import tempfile
+import time
+import concurrent.futures
+import TMB_Error
+import TMB_Import
+
+
+def reader(name: str, n_errors: int) -> str:
+    for i in range(n_errors):
+        time.sleep(random.random() / 100)
+        TMB_Error.report_error(f"{name} error {i}")
+    return name
+
+
+def failing_reader(filename: str) -> list:
+    TMB_Error.report_error("before failure")
+    return list(TMB_Import.read_data_objects(filename, TMB_Import.TMB_Classes.CitationClass,
+                                             TMB_Import.CITATION_SCHEMA))
+
+
+def run_recorded(func, *args) -> list:
+    """
+    call func(*args) and return every error reported while it ran
+    """
+    previous = TMB_Error.ERROR_RECORD, TMB_Error.ECHO
+    TMB_Error.ERROR_RECORD = []
+    TMB_Error.ECHO = False
+    try:
+        func(*args)
+        return TMB_Error.ERROR_RECORD
+    finally:
+        TMB_Error.ERROR_RECORD, TMB_Error.ECHO = previous
+
+
+def test_fixed_order():
+    def read_all():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(TMB_Error.collect_errors, reader, name, 3) for name in "abcd"]
+            outputs = [f.result() for f in futures]
+        for _, errors in outputs:
+            for e in errors:
+                TMB_Error.report_error(e)
+
+    errors = run_recorded(read_all)
+    assert errors == [f"{name} error {i}" for name in "abcd" for i in range(3)]
+
+
+def test_failing_reader():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "citations.txt")
+        with open(filename, "w", encoding="utf-8") as outfile:
+            outfile.write("header\n")
+            outfile.write("too\tfew\tcolumns\n")
+        failure = []
+
+        def read():
+            try:
+                TMB_Error.collect_errors(failing_reader, filename)
+            except ValueError as e:
+                failure.append(str(e))
+
+        errors = run_recorded(read)
+    print("Errors reported by the failing reader:", errors)
+    assert errors[0] == "before failure"
+    assert errors[1].startswith("Import Error: ") and "row 2" in errors[1]
+    assert failure == [errors[1]]
+    # nothing is left being held back by the thread after the failure
+    assert run_recorded(TMB_Error.report_error, "later") == ["later"]
+
+
+if __name__ == "__main__":
+    test_fixed_order()
+    test_failing_reader()
+    print("Error collection tests passed")
@@ -0,0 +1,110 @@
+"""
+This module is for testing the incremental iNaturalist observation sync offline, against a local mock of the
+observations.csv endpoint, without having to run the entirety of the main code
+"""
+
+import os
+import tempfile
+import threading
+import http.server
+import urllib.parse
+import TMB_Import
+
+
+class MockINatServer(http.server.ThreadingHTTPServer):
+    """ a local stand-in for the iNaturalist observations.csv endpoint """
+    def __init__(self, observations: dict):
+        # observations is a dictionary keyed by taxon id, each a dictionary of observation id: (lat, lon)
+        self.observations = observations
+        self.requests = []
+        super().__init__(("127.0.0.1", 0), MockINatHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class MockINatHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        taxon = query["taxon_id"][0]
+        id_above = int(query.get("id_above", ["0"])[0])
+        per_page = int(query["per_page"][0])
+        self.server.requests.append((taxon, id_above))
+        taxon_obs = self.server.observations.get(taxon, {})
+        lines = ["id,observed_on,user_login,quality_grade,latitude,longitude,place_guess,description,url"]
+        for obs_id in sorted(i for i in taxon_obs if i > id_above)[:per_page]:
+            lat, lon = taxon_obs[obs_id]
+            lines.append(f"{obs_id},2020-01-01,user,research,{lat},{lon},\"somewhere, somehow\",,"
+                         f"https://www.inaturalist.org/observations/{obs_id}")
+        page = "\n".join(lines) + "\n"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.end_headers()
+        self.wfile.write(page.encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockSpecies:
+    def __init__(self, species: str, inatid: str):
+        self.species = species
+        self.inatid = inatid
+
+
+def stored_urls(inat_data: dict) -> dict:
+    return {s: [p.url.split("/")[-1] for p in obs] for s, obs in inat_data.items()}
+
+
+def test_sync():
+    # "4" has a full page of observations without valid coordinates before any valid ones
+    observations = {"1": {i: (i / 10, -i / 10) for i in range(1, 451)},
+                    "2": {5: (1, 2), 7: ("bad", 3)},
+                    "3": {},
+                    "4": {i: ("bad", "bad") if i <= TMB_Import.INAT_PER_PAGE else (1, 1) for i in range(1, 211)}}
+    species = [MockSpecies("alpha", "1"), MockSpecies("beta", "2"), MockSpecies("gamma", "3"),
+               MockSpecies("delta", "."), MockSpecies("epsilon", "4")]
+    server = MockINatServer(observations)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            check_sync(server, observations, species, os.path.join(tmp_dir, "inat_sync_test.sqlite"))
+        finally:
+            server.shutdown()
+    print("iNaturalist sync test passed")
+
+
+def check_sync(server: MockINatServer, observations: dict, species: list, store_file: str) -> None:
+    def sync(max_age: float = 0, full_sync_age: float = 1e9) -> dict:
+        server.requests.clear()
+        return stored_urls(TMB_Import.fetch_inat_data(species, store_file, max_age, full_sync_age,
+                                                      requests_per_second=100, base_url=server.url()))
+
+    # first sync downloads everything
+    result = sync()
+    print("Initial sync:", {s: len(obs) for s, obs in result.items()}, "requests:", len(server.requests))
+    assert len(result["alpha"]) == 450 and result["beta"] == ["5"] and result["gamma"] == []
+    assert len(result["epsilon"]) == 10
+
+    # a recent sync is served from the store without any requests
+    sync(max_age=3600)
+    print("Cached sync requests:", len(server.requests))
+    assert len(server.requests) == 0
+
+    # only new observations are downloaded by an incremental sync
+    observations["1"][500] = (1, 1)
+    del observations["1"][3]
+    result = sync()
+    print("Incremental sync requests:", server.requests)
+    assert ("1", 450) in server.requests and result["alpha"][-1] == "500" and "3" in result["alpha"]
+    # trailing observations without valid coordinates are not downloaded again
+    assert ("2", 7) in server.requests and ("4", 210) in server.requests
+
+    # a full reconciliation also removes deleted observations
+    result = sync(full_sync_age=0)
+    print("Full sync requests:", len(server.requests))
+    assert "3" not in result["alpha"] and len(result["alpha"]) == 450
+
+
+if __name__ == "__main__":
+    test_sync()
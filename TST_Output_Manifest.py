@@ -0,0 +1,61 @@
+"""
+This module is for testing that the output manifest leaves unchanged web pages in place from one build to the next,
+even though every build has a new release stamp, without having to run the entirety of the main code
+"""
+
+import os
+import tempfile
+import TMB_Initialize
+import TMB_Manifest
+import Build_Website
+from TMB_Common import PageWriter
+
+
+def build_pages(root: str, version: str, pages: dict) -> dict:
+    """
+    write a set of pages with the common header and footer, as a build with the given release stamp would, and
+    return the changes since the previous build
+    """
+    init_data = TMB_Initialize.InitializationData()
+    init_data.version = version
+    TMB_Initialize.INIT_DATA = init_data
+    manifest_file = os.path.join(root, "manifest.json")
+    webout_path = os.path.join(root, "webout") + os.sep
+    os.makedirs(webout_path, exist_ok=True)
+    TMB_Manifest.MANIFEST = TMB_Manifest.load_manifest(manifest_file, webout_path, (Build_Website.release_stamp(),))
+    try:
+        for name, text in pages.items():
+            with PageWriter(webout_path + name, encoding="utf-8") as outfile:
+                Build_Website.common_html_header(outfile, name)
+                outfile.write(text)
+                Build_Website.common_html_footer(outfile)
+        changes = TMB_Manifest.MANIFEST.finish()
+        TMB_Manifest.MANIFEST.save(manifest_file)
+    finally:
+        TMB_Manifest.MANIFEST = None
+    return changes
+
+
+def test_unchanged_page_not_rewritten():
+    with tempfile.TemporaryDirectory() as root:
+        pages = {"a.html": "    <p>First page</p>\n", "b.html": "    <p>Second page</p>\n"}
+        changes = build_pages(root, "2024.01.01.12.00", pages)
+        assert changes["added"] == ["a.html", "b.html"]
+        page_a = os.path.join(root, "webout", "a.html")
+        mtime = os.stat(page_a).st_mtime_ns
+
+        # a second build with a new release stamp and one changed page
+        pages["b.html"] = "    <p>Second page, revised</p>\n"
+        changes = build_pages(root, "2024.01.02.12.00", pages)
+        print("Changes:", changes)
+        assert changes == {"added": [], "changed": ["b.html"], "removed": []}
+        assert os.stat(page_a).st_mtime_ns == mtime
+        with open(page_a, "r", encoding="utf-8") as infile:
+            assert "Release: 2024.01.01.12.00" in infile.read()
+        with open(os.path.join(root, "webout", "b.html"), "r", encoding="utf-8") as infile:
+            assert "Release: 2024.01.02.12.00" in infile.read()
+    print("Output manifest test passed")
+
+
+if __name__ == "__main__":
+    test_unchanged_page_not_rewritten()